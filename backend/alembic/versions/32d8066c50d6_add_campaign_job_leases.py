@@ -0,0 +1,41 @@
+"""add campaign job leases
+
+Revision ID: 32d8066c50d6
+Revises: 8c2b248ea010
+Create Date: 2026-10-17 09:12:31.418204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '32d8066c50d6'
+down_revision: Union[str, None] = '8c2b248ea010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Lease columns let dedicated worker processes claim and resume campaigns
+    with op.batch_alter_table('bulk_call_campaigns', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('webhook_base_url', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('lease_owner', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('lease_expires_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('heartbeat_at', sa.DateTime(), nullable=True))
+        batch_op.add_column(sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'))
+
+    op.create_index('ix_bulk_call_campaigns_status_lease', 'bulk_call_campaigns', ['status', 'lease_expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bulk_call_campaigns_status_lease', table_name='bulk_call_campaigns')
+
+    with op.batch_alter_table('bulk_call_campaigns', schema=None) as batch_op:
+        batch_op.drop_column('attempts')
+        batch_op.drop_column('heartbeat_at')
+        batch_op.drop_column('lease_expires_at')
+        batch_op.drop_column('lease_owner')
+        batch_op.drop_column('webhook_base_url')
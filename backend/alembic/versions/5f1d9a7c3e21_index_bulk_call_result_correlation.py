@@ -0,0 +1,29 @@
+"""index bulk call result correlation
+
+Revision ID: 5f1d9a7c3e21
+Revises: 32d8066c50d6
+Create Date: 2026-10-17 10:41:07.552913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f1d9a7c3e21'
+down_revision: Union[str, None] = '32d8066c50d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Twilio status webhooks resolve results by call SID or by voice session id
+    op.create_index(op.f('ix_bulk_call_results_twilio_call_sid'), 'bulk_call_results', ['twilio_call_sid'], unique=True)
+    op.create_index(op.f('ix_bulk_call_results_voice_session_id'), 'bulk_call_results', ['voice_session_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_bulk_call_results_voice_session_id'), table_name='bulk_call_results')
+    op.drop_index(op.f('ix_bulk_call_results_twilio_call_sid'), table_name='bulk_call_results')
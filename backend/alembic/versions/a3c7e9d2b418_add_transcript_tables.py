@@ -0,0 +1,51 @@
+"""add transcript tables
+
+Revision ID: a3c7e9d2b418
+Revises: 5f1d9a7c3e21
+Create Date: 2026-10-17 11:58:23.104377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c7e9d2b418'
+down_revision: Union[str, None] = '5f1d9a7c3e21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Transcripts are parsed once at post-call webhook time instead of fetched on every view
+    op.create_table('transcripts',
+    sa.Column('conversation_id', sa.String(), nullable=False),
+    sa.Column('tenant_id', sa.String(), nullable=False),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('extracted_intent', sa.JSON(), nullable=True),
+    sa.Column('turn_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('conversation_id')
+    )
+    op.create_index(op.f('ix_transcripts_tenant_id'), 'transcripts', ['tenant_id'], unique=False)
+
+    op.create_table('transcript_turns',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('conversation_id', sa.String(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('timestamp', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['conversation_id'], ['transcripts.conversation_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_transcript_turns_conversation_position', 'transcript_turns', ['conversation_id', 'position'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transcript_turns_conversation_position', table_name='transcript_turns')
+    op.drop_table('transcript_turns')
+    op.drop_index(op.f('ix_transcripts_tenant_id'), table_name='transcripts')
+    op.drop_table('transcripts')
@@ -0,0 +1,83 @@
+"""add webhook idempotency constraints
+
+Revision ID: a6d2e9b4c815
+Revises: f3c9d1a6b572
+Create Date: 2026-10-17 20:41:06.382574
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a6d2e9b4c815'
+down_revision: Union[str, None] = 'f3c9d1a6b572'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns): conflict targets of the webhook's ON CONFLICT inserts
+UNIQUE_INDEXES = [
+    ('uq_calls_conversation_id', 'calls', ['conversation_id']),
+    ('uq_bookings_session_id', 'bookings', ['session_id']),
+    ('uq_tickets_session_id', 'tickets', ['session_id']),
+]
+
+# Replaced by uq_calls_conversation_id
+REPLACED_INDEXES = [
+    ('ix_calls_conversation_id_id', 'calls', ['conversation_id', 'id']),
+]
+
+
+def _duplicates(table: str, column: str) -> str:
+    """Ids of every row but the oldest per non-null ``column`` value"""
+    return f"""
+        SELECT id FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY {column} ORDER BY created_at, id) AS rn
+            FROM {table} WHERE {column} IS NOT NULL
+        ) ranked WHERE rn > 1
+    """
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    # Duplicates left by racing webhooks. Extra calls of a conversation are
+    # removed (with their feed rows); extra bookings and tickets of a session
+    # are kept but unlinked from it.
+    op.execute(f"DELETE FROM call_feed WHERE id IN ({_duplicates('calls', 'conversation_id')})")
+    op.execute(f"DELETE FROM calls WHERE id IN ({_duplicates('calls', 'conversation_id')})")
+    op.execute(f"UPDATE bookings SET session_id = NULL WHERE id IN ({_duplicates('bookings', 'session_id')})")
+    op.execute(f"UPDATE tickets SET session_id = NULL WHERE id IN ({_duplicates('tickets', 'session_id')})")
+
+    if not _is_postgresql():
+        for name, table, columns in UNIQUE_INDEXES:
+            op.create_index(name, table, columns, unique=True)
+        for name, table, _ in REPLACED_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True)
+        return
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction and does not block writes
+    with op.get_context().autocommit_block():
+        for name, table, columns in UNIQUE_INDEXES:
+            op.create_index(name, table, columns, unique=True, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in REPLACED_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    if not _is_postgresql():
+        for name, table, columns in REPLACED_INDEXES:
+            op.create_index(name, table, columns, unique=False)
+        for name, table, _ in reversed(UNIQUE_INDEXES):
+            op.drop_index(name, table_name=table)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in REPLACED_INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in reversed(UNIQUE_INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,32 @@
+"""add keyset pagination indexes
+
+Revision ID: b8f2c6d4e051
+Revises: e7b4d1f60a92
+Create Date: 2026-10-17 15:06:41.227904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8f2c6d4e051'
+down_revision: Union[str, None] = 'e7b4d1f60a92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PAGINATED_TABLES = ('calls', 'voice_sessions', 'customers', 'conversations')
+
+
+def upgrade() -> None:
+    # List endpoints page on (created_at, id) within a tenant; a b-tree scanned
+    # backwards serves the newest-first order, so no DESC columns are needed
+    for table in PAGINATED_TABLES:
+        op.create_index(f'ix_{table}_tenant_created_at_id', table, ['tenant_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    for table in PAGINATED_TABLES:
+        op.drop_index(f'ix_{table}_tenant_created_at_id', table_name=table)
@@ -0,0 +1,88 @@
+"""add customer phone e164
+
+Revision ID: b9e4f1c7d358
+Revises: a6d2e9b4c815
+Create Date: 2026-10-17 21:37:44.910263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.phone_utils import to_e164
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b9e4f1c7d358'
+down_revision: Union[str, None] = 'a6d2e9b4c815'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+INDEXES = [
+    # (index name, columns, unique)
+    ('uq_customers_tenant_phone_e164', ['tenant_id', 'phone_e164'], True),
+    ('ix_customers_phone_e164_created_at', ['phone_e164', 'created_at'], False),
+]
+
+
+def _backfill() -> None:
+    """
+    Normalize every customer's phone. Customers sharing a tenant and a number
+    keep the number only on the oldest one; the others get NULL, which never
+    conflicts, until they are merged by hand.
+    """
+    bind = op.get_bind()
+    customers = sa.table(
+        'customers', sa.column('id'), sa.column('tenant_id'), sa.column('phone'),
+        sa.column('phone_e164'), sa.column('created_at')
+    )
+    seen = set()
+    batch = []
+    rows = bind.execute(
+        sa.select(customers.c.id, customers.c.tenant_id, customers.c.phone)
+        .order_by(customers.c.tenant_id, customers.c.created_at, customers.c.id)
+    )
+    for customer_id, tenant_id, phone in rows:
+        phone_e164 = to_e164(phone)
+        if phone_e164 is None or (tenant_id, phone_e164) in seen:
+            continue
+        seen.add((tenant_id, phone_e164))
+        batch.append({'customer_id': customer_id, 'value': phone_e164})
+        if len(batch) >= BATCH_SIZE:
+            _write(bind, customers, batch)
+            batch = []
+    _write(bind, customers, batch)
+
+
+def _write(bind, customers, batch) -> None:
+    if batch:
+        bind.execute(
+            customers.update().where(customers.c.id == sa.bindparam('customer_id'))
+            .values(phone_e164=sa.bindparam('value')),
+            batch
+        )
+
+
+def upgrade() -> None:
+    op.add_column('customers', sa.Column('phone_e164', sa.String(), nullable=True))
+    _backfill()
+
+    if op.get_bind().dialect.name != 'postgresql':
+        for name, columns, unique in INDEXES:
+            op.create_index(name, 'customers', columns, unique=unique)
+        return
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction and does not block writes
+    with op.get_context().autocommit_block():
+        for name, columns, unique in INDEXES:
+            op.create_index(name, 'customers', columns, unique=unique, postgresql_concurrently=True, if_not_exists=True)
+
+
+def downgrade() -> None:
+    for name, _, _ in reversed(INDEXES):
+        op.drop_index(name, table_name='customers')
+    with op.batch_alter_table('customers') as batch_op:
+        batch_op.drop_column('phone_e164')
@@ -0,0 +1,48 @@
+"""add customer import jobs
+
+Revision ID: c3f7a2d8e916
+Revises: b9e4f1c7d358
+Create Date: 2026-10-17 22:58:13.477025
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f7a2d8e916'
+down_revision: Union[str, None] = 'b9e4f1c7d358'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('customer_import_jobs',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('tenant_id', sa.String(), nullable=False),
+    sa.Column('created_by', sa.String(), nullable=True),
+    sa.Column('filename', sa.String(), nullable=True),
+    sa.Column('file_format', sa.String(), nullable=False),
+    sa.Column('status', sa.Enum('queued', 'running', 'completed', 'failed', name='customerimportstatusenum'), nullable=False),
+    sa.Column('total_rows', sa.Integer(), nullable=True),
+    sa.Column('processed_rows', sa.Integer(), nullable=True),
+    sa.Column('created_rows', sa.Integer(), nullable=True),
+    sa.Column('duplicate_rows', sa.Integer(), nullable=True),
+    sa.Column('invalid_rows', sa.Integer(), nullable=True),
+    sa.Column('errors', sa.JSON(), nullable=True),
+    sa.Column('error_message', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_customer_import_jobs_tenant_created_at', 'customer_import_jobs', ['tenant_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_customer_import_jobs_tenant_created_at', table_name='customer_import_jobs')
+    op.drop_table('customer_import_jobs')
+    sa.Enum(name='customerimportstatusenum').drop(op.get_bind(), checkfirst=True)
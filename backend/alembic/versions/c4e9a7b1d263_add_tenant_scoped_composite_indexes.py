@@ -0,0 +1,75 @@
+"""add tenant scoped composite indexes
+
+Revision ID: c4e9a7b1d263
+Revises: b8f2c6d4e051
+Create Date: 2026-10-17 15:48:12.640173
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4e9a7b1d263'
+down_revision: Union[str, None] = 'b8f2c6d4e051'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, columns)
+INDEXES = [
+    # Webhook dedupe (calls by conversation) and the calls feed join, answered from the index alone
+    ('ix_calls_conversation_id_id', 'calls', ['conversation_id', 'id']),
+    # Live ops: a tenant's active sessions, newest first
+    ('ix_voice_sessions_tenant_status_created_at', 'voice_sessions', ['tenant_id', 'status', 'created_at']),
+    # Booking / ticket lists and the KPI rollup's per-day scans
+    ('ix_bookings_tenant_created_at', 'bookings', ['tenant_id', 'created_at']),
+    ('ix_tickets_tenant_created_at', 'tickets', ['tenant_id', 'created_at']),
+    # Campaign list
+    ('ix_bulk_call_campaigns_tenant_created_at', 'bulk_call_campaigns', ['tenant_id', 'created_at']),
+    # Campaign results, newest first
+    ('ix_bulk_call_results_campaign_created_at', 'bulk_call_results', ['campaign_id', 'created_at']),
+    # Dialer: next queued / in-flight results of a campaign
+    ('ix_bulk_call_results_campaign_status_created_at', 'bulk_call_results', ['campaign_id', 'status', 'created_at']),
+]
+
+# Prefix of ix_calls_conversation_id_id, so it only costs writes
+REDUNDANT_INDEXES = [
+    ('ix_calls_conversation_id', 'calls', ['conversation_id']),
+]
+
+
+def _is_postgresql() -> bool:
+    return op.get_bind().dialect.name == 'postgresql'
+
+
+def upgrade() -> None:
+    if not _is_postgresql():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False)
+        for name, table, _ in REDUNDANT_INDEXES:
+            op.drop_index(name, table_name=table, if_exists=True)
+        return
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction and does not block writes
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in REDUNDANT_INDEXES:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+
+
+def downgrade() -> None:
+    if not _is_postgresql():
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.create_index(name, table, columns, unique=False)
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table)
+        return
+
+    with op.get_context().autocommit_block():
+        for name, table, columns in REDUNDANT_INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True, if_not_exists=True)
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
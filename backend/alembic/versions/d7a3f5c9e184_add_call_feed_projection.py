@@ -0,0 +1,75 @@
+"""add call feed projection
+
+Revision ID: d7a3f5c9e184
+Revises: c4e9a7b1d263
+Create Date: 2026-10-17 16:52:37.214905
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a3f5c9e184'
+down_revision: Union[str, None] = 'c4e9a7b1d263'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # GET /calls reads this projection instead of joining calls, conversations,
+    # customers and voice_sessions on every request
+    op.create_table('call_feed',
+    sa.Column('id', sa.String(), nullable=False),
+    sa.Column('tenant_id', sa.String(), nullable=False),
+    sa.Column('conversation_id', sa.String(), nullable=False),
+    sa.Column('customer_id', sa.String(), nullable=True),
+    sa.Column('customer_name', sa.String(), nullable=True),
+    sa.Column('direction', sa.String(), nullable=False),
+    sa.Column('status', sa.String(), nullable=False),
+    sa.Column('outcome', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('handle_sec', sa.Integer(), nullable=True),
+    sa.Column('recording_url', sa.String(), nullable=True),
+    sa.Column('voice_session_id', sa.String(), nullable=True),
+    sa.Column('extracted_intent', sa.String(), nullable=True),
+    sa.Column('summary', sa.Text(), nullable=True),
+    sa.Column('agent_name', sa.String(), nullable=True),
+    sa.Column('session_status', sa.String(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id'], ['calls.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_call_feed_tenant_created_at_id', 'call_feed', ['tenant_id', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_call_feed_customer_id'), 'call_feed', ['customer_id'], unique=False)
+    op.create_index(op.f('ix_call_feed_voice_session_id'), 'call_feed', ['voice_session_id'], unique=False)
+
+    # Backfill with the join the API used to run. Enums are stored by name;
+    # only VoiceSessionStatus names differ from their values (upper case).
+    op.execute("""
+        INSERT INTO call_feed (
+            id, tenant_id, conversation_id, customer_id, customer_name, direction, status, outcome,
+            created_at, handle_sec, recording_url, voice_session_id, extracted_intent, summary,
+            agent_name, session_status, updated_at
+        )
+        SELECT
+            c.id, c.tenant_id, c.conversation_id, conv.customer_id, cust.name,
+            CAST(c.direction AS VARCHAR), CAST(c.status AS VARCHAR), CAST(c.outcome AS VARCHAR),
+            COALESCE(c.created_at, CURRENT_TIMESTAMP), c.handle_sec,
+            COALESCE(NULLIF(c.recording_url, ''), conv.recording_url),
+            vs.id, vs.extracted_intent, vs.summary, vs.agent_name,
+            LOWER(CAST(vs.status AS VARCHAR)), CURRENT_TIMESTAMP
+        FROM calls c
+        LEFT OUTER JOIN conversations conv ON c.conversation_id = conv.id
+        LEFT OUTER JOIN customers cust ON conv.customer_id = cust.id
+        LEFT OUTER JOIN voice_sessions vs ON c.conversation_id = vs.conversation_id
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_call_feed_voice_session_id'), table_name='call_feed')
+    op.drop_index(op.f('ix_call_feed_customer_id'), table_name='call_feed')
+    op.drop_index('ix_call_feed_tenant_created_at_id', table_name='call_feed')
+    op.drop_table('call_feed')
@@ -0,0 +1,89 @@
+"""add customer search text
+
+Revision ID: d8a4b6e2f157
+Revises: c3f7a2d8e916
+Create Date: 2026-10-17 23:12:05.381946
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.search_utils import customer_search_text
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a4b6e2f157'
+down_revision: Union[str, None] = 'c3f7a2d8e916'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+# SQLite: FTS5 index over search_text, kept in sync by triggers (as in app.models)
+SQLITE_FTS = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5("
+    "search_text, content='customers', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS customers_fts_ai AFTER INSERT ON customers BEGIN "
+    "INSERT INTO customers_fts(rowid, search_text) VALUES (new.rowid, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS customers_fts_ad AFTER DELETE ON customers BEGIN "
+    "INSERT INTO customers_fts(customers_fts, rowid, search_text) VALUES ('delete', old.rowid, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS customers_fts_au AFTER UPDATE OF search_text ON customers BEGIN "
+    "INSERT INTO customers_fts(customers_fts, rowid, search_text) VALUES ('delete', old.rowid, old.search_text); "
+    "INSERT INTO customers_fts(rowid, search_text) VALUES (new.rowid, new.search_text); END",
+    "INSERT INTO customers_fts(customers_fts) VALUES ('rebuild')",
+]
+
+
+def _backfill() -> None:
+    """Normalize every customer's name and email into search_text"""
+    bind = op.get_bind()
+    customers = sa.table(
+        'customers', sa.column('id'), sa.column('name'), sa.column('email'), sa.column('search_text')
+    )
+    batch = []
+    rows = bind.execute(sa.select(customers.c.id, customers.c.name, customers.c.email))
+    for customer_id, name, email in rows:
+        batch.append({'customer_id': customer_id, 'value': customer_search_text(name, email)})
+        if len(batch) >= BATCH_SIZE:
+            _write(bind, customers, batch)
+            batch = []
+    _write(bind, customers, batch)
+
+
+def _write(bind, customers, batch) -> None:
+    if batch:
+        bind.execute(
+            customers.update().where(customers.c.id == sa.bindparam('customer_id'))
+            .values(search_text=sa.bindparam('value')),
+            batch
+        )
+
+
+def upgrade() -> None:
+    op.add_column('customers', sa.Column('search_text', sa.Text(), nullable=True))
+    _backfill()
+
+    if op.get_bind().dialect.name != 'postgresql':
+        for statement in SQLITE_FTS:
+            op.execute(statement)
+        return
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction and does not block writes
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_customers_search_text_fts', 'customers', [sa.text("to_tsvector('simple', search_text)")],
+            postgresql_using='gin', postgresql_concurrently=True, if_not_exists=True
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        for trigger in ('customers_fts_ai', 'customers_fts_ad', 'customers_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS customers_fts")
+    else:
+        op.drop_index('ix_customers_search_text_fts', table_name='customers')
+    with op.batch_alter_table('customers') as batch_op:
+        batch_op.drop_column('search_text')
@@ -0,0 +1,34 @@
+"""add queued call status
+
+Revision ID: e2b8c4f7a319
+Revises: d7a3f5c9e184
+Create Date: 2026-10-17 17:31:05.882416
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8c4f7a319'
+down_revision: Union[str, None] = 'd7a3f5c9e184'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # POST /calls/bulk creates calls as 'queued'. SQLite stores enums as plain
+    # strings; PostgreSQL needs the value added to the enum type, which cannot
+    # happen inside a transaction before PostgreSQL 12.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE callstatusenum ADD VALUE IF NOT EXISTS 'queued' BEFORE 'connected'")
+
+
+def downgrade() -> None:
+    # PostgreSQL cannot drop a value from an enum type; queued calls are kept
+    # and the value stays defined.
+    pass
@@ -0,0 +1,43 @@
+"""add tenant daily kpis
+
+Revision ID: e7b4d1f60a92
+Revises: a3c7e9d2b418
+Create Date: 2026-10-17 13:42:09.518230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b4d1f60a92'
+down_revision: Union[str, None] = 'a3c7e9d2b418'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Dashboard KPIs are summed from per-day rollups instead of scanning raw rows.
+    # The table starts empty; the KPI reconciler backfills it on its first pass.
+    op.create_table('tenant_daily_kpis',
+    sa.Column('tenant_id', sa.String(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('calls', sa.Integer(), nullable=False),
+    sa.Column('completed_calls', sa.Integer(), nullable=False),
+    sa.Column('failed_calls', sa.Integer(), nullable=False),
+    sa.Column('intents', sa.Integer(), nullable=False),
+    sa.Column('handled_calls', sa.Integer(), nullable=False),
+    sa.Column('handle_seconds', sa.Float(), nullable=False),
+    sa.Column('bookings', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Float(), nullable=False),
+    sa.Column('sentiment_count', sa.Integer(), nullable=False),
+    sa.Column('sentiment_sum', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('tenant_id', 'day')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('tenant_daily_kpis')
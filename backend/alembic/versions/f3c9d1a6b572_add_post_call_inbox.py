@@ -0,0 +1,43 @@
+"""add post call inbox
+
+Revision ID: f3c9d1a6b572
+Revises: e2b8c4f7a319
+Create Date: 2026-10-17 19:24:51.608317
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3c9d1a6b572'
+down_revision: Union[str, None] = 'e2b8c4f7a319'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # POST /voice/post_call stores the payload here; workers process it asynchronously
+    op.create_table('post_call_inbox',
+    sa.Column('conversation_id', sa.String(), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('status', sa.Enum('pending', 'processing', 'done', 'dead', name='postcallinboxstatusenum'), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('next_attempt_at', sa.DateTime(), nullable=False),
+    sa.Column('lease_owner', sa.String(), nullable=True),
+    sa.Column('lease_expires_at', sa.DateTime(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('result', sa.JSON(), nullable=True),
+    sa.Column('received_at', sa.DateTime(), nullable=False),
+    sa.Column('processed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('conversation_id')
+    )
+    op.create_index('ix_post_call_inbox_status_next_attempt_at', 'post_call_inbox', ['status', 'next_attempt_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_post_call_inbox_status_next_attempt_at', table_name='post_call_inbox')
+    op.drop_table('post_call_inbox')
+    sa.Enum(name='postcallinboxstatusenum').drop(op.get_bind(), checkfirst=True)
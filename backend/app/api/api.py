@@ -1,6 +1,6 @@
 # backend/app/api/api.py
 from fastapi import APIRouter
-from app.api.routes import auth, dashboard, bookings, tickets, voice, customers, calls, conversations, voice_sessions, transcripts, admin_users, twilio, bulk_campaigns, scripts
+from app.api.routes import auth, dashboard, bookings, tickets, voice, customers, calls, conversations, voice_sessions, transcripts, admin_users, twilio, bulk_campaigns, scripts, live
 
 api_router = APIRouter()
 
@@ -20,4 +20,5 @@ api_router.include_router(admin_users.router, tags=["Admin Users"], prefix="/adm
 api_router.include_router(twilio.router, tags=["Twilio"])
 # Bulk campaigns is now the main campaign system
 api_router.include_router(bulk_campaigns.router, tags=["Campaigns"])
+api_router.include_router(live.router, tags=["Live Events"])
 api_router.include_router(scripts.router, prefix="/scripts", tags=["Scripts"])
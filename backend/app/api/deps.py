@@ -1,10 +1,11 @@
 # backend/app/api/deps.py
 from fastapi import Depends, HTTPException
-from app.db import get_session
+from app.db import get_session, get_async_session
 from app.auth_utils import get_current_user
-from app.models import User, UserRoleEnum
+from app.models import UserRoleEnum
+from app.services.principal_cache import Principal
 
-def get_current_tenant_id(current_user: User = Depends(get_current_user)) -> str:
+def get_current_tenant_id(current_user: Principal = Depends(get_current_user)) -> str:
     """
     Extract tenant ID from current authenticated user.
     """
@@ -15,7 +16,7 @@ def get_current_tenant_id(current_user: User = Depends(get_current_user)) -> str
         )
     return current_user.tenant_id
 
-def require_admin(current_user: User = Depends(get_current_user)) -> User:
+def require_admin(current_user: Principal = Depends(get_current_user)) -> Principal:
     """
     Dependency to ensure the current user is an admin.
     Raises HTTPException if the user is not an admin.
@@ -0,0 +1,95 @@
+# backend/app/api/pagination.py
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Lists are ordered newest first on (created_at, id). A cursor is an opaque
+token holding the (created_at, id) of the row a page ends at, so the next
+page is one index range scan of (tenant_id, created_at, id) no matter how
+deep it is, and rows inserted meanwhile do not shift pages.
+
+Response bodies stay plain lists; cursors are returned in the X-Next-Cursor
+and X-Prev-Cursor headers (absent when there is no such page).
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(created_at: datetime, row_id: str, direction: str) -> str:
+    raw = json.dumps([created_at.isoformat(), row_id, direction], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str, str]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id, direction = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return datetime.fromisoformat(created_at), str(row_id), direction
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def paginate(
+    query: Query,
+    model: Any,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = 100,
+    skip: int = 0
+) -> List[Any]:
+    """
+    Return one page of ``query`` ordered by ``model.created_at DESC, model.id DESC``
+    and set the cursor headers on ``response``.
+
+    ``skip`` is the legacy offset parameter; it is only applied when no cursor is given.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    key = tuple_(model.created_at, model.id)
+
+    direction = "next"
+    if cursor:
+        created_at, row_id, direction = decode_cursor(cursor)
+        boundary = tuple_(created_at, row_id)
+        if direction == "next":
+            query = query.filter(key < boundary).order_by(model.created_at.desc(), model.id.desc())
+        else:
+            # Walk backwards from the boundary, then restore newest-first order
+            query = query.filter(key > boundary).order_by(model.created_at.asc(), model.id.asc())
+    else:
+        query = query.order_by(model.created_at.desc(), model.id.desc())
+        if skip:
+            query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == "prev":
+        rows.reverse()
+
+    if rows:
+        first, last = _entity(rows[0], model), _entity(rows[-1], model)
+        more_after = has_more if direction == "next" else True
+        more_before = bool(cursor or skip) if direction == "next" else has_more
+        if more_after:
+            response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last.created_at, last.id, "next")
+        if more_before:
+            response.headers[PREV_CURSOR_HEADER] = encode_cursor(first.created_at, first.id, "prev")
+    return rows
+
+
+def _entity(row: Any, model: Any) -> Any:
+    """Rows of multi-entity queries are tuples; find the paginated entity in them"""
+    if isinstance(row, model):
+        return row
+    return next(item for item in row if isinstance(item, model))
@@ -4,7 +4,8 @@ from typing import List
 from pydantic import BaseModel
 from app import models
 from app.api import deps
-from app.password_utils import validate_password_strength, hash_password
+from app.password_utils import validate_password_strength, hash_password, get_password_pool
+from app.services.principal_cache import Principal, invalidate_principal
 
 router = APIRouter()
 
@@ -34,7 +35,7 @@ class UserResponse(BaseModel):
 
 @router.get("/users", response_model=List[UserResponse])
 def get_users(
-    current_user: models.User = Depends(deps.require_admin),
+    current_user: Principal = Depends(deps.require_admin),
     db_session: Session = Depends(deps.get_session)
 ):
     """
@@ -57,7 +58,7 @@ def get_users(
 @router.post("/users", response_model=UserResponse)
 def create_user(
     user_data: UserCreateRequest,
-    current_user: models.User = Depends(deps.require_admin),
+    current_user: Principal = Depends(deps.require_admin),
     db_session: Session = Depends(deps.get_session)
 ):
     """
@@ -87,7 +88,8 @@ def create_user(
         )
 
     user_id = generate_id("usr")
-    hashed_password = hash_password(user_data.password)
+    # Bounded by the bcrypt pool rather than the request threadpool
+    hashed_password = get_password_pool().submit(hash_password, user_data.password).result()
 
     # Use the same tenant_id as the admin creating the user
     tenant_id = current_user.tenant_id
@@ -118,7 +120,7 @@ def create_user(
 def update_user(
     user_id: str,
     user_data: UserUpdateRequest,
-    current_user: models.User = Depends(deps.require_admin),
+    current_user: Principal = Depends(deps.require_admin),
     db_session: Session = Depends(deps.get_session)
 ):
     """
@@ -146,6 +148,7 @@ def update_user(
         db_user.is_active = user_data.is_active
 
     db_session.commit()
+    invalidate_principal(db_user.id)
     db_session.refresh(db_user)
 
     return UserResponse(
@@ -161,7 +164,7 @@ def update_user(
 @router.delete("/users/{user_id}")
 def delete_user(
     user_id: str,
-    current_user: models.User = Depends(deps.require_admin),
+    current_user: Principal = Depends(deps.require_admin),
     db_session: Session = Depends(deps.get_session)
 ):
     """
@@ -177,5 +180,6 @@ def delete_user(
 
     db_session.delete(db_user)
     db_session.commit()
+    invalidate_principal(user_id)
 
     return {"message": "User deleted successfully"}
\ No newline at end of file
@@ -1,11 +1,13 @@
 import os  # <--- Added Import
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 from app import models
 from app.api import deps
 from app.auth_utils import authenticate_user, create_access_token, create_refresh_token, ACCESS_TOKEN_EXPIRE_MINUTES, verify_refresh_token
-from app.password_utils import validate_password_strength, hash_password
+from app.password_utils import validate_password_strength, hash_password_async
+from app.services.principal_cache import Principal, get_principal_cache
 
 router = APIRouter()
 from pydantic import BaseModel
@@ -35,8 +37,8 @@ def generate_id(prefix: str = "id") -> str:
     return f"{prefix}_{secrets.token_hex(8)}"
 
 @router.post("/auth/token", response_model=TokenResponse)
-async def login_for_access_token(form_data: TokenRequest, db_session: Session = Depends(deps.get_session)):
-    user = authenticate_user(db_session, form_data.email, form_data.password)
+async def login_for_access_token(form_data: TokenRequest, db_session: AsyncSession = Depends(deps.get_async_session)):
+    user = await authenticate_user(db_session, form_data.email, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -45,7 +47,7 @@ async def login_for_access_token(form_data: TokenRequest, db_session: Session =
         )
     
     user.last_login_at = models.datetime.utcnow()
-    db_session.commit()
+    await db_session.commit()
     
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
@@ -61,7 +63,7 @@ class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
 @router.post("/auth/refresh", response_model=TokenResponse)
-async def refresh_access_token(refresh_token_data: RefreshTokenRequest, db_session: Session = Depends(deps.get_session)):
+async def refresh_access_token(refresh_token_data: RefreshTokenRequest, db_session: AsyncSession = Depends(deps.get_async_session)):
     try:
         payload = verify_refresh_token(refresh_token_data.refresh_token)
         user_id = payload.get("sub")
@@ -72,7 +74,7 @@ async def refresh_access_token(refresh_token_data: RefreshTokenRequest, db_sessi
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        user = db_session.query(models.User).filter(models.User.id == user_id).first()
+        user = await db_session.get(models.User, user_id)
         if user is None or not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -99,8 +101,8 @@ async def refresh_access_token(refresh_token_data: RefreshTokenRequest, db_sessi
         )
 
 @router.post("/auth/register", response_model=UserResponse)
-async def register_user(user_data: UserCreateRequest, db_session: Session = Depends(deps.get_session)):
-    existing_user = db_session.query(models.User).filter(models.User.email == user_data.email).first()
+async def register_user(user_data: UserCreateRequest, db_session: AsyncSession = Depends(deps.get_async_session)):
+    existing_user = await db_session.scalar(select(models.User.id).where(models.User.email == user_data.email).limit(1))
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -115,7 +117,7 @@ async def register_user(user_data: UserCreateRequest, db_session: Session = Depe
         )
 
     user_id = generate_id("usr")
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password_async(user_data.password)
     
     # CRITICAL CHANGE: Use env variable first, fallback to unique ID only if env is missing
     # This aligns the user with the "Ghost Session" fallback logic
@@ -129,8 +131,8 @@ async def register_user(user_data: UserCreateRequest, db_session: Session = Depe
         tenant_id=tenant_id
     )
     db_session.add(db_user)
-    db_session.commit()
-    db_session.refresh(db_user)
+    await db_session.commit()
+    await db_session.refresh(db_user)
     
     return UserResponse(
         id=db_user.id,
@@ -140,10 +142,15 @@ async def register_user(user_data: UserCreateRequest, db_session: Session = Depe
     )
 
 @router.get("/auth/me", response_model=UserResponse)
-async def read_users_me(current_user: models.User = Depends(deps.get_current_user)):
+async def read_users_me(current_user: Principal = Depends(deps.get_current_user)):
     return UserResponse(
         id=current_user.id,
         email=current_user.email,
         name=current_user.name,
         role=current_user.role.value
-    )
\ No newline at end of file
+    )
+
+@router.get("/auth/cache/stats")
+def principal_cache_stats(_: Principal = Depends(deps.require_admin)):
+    """Hit/miss counters of the authenticated principal cache"""
+    return get_principal_cache().stats()
@@ -3,6 +3,8 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from app import models
 from app.api import deps
+from app.services.kpi_rollup_service import mark_kpis_dirty
+from app.services.dashboard_cache import invalidate_dashboard
 from pydantic import BaseModel
 from datetime import datetime, timezone
 
@@ -74,6 +76,8 @@ def create_booking(booking_in: BookingCreateRequest, tenant_id: str = Depends(de
     db_session.add(db_booking)
     db_session.commit()
     db_session.refresh(db_booking)
+    mark_kpis_dirty(tenant_id, db_booking.created_at)
+    invalidate_dashboard(tenant_id)
     return format_booking(db_booking)
 
 @router.get("/bookings", response_model=List[dict])
@@ -94,6 +98,7 @@ def update_booking_status(booking_id: str, body: BookingStatusUpdateRequest, ten
     
     booking.status = body.status
     db_session.commit()
+    invalidate_dashboard(tenant_id)
     db_session.refresh(booking)
     return {"message": "Booking status updated successfully", "id": booking.id, "new_status": booking.status.value}
 
@@ -121,6 +126,7 @@ def update_booking_general(
             setattr(booking, field, value)
             
     db_session.commit()
+    invalidate_dashboard(tenant_id)
     db_session.refresh(booking)
     return format_booking(booking)
 
@@ -135,6 +141,9 @@ def delete_booking(
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
         
+    created_at = booking.created_at
     db_session.delete(booking)
     db_session.commit()
+    mark_kpis_dirty(tenant_id, created_at)
+    invalidate_dashboard(tenant_id)
     return {"message": "Booking deleted successfully"}
\ No newline at end of file
@@ -6,9 +6,10 @@ API endpoints for managing bulk call scripts, campaigns, and results
 import logging
 from typing import List, Optional
 from datetime import datetime, timezone
-from fastapi import APIRouter, Depends, HTTPException, Request, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, Request
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.api import deps
 from app import models
@@ -16,8 +17,10 @@ from app.services.bulk_call_service import (
     BulkCallScriptService,
     BulkCallCampaignService,
     BulkCallResultService,
-    BulkCallExecutionService
+    CallStatusIngestService
 )
+from app.services.campaign_queue import CampaignJobQueue
+from app.services.call_status_buffer import get_call_status_buffer
 
 logger = logging.getLogger(__name__)
 
@@ -300,13 +303,12 @@ def delete_script(
 @router.post("/campaigns/bulk", response_model=CampaignResponse)
 def create_bulk_campaign(
     request: CampaignCreateRequest,
-    background_tasks: BackgroundTasks,
     req: Request,
     db: Session = Depends(deps.get_session),
     tenant_id: str = Depends(deps.get_current_tenant_id),
     _=Depends(deps.get_current_user)
 ):
-    """Create and execute a new bulk call campaign"""
+    """Create a new bulk call campaign and queue it for execution"""
     logger.info(f"Creating bulk campaign: {request.name} for {len(request.customer_ids)} customers")
     
     # Generate campaign name from request or use timestamp
@@ -330,25 +332,12 @@ def create_bulk_campaign(
     if request.script_id:
         BulkCallScriptService.increment_usage(db, request.script_id)
     
-    # Execute campaign in background
-    def execute_campaign_task():
-        try:
-            webhook_base_url = str(req.base_url).rstrip('/')
-            BulkCallExecutionService.execute_campaign(
-                db=db,
-                campaign_id=campaign.id,
-                tenant_id=tenant_id,
-                webhook_base_url=webhook_base_url
-            )
-        except Exception as e:
-            logger.error(f"❌ Campaign execution failed: {e}")
-            BulkCallCampaignService.update_campaign_status(
-                db,
-                campaign.id,
-                models.BulkCallStatusEnum.failed
-            )
-    
-    background_tasks.add_task(execute_campaign_task)
+    # Hand the campaign to the job queue; a campaign worker claims and dials it
+    campaign = CampaignJobQueue.enqueue(
+        db,
+        campaign,
+        webhook_base_url=str(req.base_url).rstrip('/')
+    )
     
     return CampaignResponse(
         id=campaign.id,
@@ -549,8 +538,7 @@ def delete_bulk_campaign(
 
 @router.post("/webhooks/twilio/status")
 async def twilio_status_webhook(
-    request: Request,
-    db: Session = Depends(deps.get_session)
+    request: Request
 ):
     """
     Receive status updates from Twilio for outbound calls
@@ -568,37 +556,18 @@ async def twilio_status_webhook(
         
         logger.info(f"📞 Received Twilio webhook: {call_sid} - {call_status}")
         
-        # Find result by Twilio Call SID
-        result = db.query(models.BulkCallResult).filter_by(
-            twilio_call_sid=call_sid
-        ).first()
+        # Acknowledge right away; the status buffer writes the event in the next batch
+        buffer = get_call_status_buffer()
+        if buffer and buffer.submit(call_sid, call_status, sequence=data.get('SequenceNumber')):
+            return {"status": "ok"}
         
-        if not result:
+        ingested = await run_in_threadpool(CallStatusIngestService.ingest_status_now, call_sid, call_status)
+        
+        if not ingested["result_id"]:
             logger.warning(f"⚠️ No result found for Twilio call SID: {call_sid}")
             return {"status": "ok"}  # Return OK to avoid retries
         
-        # Map Twilio status to our status
-        status_mapping = {
-            'queued': models.BulkCallResultStatusEnum.queued,
-            'ringing': models.BulkCallResultStatusEnum.in_progress,
-            'in-progress': models.BulkCallResultStatusEnum.in_progress,
-            'completed': models.BulkCallResultStatusEnum.success,
-            'failed': models.BulkCallResultStatusEnum.failed,
-            'busy': models.BulkCallResultStatusEnum.busy,
-            'no-answer': models.BulkCallResultStatusEnum.no_answer
-        }
-        
-        new_status = status_mapping.get(call_status, models.BulkCallResultStatusEnum.in_progress)
-        
-        # Update result status
-        BulkCallResultService.update_result_status(
-            db=db,
-            result_id=result.id,
-            status=new_status,
-            twilio_status=call_status
-        )
-        
-        logger.info(f"✅ Updated result {result.id} status to {new_status.value}")
+        logger.info(f"✅ Updated result {ingested['result_id']} status to {ingested['result_status']}")
         
         return {"status": "ok"}
         
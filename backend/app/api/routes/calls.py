@@ -1,19 +1,34 @@
+import json
 import logging
 import os
-from fastapi import APIRouter, Depends, HTTPException
+import time
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
-from sqlalchemy import select
-from typing import List, Optional
-from datetime import datetime, timezone
-from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Dict, Iterator, List, Optional
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
 from app import models
 from app.api import deps
+from app.api.pagination import paginate
 from app.services.voice import session_service
 from app.services.twilio_service import get_twilio_service
+from app.services.kpi_rollup_service import mark_kpis_dirty
+from app.services.live_events import publish_session_event
+from app.services.call_feed_service import feed_row, refresh_call_feed, upsert_call_feed
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Customer ids per IN (...) lookup of POST /calls/bulk
+BULK_CALLS_LOOKUP_CHUNK = 5000
+# Bulk responses with more results than this are streamed, this many results per chunk
+BULK_CALLS_STREAM_THRESHOLD = int(os.getenv("BULK_CALLS_STREAM_THRESHOLD", "1000"))
+BULK_CALLS_STREAM_CHUNK = 1000
+
 def generate_id(prefix: str = "call") -> str:
     import secrets
     return f"{prefix}_{secrets.token_hex(8)}"
@@ -33,6 +48,8 @@ class BulkCallRequest(BaseModel):
     custom_system_prompt: Optional[str] = None
 
 class CallResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     conversation_id: str
     customer_id: Optional[str]
@@ -54,7 +71,7 @@ class CallResponse(BaseModel):
 async def create_call(
     call_in: CallCreateRequest,
     tenant_id: str = Depends(deps.get_current_tenant_id),
-    db_session: Session = Depends(deps.get_session),
+    db_session: AsyncSession = Depends(deps.get_async_session),
     _=Depends(deps.get_current_user)
 ):
     # Real DB Logic
@@ -68,10 +85,10 @@ async def create_call(
         customer_id=call_in.customer_id,
         summary="Outbound Call Initiated",
         ai_or_human=models.AIOrHumanEnum.Human if call_in.agent_type == "human" else models.AIOrHumanEnum.AI,
-        created_at=datetime.now(timezone.utc)
+        created_at=datetime.utcnow()
     )
     db_session.add(conversation)
-    db_session.flush()
+    await db_session.flush()
 
     # 2. Create Call Record
     db_call = models.Call(
@@ -80,12 +97,13 @@ async def create_call(
         conversation_id=conversation.id,
         direction=call_in.direction,
         status="connected",
-        created_at=datetime.now(timezone.utc),
+        created_at=datetime.utcnow(),
         ai_or_human=models.AIOrHumanEnum.Human if call_in.agent_type == "human" else models.AIOrHumanEnum.AI
     )
     db_session.add(db_call)
-    db_session.commit()
-    db_session.refresh(db_call)
+    await refresh_call_feed(db_session, [conversation.id])
+    await db_session.commit()
+    await db_session.refresh(db_call)
 
     return CallResponse(
         id=db_call.id,
@@ -104,11 +122,19 @@ async def create_call(
         session_status=None
     )
 
+def _stream_bulk_response(summary: Dict[str, Any], results: List[Dict[str, Any]]) -> Iterator[bytes]:
+    """The bulk response document, serialized a chunk of results at a time"""
+    yield (json.dumps(summary)[:-1] + ', "results": [').encode("utf-8")
+    for start in range(0, len(results), BULK_CALLS_STREAM_CHUNK):
+        chunk = ",".join(json.dumps(result) for result in results[start:start + BULK_CALLS_STREAM_CHUNK])
+        yield (("," if start else "") + chunk).encode("utf-8")
+    yield b"]}"
+
 @router.post("/calls/bulk")
 async def create_bulk_calls(
     body: BulkCallRequest,
     tenant_id: str = Depends(deps.get_current_tenant_id),
-    db_session: Session = Depends(deps.get_session),
+    db_session: AsyncSession = Depends(deps.get_async_session),
     _=Depends(deps.get_current_user)
 ):
     """
@@ -119,155 +145,108 @@ async def create_bulk_calls(
     - Concurrent call execution with rate limiting
     - System prompt override while preserving knowledge base
     - Progress tracking and result aggregation
+
+    Set-based: customers are looked up with IN (...) queries, and conversations,
+    calls and feed rows are written with one bulk insert each. Responses with
+    more than BULK_CALLS_STREAM_THRESHOLD results are streamed.
     """
+    started = time.perf_counter()
     logger.info(f"🚀 Starting bulk call campaign for {len(body.customer_ids)} customers")
     logger.info(f"   Agent Type: {body.agent_type}")
     logger.info(f"   Concurrency Limit: {body.concurrency_limit}")
     logger.info(f"   Use Knowledge Base: {body.use_knowledge_base}")
     logger.info(f"   Has Custom Script: {bool(body.script_content)}")
     logger.info(f"   Has Custom System Prompt: {bool(body.custom_system_prompt)}")
-    
-    # Store campaign configuration for call execution
-    campaign_config = {
-        "script_content": body.script_content,
-        "agent_type": body.agent_type,
-        "use_knowledge_base": body.use_knowledge_base,
-        "custom_system_prompt": body.custom_system_prompt,
-        "concurrency_limit": body.concurrency_limit,
-    }
-    
-    created_count = 0
-    results = []
-    
-    # Process customers in batches for concurrent execution
-    import asyncio
-    from concurrent.futures import ThreadPoolExecutor
-    
-    async def process_customer_batch(customer_batch: List[str]):
-        """Process a batch of customers concurrently"""
-        batch_results = []
-        for cust_id in customer_batch:
-            customer = db_session.query(models.Customer).filter(
-                models.Customer.id == cust_id
-            ).first()
-            
-            if not customer:
-                logger.warning(f"❌ Customer {cust_id} not found")
-                batch_results.append({
-                    "customer_id": cust_id,
-                    "status": "failed",
-                    "error": "Customer not found"
-                })
-                continue
-            
-            # Create Conversation
-            conv = models.Conversation(
-                id=f"conv_{generate_id()[5:]}",
-                tenant_id=tenant_id,
-                channel=models.ChannelEnum.voice,
-                customer_id=cust_id,
-                summary=f"Bulk Outbound Campaign: {body.script_content[:100] if body.script_content else 'Default marketing script'}",
-                ai_or_human=models.AIOrHumanEnum.AI,
-                created_at=datetime.now(timezone.utc)
-            )
-            db_session.add(conv)
-            db_session.flush()
-            
-            # Create Call
-            call = models.Call(
-                id=generate_id(),
-                tenant_id=tenant_id,
-                conversation_id=conv.id,
-                direction="outbound",
-                status="queued",  # Initial status
-                ai_or_human=models.AIOrHumanEnum.AI,
-                created_at=datetime.now(timezone.utc)
+
+    # 1. Resolve every customer of the tenant with a few IN (...) lookups
+    customers = {}
+    unique_ids = list(dict.fromkeys(body.customer_ids))
+    for start in range(0, len(unique_ids), BULK_CALLS_LOOKUP_CHUNK):
+        rows = await db_session.execute(
+            select(models.Customer.id, models.Customer.name, models.Customer.phone).where(
+                models.Customer.tenant_id == tenant_id,
+                models.Customer.id.in_(unique_ids[start:start + BULK_CALLS_LOOKUP_CHUNK])
             )
-            db_session.add(call)
-            
-            # Store campaign metadata in call for later execution
-            # In production, this would be stored in a separate CampaignCalls table
-            batch_results.append({
-                "call_id": call.id,
+        )
+        customers.update({row.id: row for row in rows})
+
+    # 2. Build the rows with client-generated ids, in request order
+    now = datetime.utcnow()
+    conversation_summary = f"Bulk Outbound Campaign: {body.script_content[:100] if body.script_content else 'Default marketing script'}"
+    conversations, calls, feed_rows, results = [], [], [], []
+    for cust_id in body.customer_ids:
+        customer = customers.get(cust_id)
+        if customer is None:
+            results.append({
                 "customer_id": cust_id,
-                "customer_name": customer.name,
-                "phone": customer.phone,
-                "status": "queued",
-                "conversation_id": conv.id
+                "status": "failed",
+                "error": "Customer not found"
             })
-            
-            created_count += 1
-        
-        return batch_results
-    
-    # Split customers into batches based on concurrency limit
-    customer_batches = [
-        body.customer_ids[i:i + body.concurrency_limit]
-        for i in range(0, len(body.customer_ids), body.concurrency_limit)
-    ]
-    
-    logger.info(f"📊 Processing {len(customer_batches)} batches with {body.concurrency_limit} concurrent calls each")
-    
-    # Process each batch
-    for batch_idx, batch in enumerate(customer_batches, 1):
-        logger.info(f"🔄 Processing batch {batch_idx}/{len(customer_batches)}")
-        batch_results = await process_customer_batch(batch)
-        results.extend(batch_results)
-        logger.info(f"✅ Batch {batch_idx} completed: {len(batch_results)} calls queued")
-    
-    db_session.commit()
-    
-    logger.info(f"✅ Bulk call campaign created successfully: {created_count} calls queued")
-    
-    return {
+            continue
+
+        conv_id = f"conv_{generate_id()[5:]}"
+        conversations.append({
+            "id": conv_id,
+            "tenant_id": tenant_id,
+            "channel": models.ChannelEnum.voice,
+            "customer_id": cust_id,
+            "summary": conversation_summary,
+            "ai_or_human": models.AIOrHumanEnum.AI,
+            "created_at": now,
+        })
+        call = {
+            "id": generate_id(),
+            "tenant_id": tenant_id,
+            "conversation_id": conv_id,
+            "direction": models.CallDirectionEnum.outbound,
+            "status": models.CallStatusEnum.queued,
+            "outcome": models.CallOutcomeEnum.info,
+            "ai_or_human": models.AIOrHumanEnum.AI,
+            "handle_sec": None,
+            "recording_url": None,
+            "created_at": now,
+        }
+        calls.append(call)
+        # Nothing to join yet: the feed row is known from what is being created
+        feed_rows.append(feed_row(call, cust_id, customer.name))
+        results.append({
+            "call_id": call["id"],
+            "customer_id": cust_id,
+            "customer_name": customer.name,
+            "phone": customer.phone,
+            "status": "queued",
+            "conversation_id": conv_id
+        })
+
+    missing = len(body.customer_ids) - len(calls)
+    if missing:
+        logger.warning(f"❌ {missing} customers not found")
+
+    # 3. One bulk insert per table, committed together
+    if calls:
+        await db_session.execute(insert(models.Conversation), conversations)
+        await db_session.execute(insert(models.Call), calls)
+        await upsert_call_feed(db_session, feed_rows)
+        await db_session.commit()
+
+    created_count = len(calls)
+    logger.info(f"✅ Bulk call campaign created successfully: {created_count} calls queued in {time.perf_counter() - started:.2f}s")
+
+    summary = {
         "status": "success",
         "message": f"Bulk call campaign created with {created_count} calls queued for execution.",
         "created_count": created_count,
         "initiated_calls": created_count,  # For backward compatibility
         "total_customers": len(body.customer_ids),
-        "results": results,
         "campaign_config": {
             "agent_type": body.agent_type,
             "concurrency_limit": body.concurrency_limit,
             "use_knowledge_base": body.use_knowledge_base
         }
     }
-    for cust_id in body.customer_ids:
-        customer = db_session.query(models.Customer).filter(models.Customer.id == cust_id).first()
-        if not customer: continue
-
-        # Create Conversation
-        conv = models.Conversation(
-            id=f"conv_{generate_id()[5:]}",
-            tenant_id=tenant_id,
-            channel=models.ChannelEnum.voice,
-            customer_id=cust_id,
-            summary="Bulk Outbound Campaign",
-            ai_or_human=models.AIOrHumanEnum.AI,
-            created_at=datetime.now(timezone.utc)
-        )
-        db_session.add(conv)
-        db_session.flush()
-
-        # Create Call
-        call = models.Call(
-            id=generate_id(),
-            tenant_id=tenant_id,
-            conversation_id=conv.id,
-            direction="outbound",
-            status="connected", # Simulating immediate connection
-            ai_or_human=models.AIOrHumanEnum.AI,
-            created_at=datetime.now(timezone.utc)
-        )
-        db_session.add(call)
-        created_count += 1
-
-    db_session.commit()
-    return {
-        "status": "success",
-        "message": f"Created {created_count} real call records.",
-        "created_count": created_count
-    }
+    if len(results) > BULK_CALLS_STREAM_THRESHOLD:
+        return StreamingResponse(_stream_bulk_response(summary, results), media_type="application/json")
+    return {**summary, "results": results}
 
 @router.get("/calls/{call_id}", response_model=CallResponse)
 def get_call(
@@ -277,89 +256,33 @@ def get_call(
     _=Depends(deps.get_current_user)
 ):
     logger.info(f"📞 Fetching specific call: {call_id} for tenant {tenant_id}")
-    # Find the call by ID and join with conversation to get customer_id and voice session for additional data
-    call_result = db_session.query(models.Call, models.Conversation.customer_id, models.Customer.name, models.VoiceSession)\
-        .outerjoin(models.Conversation, models.Call.conversation_id == models.Conversation.id)\
-        .outerjoin(models.Customer, models.Conversation.customer_id == models.Customer.id)\
-        .outerjoin(models.VoiceSession, models.Call.conversation_id == models.VoiceSession.conversation_id)\
-        .filter(models.Call.id == call_id, models.Call.tenant_id == tenant_id)\
-        .first()
-
-    if not call_result:
+    # The feed row already holds the customer, voice session and recording fields
+    row = db_session.query(models.CallFeed).filter(models.CallFeed.id == call_id, models.CallFeed.tenant_id == tenant_id).first()
+
+    if not row:
         logger.warning(f"❌ Call {call_id} not found for tenant {tenant_id}")
         raise HTTPException(status_code=404, detail="Call not found")
 
-    c, customer_id, customer_name, vs = call_result
-
-    has_recording = bool(c.recording_url or (vs.recording_url if vs else None))
-    logger.info(f"📋 Call {call_id} data - Recording: {has_recording}, Voice Session: {bool(vs)}, Intent: {vs.extracted_intent if vs else 'None'}")
-
-    response = CallResponse(
-        id=c.id,
-        conversation_id=c.conversation_id,
-        customer_id=customer_id,
-        customer_name=customer_name,
-        direction=c.direction.value if hasattr(c.direction, 'value') else str(c.direction),
-        status=c.status.value if hasattr(c.status, 'value') else str(c.status),
-        outcome=c.outcome.value if hasattr(c.outcome, 'value') and c.outcome else None,
-        created_at=c.created_at,
-        handle_sec=c.handle_sec,
-        recording_url=c.recording_url or (vs.recording_url if vs else None),  # Use recording URL from either call or voice session
-        voice_session_id=getattr(c, 'voice_session_id', None) or (vs.id if vs else None),  # Use voice session ID from either source
-        extracted_intent=vs.extracted_intent if vs else None,
-        summary=vs.summary if vs else None,
-        agent_name=vs.agent_name if vs else None,
-        session_status=vs.status.value if vs and hasattr(vs.status, 'value') else (vs.status if vs else None)
-    )
-
-    logger.info(f"✅ Call {call_id} response prepared - Recording URL: {has_recording}")
-    return response
+    logger.info(f"📋 Call {call_id} data - Recording: {bool(row.recording_url)}, Voice Session: {bool(row.voice_session_id)}, Intent: {row.extracted_intent}")
+    return CallResponse.model_validate(row)
 
 @router.get("/calls", response_model=List[CallResponse])
 def get_calls(
+    response: Response,
     tenant_id: str = Depends(deps.get_current_tenant_id),
     db_session: Session = Depends(deps.get_session),
     _=Depends(deps.get_current_user),
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100
 ):
     logger.info(f"📞 Fetching calls for tenant {tenant_id}, limit: {limit}")
-    results = db_session.query(models.Call, models.Conversation.customer_id, models.Customer.name, models.VoiceSession)\
-        .outerjoin(models.Conversation, models.Call.conversation_id == models.Conversation.id)\
-        .outerjoin(models.Customer, models.Conversation.customer_id == models.Customer.id)\
-        .outerjoin(models.VoiceSession, models.Call.conversation_id == models.VoiceSession.conversation_id)\
-        .filter(models.Call.tenant_id == tenant_id)\
-        .order_by(models.Call.created_at.desc())\
-        .offset(skip).limit(limit).all()
-
-    calls_with_recording = [c for c, _, _, _ in results if c.recording_url]
-    calls_with_voice_session = [c for c, _, _, vs in results if vs]
-
-    logger.info(f"📊 Found {len(results)} calls total, {len(calls_with_recording)} with recording URLs, {len(calls_with_voice_session)} with voice session data")
-
-    call_responses = [
-        CallResponse(
-            id=c.id,
-            conversation_id=c.conversation_id,
-            customer_id=cid,
-            customer_name=cust_name,
-            direction=c.direction.value if hasattr(c.direction, 'value') else str(c.direction),
-            status=c.status.value if hasattr(c.status, 'value') else str(c.status),
-            outcome=c.outcome.value if hasattr(c.outcome, 'value') and c.outcome else None,
-            created_at=c.created_at,
-            handle_sec=c.handle_sec,
-            recording_url=c.recording_url or (vs.recording_url if vs else None),  # Use recording URL from either call or voice session
-            voice_session_id=getattr(c, 'voice_session_id', None) or (vs.id if vs else None),  # Use voice session ID from either source
-            extracted_intent=vs.extracted_intent if vs else None,
-            summary=vs.summary if vs else None,
-            agent_name=vs.agent_name if vs else None,
-            session_status=vs.status.value if vs and hasattr(vs.status, 'value') else (vs.status if vs else None)
-        )
-        for c, cid, cust_name, vs in results
-    ]
+    # One range scan of ix_call_feed_tenant_created_at_id, no joins
+    query = db_session.query(models.CallFeed).filter(models.CallFeed.tenant_id == tenant_id)
+    results = paginate(query, models.CallFeed, response, cursor=cursor, limit=limit, skip=skip)
 
-    logger.info(f"✅ Returning {len(call_responses)} call responses with various data points")
-    return call_responses
+    logger.info(f"✅ Returning {len(results)} calls")
+    return [CallResponse.model_validate(row) for row in results]
 
 
 # ============================================================================
@@ -385,7 +308,7 @@ class OutboundCallResponse(BaseModel):
 async def initiate_outbound_call(
     call_request: OutboundCallRequest,
     tenant_id: str = Depends(deps.get_current_tenant_id),
-    db_session: Session = Depends(deps.get_session),
+    db_session: AsyncSession = Depends(deps.get_async_session),
     _=Depends(deps.get_current_user)
 ):
     """
@@ -406,7 +329,7 @@ async def initiate_outbound_call(
     if not twilio_service.is_configured():
         logger.warning("⚠️ Twilio not configured - creating session only (simulation mode)")
         # Create session without actual call
-        session = session_service.create_voice_session(
+        session = await session_service.create_voice_session(
             db_session=db_session,
             agent_type=call_request.agent_type,
             customer_id=call_request.customer_id,
@@ -424,7 +347,7 @@ async def initiate_outbound_call(
     
     # Step 1: Create VoiceSession record
     try:
-        session = session_service.create_voice_session(
+        session = await session_service.create_voice_session(
             db_session=db_session,
             agent_type=call_request.agent_type,
             customer_id=call_request.customer_id,
@@ -441,8 +364,9 @@ async def initiate_outbound_call(
         # Get webhook URL from environment
         webhook_url = os.getenv("API_URL", "http://localhost:8000")
         
-        # Initiate the call
-        call_result = twilio_service.initiate_outbound_call(
+        # Initiate the call (the Twilio client is blocking HTTP)
+        call_result = await run_in_threadpool(
+            twilio_service.initiate_outbound_call,
             to_phone=call_request.phone,
             session_id=session.id,
             webhook_url=webhook_url,
@@ -469,7 +393,9 @@ async def initiate_outbound_call(
         
         # Update session status to failed
         session.status = models.VoiceSessionStatus.FAILED
-        db_session.commit()
+        await db_session.commit()
+        mark_kpis_dirty(session.tenant_id, session.created_at)
+        publish_session_event(session)
         
         raise HTTPException(
             status_code=500,
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timezone
@@ -6,6 +6,8 @@ from pydantic import BaseModel
 
 from app import models
 from app.api import deps
+from app.api.pagination import paginate
+from app.services.kpi_rollup_service import mark_kpis_dirty
 
 router = APIRouter()
 
@@ -57,6 +59,7 @@ def create_conversation(
     db_session.add(db_conv)
     db_session.commit()
     db_session.refresh(db_conv)
+    mark_kpis_dirty(tenant_id, db_conv.created_at)
 
     return ConversationResponse(
         id=db_conv.id,
@@ -68,22 +71,25 @@ def create_conversation(
 
 @router.get("/conversations", response_model=List[ConversationResponse])
 def get_conversations(
+    response: Response,
     tenant_id: str = Depends(deps.get_current_tenant_id),
     customer_id: str = None,
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
     db_session: Session = Depends(deps.get_session),
     _=Depends(deps.get_current_user)
 ):
     """
-    Retrieve a list of conversations.
+    Retrieve a list of conversations, newest first.
+    Pass the X-Next-Cursor / X-Prev-Cursor response header back as ``cursor`` to page.
     """
     query = db_session.query(models.Conversation).filter(models.Conversation.tenant_id == tenant_id)
 
     if customer_id:
         query = query.filter(models.Conversation.customer_id == customer_id)
 
-    conversations = query.offset(skip).limit(limit).all()
+    conversations = paginate(query, models.Conversation, response, cursor=cursor, limit=limit, skip=skip)
 
     # Convert to response format
     result = []
@@ -1,10 +1,16 @@
 # backend/app/api/routes/customers.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from app import models, schemas
 from app.api import deps
+from app.api.pagination import paginate
+from app.phone_utils import to_e164
+from app.search_utils import customer_search_text
+from app.services.call_feed_service import customer_name_update
+from app.services.customer_import_service import ImportFileError, detect_format, save_upload, submit_import
+from app.services.customer_search_service import search_customers
 
 router = APIRouter()
 
@@ -35,10 +41,14 @@ def create_customer(
                 detail=f"Invalid email format: {str(e)}"
             )
 
-    # Check if a customer with the same phone or email already exists
+    # Check if a customer of this tenant has the same phone (E.164) or email
+    phone_e164 = to_e164(customer_in.phone)
+    duplicate = (models.Customer.phone_e164 == phone_e164) if phone_e164 else (models.Customer.phone == customer_in.phone)
+    if customer_in.email:
+        duplicate = duplicate | (models.Customer.email == customer_in.email)
     existing_customer = db_session.query(models.Customer).filter(
-        (models.Customer.phone == customer_in.phone) |
-        (models.Customer.email == customer_in.email)
+        models.Customer.tenant_id == tenant_id,
+        duplicate
     ).first()
     if existing_customer:
         raise HTTPException(
@@ -50,6 +60,7 @@ def create_customer(
         id=generate_id(),
         name=customer_in.name,
         phone=customer_in.phone,
+        phone_e164=phone_e164,
         email=customer_in.email,
         tenant_id=tenant_id,
     )
@@ -60,18 +71,108 @@ def create_customer(
 
 @router.get("/customers", response_model=List[schemas.Customer])
 def get_customers(
+    response: Response,
     tenant_id: str = Depends(deps.get_current_tenant_id),
     db_session: Session = Depends(deps.get_session),
     _=Depends(deps.get_current_user),
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100
 ):
     """
-    Retrieve a list of customers.
+    Retrieve a list of customers, newest first.
+    Pass the X-Next-Cursor / X-Prev-Cursor response header back as ``cursor`` to page.
     """
-    customers = db_session.query(models.Customer).filter(models.Customer.tenant_id == tenant_id).offset(skip).limit(limit).all()
+    query = db_session.query(models.Customer).filter(models.Customer.tenant_id == tenant_id)
+    customers = paginate(query, models.Customer, response, cursor=cursor, limit=limit, skip=skip)
     return customers
 
+@router.get("/customers/search", response_model=List[schemas.Customer])
+def search_customers_route(
+    tenant_id: str = Depends(deps.get_current_tenant_id),
+    db_session: Session = Depends(deps.get_session),
+    _=Depends(deps.get_current_user),
+    q: str = Query(..., min_length=2, max_length=100),
+    limit: int = Query(20, ge=1, le=50)
+):
+    """
+    Search customers as you type: by phone prefix (0501..., +96650..., 00966...)
+    or by the starts of name/email words, ignoring case and Arabic diacritics,
+    hamza forms and taa marbuta. Results are unranked.
+    """
+    return search_customers(db_session, tenant_id, q, limit=limit)
+
+@router.post("/customers/imports", response_model=schemas.CustomerImportJob, status_code=202)
+def create_customer_import(
+    *,
+    tenant_id: str = Depends(deps.get_current_tenant_id),
+    db_session: Session = Depends(deps.get_session),
+    file: UploadFile = File(...),
+    current_user=Depends(deps.get_current_user)
+):
+    """
+    Import customers from a CSV, NDJSON or XLSX file in the background.
+    Columns: name, phone, email, neighborhoods, consent. Rows whose phone already
+    belongs to a customer of the tenant (or appears earlier in the file) are skipped.
+    Poll GET /customers/imports/{job_id} for progress.
+    """
+    file_format = detect_format(file.filename, file.content_type)
+    if file_format is None:
+        raise HTTPException(status_code=400, detail="Upload a .csv, .ndjson or .xlsx file.")
+    try:
+        path, total_rows = save_upload(file.file, file_format)
+    except ImportFileError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    job = models.CustomerImportJob(
+        id=generate_id("imp"),
+        tenant_id=tenant_id,
+        created_by=current_user.id,
+        filename=file.filename,
+        file_format=file_format,
+        total_rows=total_rows,
+        status=models.CustomerImportStatusEnum.queued,
+    )
+    db_session.add(job)
+    db_session.commit()
+    db_session.refresh(job)
+    submit_import(job.id, path)
+    return job
+
+@router.get("/customers/imports", response_model=List[schemas.CustomerImportJob])
+def get_customer_imports(
+    tenant_id: str = Depends(deps.get_current_tenant_id),
+    db_session: Session = Depends(deps.get_session),
+    _=Depends(deps.get_current_user),
+    limit: int = 20
+):
+    """
+    Retrieve the tenant's most recent customer imports.
+    """
+    return db_session.query(models.CustomerImportJob).filter(
+        models.CustomerImportJob.tenant_id == tenant_id
+    ).order_by(models.CustomerImportJob.created_at.desc()).limit(min(limit, 100)).all()
+
+@router.get("/customers/imports/{job_id}", response_model=schemas.CustomerImportJob)
+def get_customer_import(
+    job_id: str,
+    tenant_id: str = Depends(deps.get_current_tenant_id),
+    db_session: Session = Depends(deps.get_session),
+    _=Depends(deps.get_current_user)
+):
+    """
+    Retrieve a customer import's status and progress.
+    """
+    job = db_session.query(models.CustomerImportJob).filter(
+        models.CustomerImportJob.id == job_id, models.CustomerImportJob.tenant_id == tenant_id
+    ).first()
+    if not job:
+        raise HTTPException(
+            status_code=404,
+            detail="Import not found",
+        )
+    return job
+
 @router.get("/customers/{customer_id}", response_model=schemas.Customer)
 def get_customer(
     customer_id: str,
@@ -111,9 +212,10 @@ def update_customer(
 
     # Check if phone or email conflicts with another customer
     if customer_in.phone:
+        phone_e164 = to_e164(customer_in.phone)
         conflicting_phone = db_session.query(models.Customer).filter(
             models.Customer.id != customer_id,
-            models.Customer.phone == customer_in.phone,
+            (models.Customer.phone_e164 == phone_e164) if phone_e164 else (models.Customer.phone == customer_in.phone),
             models.Customer.tenant_id == tenant_id
         ).first()
         if conflicting_phone:
@@ -138,6 +240,12 @@ def update_customer(
     update_data = customer_in.dict(exclude_unset=True)
     for field, value in update_data.items():
         setattr(customer, field, value)
+    if "phone" in update_data:
+        customer.phone_e164 = to_e164(customer.phone)
+    if "name" in update_data or "email" in update_data:
+        customer.search_text = customer_search_text(customer.name, customer.email)
+    if "name" in update_data:
+        db_session.execute(customer_name_update(customer.id, customer.name))
 
     db_session.commit()
     db_session.refresh(customer)
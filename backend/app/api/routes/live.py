@@ -0,0 +1,116 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from app import models
+from app.api import deps
+from app.services.live_events import get_live_event_broker
+from app.services.principal_cache import Principal
+
+router = APIRouter()
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Disable response buffering in nginx so events are flushed immediately
+    "X-Accel-Buffering": "no",
+}
+
+
+async def _active_sessions_snapshot(db: AsyncSession, tenant_id: str) -> dict:
+    sessions = (await db.execute(select(
+        models.VoiceSession.id,
+        models.VoiceSession.status,
+        models.VoiceSession.direction,
+        models.VoiceSession.customer_phone,
+        models.VoiceSession.created_at
+    ).where(
+        models.VoiceSession.tenant_id == tenant_id,
+        models.VoiceSession.status == models.VoiceSessionStatus.ACTIVE
+    ).order_by(models.VoiceSession.created_at.desc()))).all()
+    return {
+        "type": "snapshot",
+        "data": {
+            "active_sessions": [
+                {
+                    "session_id": s.id,
+                    "status": s.status.value,
+                    "direction": s.direction,
+                    "customer_phone": s.customer_phone,
+                    "created_at": s.created_at,
+                }
+                for s in sessions
+            ]
+        }
+    }
+
+
+async def _campaign_snapshot(db: AsyncSession, campaign_id: str, tenant_id: str) -> dict:
+    campaign = await db.scalar(select(models.BulkCallCampaign).where(
+        models.BulkCallCampaign.id == campaign_id,
+        models.BulkCallCampaign.tenant_id == tenant_id
+    ))
+    if not campaign:
+        raise HTTPException(status_code=404, detail="Campaign not found")
+    return {
+        "type": "snapshot",
+        "data": {
+            "campaign_id": campaign.id,
+            "status": campaign.status.value,
+            "total_calls": campaign.total_calls,
+            "completed_calls": campaign.completed_calls,
+            "failed_calls": campaign.failed_calls,
+            "successful_calls": campaign.successful_calls,
+            "progress": campaign.calculate_progress(),
+        }
+    }
+
+
+@router.get("/live/events")
+async def stream_live_events(
+    tenant_id: str = Depends(deps.get_current_tenant_id),
+    db: AsyncSession = Depends(deps.get_async_session)
+):
+    """
+    Server-sent events for the tenant: a ``snapshot`` of active sessions, then
+    ``session``, ``result`` and ``progress`` events as they happen.
+    """
+    broker = get_live_event_broker()
+    # Subscribe first so nothing between the snapshot and the subscription is lost
+    subscription = broker.subscribe(tenant_id)
+    try:
+        snapshot = await _active_sessions_snapshot(db, tenant_id)
+    except Exception:
+        broker.unsubscribe(subscription)
+        raise
+    finally:
+        # The stream can stay open for hours; do not hold a pooled connection
+        await db.close()
+    return StreamingResponse(broker.stream(subscription, snapshot), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/campaigns/bulk/{campaign_id}/events")
+async def stream_campaign_events(
+    campaign_id: str,
+    tenant_id: str = Depends(deps.get_current_tenant_id),
+    db: AsyncSession = Depends(deps.get_async_session)
+):
+    """
+    Server-sent events for one campaign: a ``snapshot`` of its counters, then
+    ``result`` events per call and ``progress`` events when counters move.
+    """
+    broker = get_live_event_broker()
+    subscription = broker.subscribe(tenant_id, campaign_id)
+    try:
+        snapshot = await _campaign_snapshot(db, campaign_id, tenant_id)
+    except Exception:
+        broker.unsubscribe(subscription)
+        raise
+    finally:
+        await db.close()
+    return StreamingResponse(broker.stream(subscription, snapshot), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+@router.get("/live/stats")
+def get_live_stats(_: Principal = Depends(deps.get_current_user)):
+    """Connection and delivery counters of the live event streams"""
+    return get_live_event_broker().stats()
@@ -3,6 +3,7 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from app import models
 from app.api import deps
+from app.services.dashboard_cache import invalidate_dashboard
 from pydantic import BaseModel
 from datetime import datetime, timezone
 
@@ -76,6 +77,7 @@ def create_ticket(ticket_in: TicketCreateRequest, tenant_id: str = Depends(deps.
     )
     db_session.add(db_ticket)
     db_session.commit()
+    invalidate_dashboard(tenant_id)
     db_session.refresh(db_ticket)
     return format_ticket(db_ticket)
 
@@ -97,6 +99,7 @@ def update_ticket_status(ticket_id: str, body: TicketStatusUpdateRequest, tenant
     
     ticket.status = body.status
     db_session.commit()
+    invalidate_dashboard(tenant_id)
     db_session.refresh(ticket)
     
     try:
@@ -124,6 +127,7 @@ def update_ticket_general(
             setattr(ticket, field, value)
             
     db_session.commit()
+    invalidate_dashboard(tenant_id)
     db_session.refresh(ticket)
     return format_ticket(ticket)
 
@@ -140,4 +144,5 @@ def delete_ticket(
         
     db_session.delete(ticket)
     db_session.commit()
+    invalidate_dashboard(tenant_id)
     return {"message": "Ticket deleted successfully"}
\ No newline at end of file
@@ -1,14 +1,10 @@
 import logging
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel
 from typing import List, Optional, Union, Dict, Any
 from app.api import deps
-from app.services.voice.elevenlabs_service import (
-    fetch_conversation_from_elevenlabs,
-    extract_transcript_from_conversation,
-    check_transcript_availability
-)
+from app.services.voice.transcript_service import load_transcript
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -24,43 +20,18 @@ class TranscriptResponse(BaseModel):
 async def get_transcript(
     conversation_id: str,
     tenant_id: str = Depends(deps.get_current_tenant_id),
-    db_session: Session = Depends(deps.get_session),
+    db_session: AsyncSession = Depends(deps.get_async_session),
     _=Depends(deps.get_current_user)
 ):
     """
-    Retrieve transcript for a specific conversation from ElevenLabs
+    Retrieve transcript for a specific conversation.
+    Served from the transcript store; fetched from ElevenLabs only on a miss.
     """
     logger.info(f"🔄 Transcript request received for conversation: {conversation_id}")
     try:
-        # Fetch conversation data from ElevenLabs
-        elevenlabs_data = await fetch_conversation_from_elevenlabs(conversation_id)
-
-        # Extract transcript (the availability check might be too restrictive)
-        transcript = extract_transcript_from_conversation(elevenlabs_data)
-        transcript_length = len(transcript)
-        is_available = transcript_length > 0  # Update availability based on actual extracted data
-
-        logger.info(f"📋 Transcript data: Available={is_available}, Entries={transcript_length} for conversation {conversation_id}")
-
-        # Get summary and intent from analysis
-        analysis = elevenlabs_data.get("analysis", {})
-        summary = analysis.get("transcript_summary") or analysis.get("call_summary_title")
-
-        # Handle extracted_intent which may be a string or dict
-        raw_intent = analysis.get("data_collection_results", {}).get("extracted_intent")
-        if isinstance(raw_intent, dict):
-            # Extract the value from dict if it's a complex object
-            extracted_intent = raw_intent.get("value") or raw_intent
-        else:
-            extracted_intent = raw_intent
-
-        response = TranscriptResponse(
-            conversation_id=conversation_id,
-            transcript=transcript,
-            summary=summary,
-            extracted_intent=extracted_intent,
-            is_available=is_available
-        )
+        response = TranscriptResponse(**await load_transcript(db_session, conversation_id, tenant_id))
+        transcript_length = len(response.transcript)
+        is_available = response.is_available
 
         logger.info(f"✅ Transcript response prepared: {transcript_length} entries, available={is_available} for conversation {conversation_id}")
         return response
@@ -83,19 +54,16 @@ async def get_transcript(
 async def get_transcript_text(
     conversation_id: str,
     tenant_id: str = Depends(deps.get_current_tenant_id),
-    db_session: Session = Depends(deps.get_session),
+    db_session: AsyncSession = Depends(deps.get_async_session),
     _=Depends(deps.get_current_user)
 ):
     """
     Retrieve transcript as plain text format
     """
     try:
-        # Fetch conversation data from ElevenLabs
-        elevenlabs_data = await fetch_conversation_from_elevenlabs(conversation_id)
-
-        # Extract transcript (don't rely solely on availability check)
-        transcript = extract_transcript_from_conversation(elevenlabs_data)
-        is_available = len(transcript) > 0
+        stored = await load_transcript(db_session, conversation_id, tenant_id)
+        transcript = stored["transcript"]
+        is_available = stored["is_available"]
 
         if not is_available:
             return {"text": "", "is_available": False}
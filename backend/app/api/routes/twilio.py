@@ -7,11 +7,17 @@ import logging
 import os
 from fastapi import APIRouter, Request, Response, Depends
 from fastapi.responses import PlainTextResponse
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from twilio.twiml.voice_response import VoiceResponse, Dial, Say
 
 from app.api import deps
 from app.services.voice import session_service
+from app.services.bulk_call_service import CallStatusIngestService
+from app.services.call_status_buffer import get_call_status_buffer
+from app.services.kpi_rollup_service import mark_kpis_dirty
+from app.services.live_events import publish_session_event
+from app.services.call_feed_service import session_status_update
 from app import models
 
 logger = logging.getLogger(__name__)
@@ -25,7 +31,7 @@ ELEVENLABS_PHONE_NUMBER = os.getenv("ELEVENLABS_PHONE_NUMBER")
 async def connect_to_elevenlabs(
     session_id: str,
     request: Request,
-    db: Session = Depends(deps.get_session)
+    db: AsyncSession = Depends(deps.get_async_session)
 ):
     """
     TwiML endpoint that returns instructions to connect the call to ElevenLabs
@@ -36,9 +42,7 @@ async def connect_to_elevenlabs(
     logger.info(f"📞 Twilio connect webhook received for session: {session_id}")
     
     # Fetch the voice session to validate it exists
-    session = db.query(models.VoiceSession).filter(
-        models.VoiceSession.id == session_id
-    ).first()
+    session = await db.get(models.VoiceSession, session_id)
     
     if not session:
         logger.error(f"❌ Voice session not found: {session_id}")
@@ -84,7 +88,7 @@ async def connect_to_elevenlabs(
 async def dial_status_callback(
     session_id: str,
     request: Request,
-    db: Session = Depends(deps.get_session)
+    db: AsyncSession = Depends(deps.get_async_session)
 ):
     """
     Called when the dial to ElevenLabs completes (answered, no-answer, busy, etc.)
@@ -95,9 +99,7 @@ async def dial_status_callback(
     logger.info(f"📞 Dial status for session {session_id}: {dial_call_status}")
     
     # Update session status based on dial result
-    session = db.query(models.VoiceSession).filter(
-        models.VoiceSession.id == session_id
-    ).first()
+    session = await db.get(models.VoiceSession, session_id)
     
     if session:
         if dial_call_status == "completed":
@@ -106,8 +108,11 @@ async def dial_status_callback(
         elif dial_call_status in ["no-answer", "busy", "failed"]:
             session.status = models.VoiceSessionStatus.FAILED
             logger.warning(f"⚠️ Session {session_id} failed: {dial_call_status}")
-        
-        db.commit()
+        await db.execute(session_status_update(session.id, session.status))
+
+        await db.commit()
+        mark_kpis_dirty(session.tenant_id, session.created_at)
+        publish_session_event(session)
     
     # Return empty TwiML (call is done)
     response = VoiceResponse()
@@ -118,8 +123,7 @@ async def dial_status_callback(
 @router.post("/twilio/status/{session_id}")
 async def call_status_callback(
     session_id: str,
-    request: Request,
-    db: Session = Depends(deps.get_session)
+    request: Request
 ):
     """
     Receives status updates from Twilio about the call progress
@@ -132,34 +136,11 @@ async def call_status_callback(
     
     logger.info(f"📞 Call status update: SID={call_sid}, Status={call_status}, Session={session_id}")
     
-    # Update voice session with call SID and status
-    session = db.query(models.VoiceSession).filter(
-        models.VoiceSession.id == session_id
-    ).first()
-    
-    if session:
-        # Store Twilio call SID
-        if not hasattr(session, 'twilio_call_sid'):
-            session.twilio_call_sid = call_sid
-        
-        # Update status based on call progress
-        if call_status == "ringing":
-            session.status = models.VoiceSessionStatus.ACTIVE
-            logger.info(f"📞 Phone ringing for session {session_id}")
-        
-        elif call_status == "answered":
-            session.status = models.VoiceSessionStatus.ACTIVE
-            logger.info(f"✅ Call answered for session {session_id}")
-        
-        elif call_status == "completed":
-            # Will be updated to COMPLETED when ElevenLabs webhook arrives
-            logger.info(f"✅ Call completed for session {session_id}")
-        
-        elif call_status in ["failed", "busy", "no-answer"]:
-            session.status = models.VoiceSessionStatus.FAILED
-            logger.warning(f"⚠️ Call failed for session {session_id}: {call_status}")
-        
-        db.commit()
+    # Update the voice session and, for campaign calls, the bulk call result.
+    # Events are batched by the status buffer; apply directly if it is off or full.
+    buffer = get_call_status_buffer()
+    if not buffer or not buffer.submit(call_sid, call_status, session_id, form_data.get("SequenceNumber")):
+        await run_in_threadpool(CallStatusIngestService.ingest_status_now, call_sid, call_status, session_id)
     
     # Return 200 OK to Twilio
     return {"status": "received"}
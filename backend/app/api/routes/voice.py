@@ -1,17 +1,23 @@
 import logging
 import json
-from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 from app import models
 from app.api import deps
+from app.db import AsyncSessionLocal
+from app.api.pagination import paginate
 from app.services.voice import (
     create_voice_session,
     verify_elevenlabs_webhook_signature,
-    process_webhook_payload
+    process_webhook_payload,
+    extract_conversation_id_from_payload
 )
+from app.services.voice.conversation_cache import get_conversation_cache
+from app.services.post_call_inbox import PostCallInboxQueue, notify_post_call_workers
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -40,18 +46,17 @@ class VoiceSessionResponse(BaseModel):
 
 @router.get("/voice/sessions", response_model=List[VoiceSessionResponse])
 def get_voice_sessions(
+    response: Response,
     tenant_id: str = Depends(deps.get_current_tenant_id),
     db_session: Session = Depends(deps.get_session),
     _=Depends(deps.get_current_user),
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100
 ):
-    sessions = db_session.query(models.VoiceSession)\
-        .filter(models.VoiceSession.tenant_id == tenant_id)\
-        .order_by(models.VoiceSession.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    query = db_session.query(models.VoiceSession)\
+        .filter(models.VoiceSession.tenant_id == tenant_id)
+    sessions = paginate(query, models.VoiceSession, response, cursor=cursor, limit=limit, skip=skip)
         
     return [
         VoiceSessionResponse(
@@ -72,17 +77,17 @@ def get_voice_sessions(
     ]
 
 @router.post("/voice/sessions", response_model=VoiceSessionResponse)
-def start_call(
+async def start_call(
     body: VoiceSessionRequest,
     tenant_id: str = Depends(deps.get_current_tenant_id),
     _=Depends(deps.get_current_user),
-    db: Session = Depends(deps.get_session)
+    db: AsyncSession = Depends(deps.get_async_session)
 ):
     try:
         cid = body.customer_id if body.customer_id and body.customer_id.strip() else None
         phone = body.customer_phone if body.customer_phone and body.customer_phone.strip() else None
         
-        session = create_voice_session(
+        session = await create_voice_session(
             db_session=db,
             agent_type=body.agent_type,
             customer_id=cid,
@@ -90,10 +95,6 @@ def start_call(
             customer_phone=phone
         )
         
-        # Double check commit status
-        db.commit()
-        db.refresh(session)
-        
         return VoiceSessionResponse(
             id=session.id,
             session_id=session.id,
@@ -109,8 +110,12 @@ def start_call(
 
 @router.post("/voice/post_call")
 async def webhook(request: Request):
+    """
+    Store the webhook in the post-call inbox and acknowledge it.
+    Processing (ElevenLabs fetch, customer, call and history records) is done
+    by the post-call workers; a redelivered webhook is acknowledged as a duplicate.
+    """
     logger.info("📡 WEBHOOK RECEIVED: /voice/post_call")
-    from app.api.deps import get_session
     
     try:
         body = await request.body()
@@ -122,23 +127,62 @@ async def webhook(request: Request):
                 logger.warning("⚠️ Invalid ElevenLabs Signature! Processing anyway for safety.")
         
         payload = json.loads(body.decode("utf-8"))
-        
-        # Get a fresh DB session
-        db = next(get_session())
-        try:
-            return await process_webhook_payload(db, payload)
-        finally:
-            db.close()
+        conversation_id = extract_conversation_id_from_payload(payload)
+        if not conversation_id:
+            return {"status": "error", "message": "Missing conversation_id"}
+
+        async with AsyncSessionLocal() as db:
+            created = await PostCallInboxQueue.enqueue(db, conversation_id, payload)
+        if created:
+            notify_post_call_workers()
+        else:
+            logger.info(f"🔁 Duplicate post-call webhook for {conversation_id}")
+        return {"status": "accepted", "conversation_id": conversation_id, "duplicate": not created}
             
     except Exception as e:
         logger.error(f"❌ Webhook Error: {e}", exc_info=True)
         return {"status": "error", "msg": "Critical failure"}
 
+@router.get("/voice/post_call/inbox/stats")
+async def post_call_inbox_stats(
+    db: AsyncSession = Depends(deps.get_async_session),
+    _=Depends(deps.require_admin)
+):
+    """Post-call inbox backlog per status, with the most recent dead letters"""
+    stats = await PostCallInboxQueue.stats(db)
+    stats["dead_letters"] = [
+        {
+            "conversation_id": item.conversation_id,
+            "attempts": item.attempts,
+            "last_error": item.last_error,
+            "received_at": item.received_at,
+        }
+        for item in await PostCallInboxQueue.dead_letters(db, limit=20)
+    ]
+    return stats
+
+@router.post("/voice/post_call/inbox/{conversation_id}/retry")
+async def retry_post_call(
+    conversation_id: str,
+    db: AsyncSession = Depends(deps.get_async_session),
+    _=Depends(deps.require_admin)
+):
+    """Process a dead-lettered webhook again"""
+    if not await PostCallInboxQueue.requeue(db, conversation_id):
+        raise HTTPException(status_code=404, detail="No dead-lettered webhook for this conversation")
+    notify_post_call_workers()
+    return {"status": "requeued", "conversation_id": conversation_id}
+
 @router.post("/elevenlabs/conversation/{conversation_id}/process")
 async def manual_sync(
     conversation_id: str,
-    db: Session = Depends(deps.get_session)
+    db: AsyncSession = Depends(deps.get_async_session)
 ):
     logger.info(f"🔄 Manual Sync: {conversation_id}")
     payload = {"conversation_id": conversation_id, "manual_sync": True}
-    return await process_webhook_payload(db, payload)
\ No newline at end of file
+    return await process_webhook_payload(db, payload)
+
+@router.get("/elevenlabs/cache/stats")
+def conversation_cache_stats(_=Depends(deps.require_admin)):
+    """Hit/miss counters of the ElevenLabs conversation cache"""
+    return get_conversation_cache().stats()
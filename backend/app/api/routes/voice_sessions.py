@@ -1,11 +1,12 @@
 import logging
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 from datetime import datetime
 from pydantic import BaseModel
 from app import models
 from app.api import deps
+from app.api.pagination import paginate
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -26,19 +27,18 @@ class VoiceSessionResponse(BaseModel):
 
 @router.get("/voice-sessions", response_model=List[VoiceSessionResponse])
 def get_voice_sessions(
+    response: Response,
     tenant_id: str = Depends(deps.get_current_tenant_id),
     db_session: Session = Depends(deps.get_session),
     _=Depends(deps.get_current_user),
+    cursor: Optional[str] = None,
     skip: int = 0,
     limit: int = 100
 ):
-    """Get list of voice sessions for the tenant."""
-    voice_sessions = db_session.query(models.VoiceSession)\
-        .filter(models.VoiceSession.tenant_id == tenant_id)\
-        .order_by(models.VoiceSession.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    """Get list of voice sessions for the tenant, newest first (cursor in X-Next-Cursor)."""
+    query = db_session.query(models.VoiceSession)\
+        .filter(models.VoiceSession.tenant_id == tenant_id)
+    voice_sessions = paginate(query, models.VoiceSession, response, cursor=cursor, limit=limit, skip=skip)
 
     return [
         VoiceSessionResponse(
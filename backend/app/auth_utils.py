@@ -5,11 +5,13 @@ from typing import Optional, Dict, Any
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .db import get_session
+from .db import AsyncSessionLocal
 from .models import User
-from .password_utils import verify_password
+from .password_utils import verify_password_async
+from .services.principal_cache import Principal, get_principal_cache
 
 # Secret key for JWT signing - should be set in environment
 SECRET_KEY = os.getenv("JWT_SECRET", "your-super-secret-key-change-in-production")
@@ -86,7 +88,7 @@ def verify_refresh_token(token: str) -> Dict[str, Any]:
     except JWTError:
         raise UnauthenticatedException()
 
-def get_current_user_payload(token: str = Depends(oauth2_scheme), db_session: Session = Depends(get_session)) -> Dict[str, Any]:
+async def get_current_user_payload(token: str = Depends(oauth2_scheme)) -> Dict[str, Any]:
     """
     Validates the JWT token and returns its payload.
     This will be used as a dependency for all protected endpoints.
@@ -97,28 +99,42 @@ def get_current_user_payload(token: str = Depends(oauth2_scheme), db_session: Se
     except Exception:
         raise UnauthenticatedException()
 
-def get_current_user(token_payload: Dict[str, Any] = Depends(get_current_user_payload), db_session: Session = Depends(get_session)) -> User:
+async def load_principal(user_id: str) -> Optional[Principal]:
+    """Read a user from the database as a Principal"""
+    async with AsyncSessionLocal() as db_session:
+        user = await db_session.get(User, user_id)
+        return Principal.from_user(user) if user is not None else None
+
+async def get_current_user(token_payload: Dict[str, Any] = Depends(get_current_user_payload)) -> Principal:
     """
-    Validates the token and returns the actual user object.
+    Validates the token and returns the user behind it.
+    Served from the principal cache; the database is read on a miss only.
     """
     user_id: str = token_payload.get("sub")
     if user_id is None:
         raise UnauthenticatedException()
 
-    user = db_session.query(User).filter(User.id == user_id).first()
-    if user is None or not user.is_active:
+    cache = get_principal_cache()
+    user, version = cache.get(user_id)
+    if user is None:
+        user = await load_principal(user_id)
+        if user is None:
+            raise UnauthenticatedException()
+        cache.put(user_id, version, user)
+
+    if not user.is_active:
         raise UnauthenticatedException()
 
     return user
 
-def require_auth(user: User = Depends(get_current_user)):
+def require_auth(user: Principal = Depends(get_current_user)) -> Principal:
     """
     A simple dependency that just requires an active logged-in user to be present.
     For endpoints accessible by any logged-in user.
     """
     return user
 
-def require_admin(user: User = Depends(get_current_user)):
+def require_admin(user: Principal = Depends(get_current_user)) -> Principal:
     """
     Dependency that requires the user to have admin role.
     """
@@ -126,11 +142,11 @@ def require_admin(user: User = Depends(get_current_user)):
         raise UnauthorizedException()
     return user
 
-def authenticate_user(db_session: Session, email: str, password: str) -> Optional[User]:
+async def authenticate_user(db_session: AsyncSession, email: str, password: str) -> Optional[User]:
     """
     Authenticate a user by email and password
     """
-    user = db_session.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.password_hash):
+    user = await db_session.scalar(select(User).where(User.email == email).limit(1))
+    if not user or not await verify_password_async(password, user.password_hash):
         return None
     return user
\ No newline at end of file
@@ -1,8 +1,14 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker, DeclarativeBase
 from contextlib import contextmanager
+from typing import Callable
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 sqlite_path = os.path.join(base_dir, 'dev.db')
 DB_URL = os.getenv("DB_URL", f"sqlite:///{sqlite_path}")
@@ -11,6 +17,23 @@ connect_args = {"check_same_thread": False} if DB_URL.startswith("sqlite") else
 engine = create_engine(DB_URL, pool_pre_ping=True, future=True, connect_args=connect_args)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
 
+
+def _async_url(url: str) -> str:
+    """Same database through its asyncio driver: asyncpg for PostgreSQL, aiosqlite for SQLite"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "postgresql":
+        return parsed.set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    return url
+
+# Async routes use this engine so queries never block the event loop
+ASYNC_DB_URL = os.getenv("ASYNC_DB_URL", _async_url(DB_URL))
+async_engine = create_async_engine(ASYNC_DB_URL, pool_pre_ping=True)
+# Objects stay readable after commit; expired attributes cannot lazy-load under asyncio
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
 class Base(DeclarativeBase):
     pass
 
@@ -19,4 +42,50 @@ def get_session():
     try:
         yield session
     finally:
-        session.close() 
\ No newline at end of file
+        session.close() 
+
+async def get_async_session():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+async def dispose_async_engine() -> None:
+    """Close the async engine's pooled connections on shutdown"""
+    await async_engine.dispose()
+
+def run_after_commit(session: Session, callback: Callable[[], None]) -> None:
+    """
+    Run ``callback`` once the session's transaction commits: live events, cache
+    invalidation and in-memory counters must not announce writes that a failed
+    commit rolls back. Callbacks of a transaction that ends without committing
+    are dropped.
+    """
+    session.info.setdefault("after_commit", []).append(callback)
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit_callbacks(session: Session) -> None:
+    if session.in_nested_transaction():
+        # A released savepoint; the outer transaction may still roll back
+        return
+    for callback in session.info.pop("after_commit", []):
+        try:
+            callback()
+        except Exception as e:
+            logger.error(f"❌ After-commit callback failed: {e}", exc_info=True)
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_after_commit_callbacks(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop("after_commit", None)
+
+@contextmanager
+def read_only_snapshot():
+    """
+    Connection whose statements all read one consistent snapshot.
+    PostgreSQL runs a REPEATABLE READ, READ ONLY transaction; SQLite transactions
+    are already serializable.
+    """
+    with engine.connect() as connection:
+        if connection.dialect.name == "postgresql":
+            connection = connection.execution_options(isolation_level="REPEATABLE READ", postgresql_readonly=True)
+        with connection.begin():
+            yield connection
@@ -2,13 +2,24 @@ from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from contextlib import asynccontextmanager
 from datetime import datetime
 import logging
+import os
 from dotenv import load_dotenv
-from app.db import get_session
+from app.db import get_session, dispose_async_engine
 from app.api.api import api_router
+from app.api.pagination import NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER
 from app.auth_utils import require_auth
 from app.error_handlers import add_error_handlers
+from app.password_utils import shutdown_password_pool
+from app.services.customer_import_service import shutdown_import_pool
+from app.services.campaign_queue import start_embedded_worker
+from app.services.bulk_call_service import shutdown_progress_buffer
+from app.services.call_status_buffer import shutdown_call_status_buffer
+from app.services.kpi_rollup_service import start_kpi_reconciler, shutdown_kpi_rollup_refresher
+from app.services.voice.elevenlabs_client import get_elevenlabs_client, close_elevenlabs_client
+from app.services.post_call_inbox import start_post_call_workers, stop_post_call_workers
 
 # Load .env file from the 'backend' directory
 load_dotenv()
@@ -17,10 +28,44 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Run a campaign worker inside the API process unless dedicated workers are deployed
+RUN_EMBEDDED_WORKER = os.getenv("RUN_EMBEDDED_WORKER", "true").lower() == "true"
+# Recompute recent dashboard KPI rollups periodically (backfills an empty rollup table)
+RUN_KPI_RECONCILER = os.getenv("RUN_KPI_RECONCILER", "true").lower() == "true"
+# Process post-call webhooks from the inbox inside the API process (the default home:
+# its live events reach this process's SSE subscribers). Turn off only when
+# app.worker runs them with POST_CALL_IN_WORKER=true.
+RUN_POST_CALL_WORKERS = os.getenv("RUN_POST_CALL_WORKERS", "true").lower() == "true"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    worker_stop = start_embedded_worker() if RUN_EMBEDDED_WORKER else None
+    reconciler_stop = start_kpi_reconciler() if RUN_KPI_RECONCILER else None
+    await get_elevenlabs_client().start()
+    if RUN_POST_CALL_WORKERS:
+        start_post_call_workers()
+    yield
+    await stop_post_call_workers()
+    await close_elevenlabs_client()
+    if worker_stop is not None:
+        worker_stop.set()
+    if reconciler_stop is not None:
+        reconciler_stop.set()
+    # Status events may still add campaign progress and KPI changes, so they are written first
+    shutdown_call_status_buffer()
+    shutdown_progress_buffer()
+    shutdown_kpi_rollup_refresher()
+    shutdown_password_pool()
+    shutdown_import_pool()
+    await dispose_async_engine()
+
+
 app = FastAPI(
     title="Voice Agent Portal API",
     description="Backend services for the Agentic Navaia portal.",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 origins = [
     "http://localhost:3000",
@@ -35,6 +80,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Keyset pagination cursors of list endpoints
+    expose_headers=[NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER],
 )
 
 # Include all API routes from the master router in api.py
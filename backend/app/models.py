@@ -1,9 +1,11 @@
-from sqlalchemy import Column, String, Integer, DateTime, ForeignKey, Enum, Boolean, JSON, Text, Float
+from sqlalchemy import Column, String, Integer, DateTime, Date, ForeignKey, Enum, Boolean, JSON, Text, Float, Index, DDL, event, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from datetime import datetime
+from datetime import date, datetime
 import enum
 from typing import Any
 from .db import Base
+from .phone_utils import to_e164
+from .search_utils import customer_search_text
 
 class ChannelEnum(str, enum.Enum):
     voice = "voice"
@@ -17,6 +19,7 @@ class CallDirectionEnum(str, enum.Enum):
     outbound = "outbound"
 
 class CallStatusEnum(str, enum.Enum):
+    queued = "queued"
     connected = "connected"
     no_answer = "no_answer"
     abandoned = "abandoned"
@@ -90,19 +93,82 @@ class BulkCallOutcomeEnum(str, enum.Enum):
     wrong_number = "wrong_number"
     do_not_call = "do_not_call"
 
+class PostCallInboxStatusEnum(str, enum.Enum):
+    """Processing state of a received post-call webhook"""
+    pending = "pending"
+    processing = "processing"
+    done = "done"
+    dead = "dead"
+
+class CustomerImportStatusEnum(str, enum.Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+def _phone_e164_default(context) -> str | None:
+    """Inserts that do not set phone_e164 derive it from phone"""
+    return to_e164(context.get_current_parameters().get("phone"))
+
+def _search_text_default(context) -> str:
+    """Inserts that do not set search_text derive it from name and email"""
+    params = context.get_current_parameters()
+    return customer_search_text(params.get("name"), params.get("email"))
+
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        # Keyset pagination: newest first within a tenant
+        Index("ix_customers_tenant_created_at_id", "tenant_id", "created_at", "id"),
+        # One customer per phone number within a tenant: the upsert's conflict target
+        Index("uq_customers_tenant_phone_e164", "tenant_id", "phone_e164", unique=True),
+        # Webhook context recovery: the newest customer with a phone, in any tenant
+        Index("ix_customers_phone_e164_created_at", "phone_e164", "created_at"),
+        # Customer search on Postgres: word-prefix full-text matches on search_text
+        # (SQLite uses the customers_fts table below)
+        Index(
+            "ix_customers_search_text_fts",
+            text("to_tsvector('simple', search_text)"),
+            postgresql_using="gin",
+        ).ddl_if(dialect="postgresql"),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True)
     tenant_id: Mapped[str] = mapped_column(String, index=True, default="demo-tenant")
     name: Mapped[str] = mapped_column(String, index=True, default="Unknown")
     phone: Mapped[str] = mapped_column(String, index=True, nullable=False)
+    # phone in E.164 (app.phone_utils.to_e164); NULL when it cannot be read
+    phone_e164: Mapped[str | None] = mapped_column(String, nullable=True, default=_phone_e164_default)
     email: Mapped[str | None] = mapped_column(String, index=True, nullable=True)
+    # name and email normalized for search (app.search_utils.customer_search_text)
+    search_text: Mapped[str | None] = mapped_column(Text, nullable=True, default=_search_text_default)
     neighborhoods: Mapped[Any | None] = mapped_column(JSON, nullable=True)
     consent: Mapped[bool] = mapped_column(Boolean, default=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+# Customer search on SQLite: an FTS5 index over search_text kept in sync by triggers
+CUSTOMERS_FTS_DDL = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS customers_fts USING fts5("
+    "search_text, content='customers', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS customers_fts_ai AFTER INSERT ON customers BEGIN "
+    "INSERT INTO customers_fts(rowid, search_text) VALUES (new.rowid, new.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS customers_fts_ad AFTER DELETE ON customers BEGIN "
+    "INSERT INTO customers_fts(customers_fts, rowid, search_text) VALUES ('delete', old.rowid, old.search_text); END",
+    "CREATE TRIGGER IF NOT EXISTS customers_fts_au AFTER UPDATE OF search_text ON customers BEGIN "
+    "INSERT INTO customers_fts(customers_fts, rowid, search_text) VALUES ('delete', old.rowid, old.search_text); "
+    "INSERT INTO customers_fts(rowid, search_text) VALUES (new.rowid, new.search_text); END",
+)
+for _statement in CUSTOMERS_FTS_DDL:
+    event.listen(Customer.__table__, "after_create", DDL(_statement).execute_if(dialect="sqlite"))
+event.listen(Customer.__table__, "before_drop", DDL("DROP TABLE IF EXISTS customers_fts").execute_if(dialect="sqlite"))
+
 class VoiceSession(Base):
     __tablename__ = "voice_sessions"
+    __table_args__ = (
+        # Keyset pagination: newest first within a tenant
+        Index("ix_voice_sessions_tenant_created_at_id", "tenant_id", "created_at", "id"),
+        # Live ops: a tenant's active sessions, newest first
+        Index("ix_voice_sessions_tenant_status_created_at", "tenant_id", "status", "created_at"),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True)
     tenant_id: Mapped[str] = mapped_column(String, index=True)
     customer_id: Mapped[str | None] = mapped_column(String, ForeignKey("customers.id"), nullable=True)
@@ -122,6 +188,11 @@ class VoiceSession(Base):
 
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        Index("ix_tickets_tenant_created_at", "tenant_id", "created_at"),
+        # At most one ticket per voice session (NULLs do not conflict)
+        Index("uq_tickets_session_id", "session_id", unique=True),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True)
     tenant_id: Mapped[str] = mapped_column(String, index=True)
     customer_id: Mapped[str] = mapped_column(String, ForeignKey("customers.id"), index=True)
@@ -141,6 +212,12 @@ class Ticket(Base):
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Booking lists and the KPI rollup's per-day scans
+        Index("ix_bookings_tenant_created_at", "tenant_id", "created_at"),
+        # At most one booking per voice session (NULLs do not conflict)
+        Index("uq_bookings_session_id", "session_id", unique=True),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True)
     tenant_id: Mapped[str] = mapped_column(String, index=True)
     customer_id: Mapped[str] = mapped_column(String, ForeignKey("customers.id"), index=True)
@@ -159,6 +236,10 @@ class Booking(Base):
 
 class Conversation(Base):
     __tablename__ = "conversations"
+    __table_args__ = (
+        # Keyset pagination: newest first within a tenant
+        Index("ix_conversations_tenant_created_at_id", "tenant_id", "created_at", "id"),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True)
     tenant_id: Mapped[str] = mapped_column(String, index=True)
     channel: Mapped[ChannelEnum] = mapped_column(Enum(ChannelEnum), default=ChannelEnum.voice)
@@ -173,6 +254,12 @@ class Conversation(Base):
 
 class Call(Base):
     __tablename__ = "calls"
+    __table_args__ = (
+        # Keyset pagination: newest first within a tenant
+        Index("ix_calls_tenant_created_at_id", "tenant_id", "created_at", "id"),
+        # One call per conversation: webhook dedupe, history upserts and the calls feed join
+        Index("uq_calls_conversation_id", "conversation_id", unique=True),
+    )
     id: Mapped[str] = mapped_column(String, primary_key=True)
     tenant_id: Mapped[str] = mapped_column(String, index=True)
     conversation_id: Mapped[str] = mapped_column(String, ForeignKey("conversations.id"))
@@ -186,6 +273,35 @@ class Call(Base):
     # ✅ FIXED: The critical missing field
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
+class CallFeed(Base):
+    """
+    One row per Call with every CallResponse field already resolved: customer
+    name from Customer, intent/summary/agent/status from the VoiceSession and the
+    recording URL from either. Written by app.services.call_feed_service.
+    """
+    __tablename__ = "call_feed"
+    __table_args__ = (
+        # The calls feed: newest first within a tenant
+        Index("ix_call_feed_tenant_created_at_id", "tenant_id", "created_at", "id"),
+    )
+    id: Mapped[str] = mapped_column(String, ForeignKey("calls.id", ondelete="CASCADE"), primary_key=True)
+    tenant_id: Mapped[str] = mapped_column(String, nullable=False)
+    conversation_id: Mapped[str] = mapped_column(String, nullable=False)
+    customer_id: Mapped[str | None] = mapped_column(String, index=True, nullable=True)
+    customer_name: Mapped[str | None] = mapped_column(String, nullable=True)
+    direction: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[str] = mapped_column(String, nullable=False)
+    outcome: Mapped[str | None] = mapped_column(String, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    handle_sec: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    recording_url: Mapped[str | None] = mapped_column(String, nullable=True)
+    voice_session_id: Mapped[str | None] = mapped_column(String, index=True, nullable=True)
+    extracted_intent: Mapped[str | None] = mapped_column(String, nullable=True)
+    summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    agent_name: Mapped[str | None] = mapped_column(String, nullable=True)
+    session_status: Mapped[str | None] = mapped_column(String, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 class User(Base):
     __tablename__ = "users"
     id: Mapped[str] = mapped_column(String, primary_key=True)
@@ -300,6 +416,10 @@ class BulkCallScript(Base):
 class BulkCallCampaign(Base):
     """Bulk call campaign tracking"""
     __tablename__ = "bulk_call_campaigns"
+    __table_args__ = (
+        Index("ix_bulk_call_campaigns_status_lease", "status", "lease_expires_at"),
+        Index("ix_bulk_call_campaigns_tenant_created_at", "tenant_id", "created_at"),
+    )
     
     id: Mapped[str] = mapped_column(String, primary_key=True)
     tenant_id: Mapped[str] = mapped_column(String, index=True, nullable=False)
@@ -334,6 +454,13 @@ class BulkCallCampaign(Base):
     started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     
+    # Job queue (a worker holds the lease while dialing the campaign)
+    webhook_base_url: Mapped[str | None] = mapped_column(String, nullable=True)
+    lease_owner: Mapped[str | None] = mapped_column(String, nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    
     # Relationships
     script: Mapped["BulkCallScript"] = relationship("BulkCallScript", backref="campaigns")
     
@@ -346,6 +473,12 @@ class BulkCallCampaign(Base):
 class BulkCallResult(Base):
     """Individual call results for bulk campaigns"""
     __tablename__ = "bulk_call_results"
+    __table_args__ = (
+        # Campaign results, newest first
+        Index("ix_bulk_call_results_campaign_created_at", "campaign_id", "created_at"),
+        # Dialer: next queued / in-flight results of a campaign
+        Index("ix_bulk_call_results_campaign_status_created_at", "campaign_id", "status", "created_at"),
+    )
     
     id: Mapped[str] = mapped_column(String, primary_key=True)
     campaign_id: Mapped[str] = mapped_column(String, ForeignKey("bulk_call_campaigns.id"), nullable=False)
@@ -374,11 +507,11 @@ class BulkCallResult(Base):
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
     
     # Twilio integration
-    twilio_call_sid: Mapped[str | None] = mapped_column(String, nullable=True)
+    twilio_call_sid: Mapped[str | None] = mapped_column(String, unique=True, index=True, nullable=True)
     twilio_status: Mapped[str | None] = mapped_column(String, nullable=True)
     
     # AI session reference
-    voice_session_id: Mapped[str | None] = mapped_column(String, ForeignKey("voice_sessions.id"), nullable=True)
+    voice_session_id: Mapped[str | None] = mapped_column(String, ForeignKey("voice_sessions.id"), index=True, nullable=True)
     
     # Timestamps
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
@@ -391,3 +524,135 @@ class BulkCallResult(Base):
     conversation: Mapped["Conversation"] = relationship("Conversation", backref="bulk_results")
     voice_session: Mapped["VoiceSession"] = relationship("VoiceSession", backref="bulk_results")
 
+
+# ============================================================================
+# TRANSCRIPT MODELS
+# ============================================================================
+
+class Transcript(Base):
+    """Parsed ElevenLabs transcript, stored once per conversation"""
+    __tablename__ = "transcripts"
+
+    conversation_id: Mapped[str] = mapped_column(String, primary_key=True)
+    tenant_id: Mapped[str] = mapped_column(String, index=True, nullable=False)
+    summary: Mapped[str | None] = mapped_column(Text, nullable=True)
+    extracted_intent: Mapped[Any | None] = mapped_column(JSON, nullable=True)
+    turn_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+class TranscriptTurn(Base):
+    """One speaker turn of a stored transcript"""
+    __tablename__ = "transcript_turns"
+    __table_args__ = (
+        Index("ix_transcript_turns_conversation_position", "conversation_id", "position", unique=True),
+    )
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    conversation_id: Mapped[str] = mapped_column(String, ForeignKey("transcripts.conversation_id", ondelete="CASCADE"), nullable=False)
+    position: Mapped[int] = mapped_column(Integer, nullable=False)
+    role: Mapped[str] = mapped_column(String, nullable=False)
+    text: Mapped[str] = mapped_column(Text, nullable=False, default="")
+    timestamp: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+
+
+# ============================================================================
+# KPI ROLLUP MODELS
+# ============================================================================
+
+class TenantDailyKpi(Base):
+    """Per-tenant, per-day KPI counters, bucketed by the created_at day (UTC) of each row"""
+    __tablename__ = "tenant_daily_kpis"
+
+    tenant_id: Mapped[str] = mapped_column(String, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+
+    # voice_sessions
+    calls: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    completed_calls: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    failed_calls: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    intents: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    handled_calls: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    handle_seconds: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+
+    # bookings
+    bookings: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    revenue: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+
+    # conversations
+    sentiment_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    sentiment_sum: Mapped[float] = mapped_column(Float, default=0, nullable=False)
+
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+
+# ============================================================================
+# POST-CALL INBOX
+# ============================================================================
+
+class PostCallInbox(Base):
+    """
+    Post-call webhooks as received, one row per ElevenLabs conversation.
+    Processed asynchronously by app.services.post_call_inbox workers.
+    """
+    __tablename__ = "post_call_inbox"
+    __table_args__ = (
+        # Workers claim due rows of a status, oldest first
+        Index("ix_post_call_inbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+
+    conversation_id: Mapped[str] = mapped_column(String, primary_key=True)
+    payload: Mapped[Any] = mapped_column(JSON, nullable=False)
+    status: Mapped[PostCallInboxStatusEnum] = mapped_column(
+        Enum(PostCallInboxStatusEnum), default=PostCallInboxStatusEnum.pending, nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    lease_owner: Mapped[str | None] = mapped_column(String, nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    result: Mapped[Any | None] = mapped_column(JSON, nullable=True)
+    received_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    processed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+
+# ============================================================================
+# CUSTOMER IMPORTS
+# ============================================================================
+
+class CustomerImportJob(Base):
+    """A bulk customer import (CSV, NDJSON or XLSX upload) and its progress"""
+    __tablename__ = "customer_import_jobs"
+    __table_args__ = (
+        Index("ix_customer_import_jobs_tenant_created_at", "tenant_id", "created_at"),
+    )
+
+    id: Mapped[str] = mapped_column(String, primary_key=True)
+    tenant_id: Mapped[str] = mapped_column(String, nullable=False)
+    created_by: Mapped[str | None] = mapped_column(String, ForeignKey("users.id"), nullable=True)
+    filename: Mapped[str | None] = mapped_column(String, nullable=True)
+    file_format: Mapped[str] = mapped_column(String, nullable=False)
+    status: Mapped[CustomerImportStatusEnum] = mapped_column(
+        Enum(CustomerImportStatusEnum), default=CustomerImportStatusEnum.queued, nullable=False
+    )
+    # Estimated from the line count of the file, for progress reporting
+    total_rows: Mapped[int] = mapped_column(Integer, default=0)
+    processed_rows: Mapped[int] = mapped_column(Integer, default=0)
+    created_rows: Mapped[int] = mapped_column(Integer, default=0)
+    duplicate_rows: Mapped[int] = mapped_column(Integer, default=0)
+    invalid_rows: Mapped[int] = mapped_column(Integer, default=0)
+    # The first CUSTOMER_IMPORT_MAX_ERRORS rejected rows: [{"row": n, "error": "..."}]
+    errors: Mapped[Any | None] = mapped_column(JSON, nullable=True)
+    error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    completed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    @property
+    def progress(self) -> float:
+        """Progress percentage (the row total is an estimate until the import completes)"""
+        if self.status == CustomerImportStatusEnum.completed:
+            return 100.0
+        if not self.total_rows:
+            return 0.0
+        return round(min(self.processed_rows / self.total_rows, 1.0) * 100, 2)
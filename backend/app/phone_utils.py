@@ -0,0 +1,53 @@
+import os
+import re
+from typing import Optional
+
+# Country calling code of national numbers written with a trunk "0" (05X..., 01X...)
+DEFAULT_PHONE_COUNTRY_CODE = os.getenv("DEFAULT_PHONE_COUNTRY_CODE", "966")
+
+_FORMATTING = re.compile(r"[\s\-\(\)\.]")
+# E.164: up to 15 digits after the "+"; shorter than 8 is not a dialable number
+_E164 = re.compile(r"^\+[1-9]\d{7,14}$")
+
+
+def to_e164(phone: Optional[str]) -> Optional[str]:
+    """
+    Canonical E.164 form of a phone number (+9665XXXXXXXX), or None if it cannot be read.
+
+    - "+..." and "00..." are international already
+    - Egyptian mobiles 01XXXXXXXXX -> +20, Saudi mobiles 05XXXXXXXX -> +966,
+      other numbers with a trunk 0 -> DEFAULT_PHONE_COUNTRY_CODE
+    - Saudi mobiles without the trunk 0 (5XXXXXXXX) -> +966
+    - 10 digits without a country code -> North America (+1)
+    - any other 8-15 digits are taken to start with their country code
+    """
+    if not phone:
+        return None
+
+    clean = _FORMATTING.sub("", str(phone).strip())
+    if clean.startswith("00"):
+        clean = "+" + clean[2:]
+
+    if clean.startswith("+"):
+        candidate = clean
+    elif not clean.isdigit():
+        return None
+    elif clean.startswith("01") and len(clean) == 11:
+        candidate = "+20" + clean[1:]
+    elif clean.startswith("05") and len(clean) == 10:
+        candidate = "+966" + clean[1:]
+    elif clean.startswith("0"):
+        candidate = "+" + DEFAULT_PHONE_COUNTRY_CODE + clean[1:]
+    elif clean.startswith("5") and len(clean) == 9:
+        candidate = "+966" + clean
+    elif len(clean) == 10:
+        candidate = "+1" + clean
+    else:
+        candidate = "+" + clean
+
+    return candidate if _E164.match(candidate) else None
+
+
+def normalize_phone(phone: Optional[str]) -> str:
+    """E.164 form of a phone number, or the number as given if it cannot be read"""
+    return to_e164(phone) or (phone or "").strip()
@@ -29,4 +29,24 @@ class Customer(CustomerBase):
     tenant_id: str
 
     class Config:
-        from_attributes = True # Replaces orm_mode = True
\ No newline at end of file
+        from_attributes = True # Replaces orm_mode = True
+# --- Customer Imports ---
+class CustomerImportJob(BaseModel):
+    id: str
+    status: str
+    filename: Optional[str] = None
+    file_format: str
+    total_rows: int
+    processed_rows: int
+    created_rows: int
+    duplicate_rows: int
+    invalid_rows: int
+    progress: float
+    errors: Optional[List[Any]] = None
+    error_message: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
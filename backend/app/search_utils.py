@@ -0,0 +1,38 @@
+import re
+import unicodedata
+from typing import Optional
+
+# Harakat, Quranic marks, superscript alef and tatweel carry no meaning for search
+_ARABIC_MARKS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_ARABIC_LETTERS = str.maketrans({
+    "\u0623": "\u0627",  # alef with hamza above -> alef
+    "\u0625": "\u0627",  # alef with hamza below -> alef
+    "\u0622": "\u0627",  # alef with madda -> alef
+    "\u0671": "\u0627",  # alef wasla -> alef
+    "\u0629": "\u0647",  # taa marbuta -> haa
+    "\u0649": "\u064a",  # alef maqsura -> yaa
+    "\u0624": "\u0648",  # waw with hamza -> waw
+    "\u0626": "\u064a",  # yaa with hamza -> yaa
+})
+# Anything but letters and digits separates words (so "al-harbi", "a.b@x.com" split into words)
+_SEPARATORS = re.compile(r"[^\w]+|_")
+
+
+def normalize_search_text(text: Optional[str]) -> str:
+    """
+    Search form of a text: case-folded, Arabic diacritics and tatweel removed,
+    alef/hamza variants, taa marbuta and alef maqsura unified, Arabic-Indic
+    digits made ASCII, punctuation turned into spaces.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", str(text)).casefold()
+    text = _ARABIC_MARKS.sub("", text).translate(_ARABIC_LETTERS)
+    # NFKC keeps Arabic-Indic digits (٠١٢...); unicodedata.digit reads any script
+    text = "".join(str(unicodedata.digit(char)) if char.isdigit() and not char.isascii() else char for char in text)
+    return " ".join(_SEPARATORS.sub(" ", text).split())
+
+
+def customer_search_text(name: Optional[str], email: Optional[str]) -> str:
+    """The words a customer is found by: its name and email"""
+    return " ".join(part for part in (normalize_search_text(name), normalize_search_text(email)) if part)
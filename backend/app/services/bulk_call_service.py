@@ -4,17 +4,60 @@ Handles bulk calling campaigns with proper concurrency, progress tracking, and e
 """
 
 import logging
+import os
 import secrets
+import threading
+from collections import OrderedDict
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 from typing import List, Optional, Dict, Any
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, func, select, insert, update
 
 from app import models
+from app.db import SessionLocal, run_after_commit
+from app.services.kpi_rollup_service import mark_kpis_dirty
+from app.services.dashboard_cache import invalidate_dashboard
+from app.services.call_feed_service import session_status_update
+from app.services.live_events import get_live_event_broker, publish_live_event, publish_result_event, publish_session_event
 from app.services.twilio_service import get_twilio_service
 
 logger = logging.getLogger(__name__)
 
+# Number of customers read and results inserted per round trip when a campaign starts
+RESULT_INSERT_CHUNK_SIZE = int(os.getenv("RESULT_INSERT_CHUNK_SIZE", "1000"))
+# Buffer campaign counter deltas in memory and flush them every N milliseconds (0 = write through)
+CAMPAIGN_PROGRESS_FLUSH_MS = int(os.getenv("CAMPAIGN_PROGRESS_FLUSH_MS", "0"))
+# Max number of Twilio call SIDs kept in the webhook correlation cache
+CALL_CORRELATION_CACHE_SIZE = int(os.getenv("CALL_CORRELATION_CACHE_SIZE", "10000"))
+
+# Result statuses that count towards campaign progress
+COMPLETED_RESULT_STATUSES = (
+    models.BulkCallResultStatusEnum.success,
+    models.BulkCallResultStatusEnum.failed,
+    models.BulkCallResultStatusEnum.voicemail,
+    models.BulkCallResultStatusEnum.no_answer,
+    models.BulkCallResultStatusEnum.busy,
+)
+
+# Result statuses after which a call no longer changes state
+TERMINAL_RESULT_STATUSES = COMPLETED_RESULT_STATUSES + (
+    models.BulkCallResultStatusEnum.cancelled,
+)
+
+# Result fields a "result" live event carries (see live_events.publish_result_event)
+RESULT_EVENT_FIELDS = (
+    "id", "tenant_id", "campaign_id", "customer_id", "status", "outcome",
+    "duration_seconds", "twilio_status", "voice_session_id",
+)
+
+FINISHED_CAMPAIGN_STATUSES = (
+    models.BulkCallStatusEnum.completed,
+    models.BulkCallStatusEnum.failed,
+    models.BulkCallStatusEnum.cancelled,
+)
+
 
 # ============================================================================
 # UTILITY FUNCTIONS
@@ -274,27 +317,70 @@ class BulkCallCampaignService:
         campaign_id: str,
         completed_delta: int = 0,
         failed_delta: int = 0,
-        successful_delta: int = 0
-    ) -> Optional[models.BulkCallCampaign]:
-        """Update campaign progress counters"""
-        campaign = db.query(models.BulkCallCampaign).filter_by(id=campaign_id).first()
-        if not campaign:
-            return None
+        successful_delta: int = 0,
+        commit: bool = True
+    ) -> bool:
+        """
+        Update campaign progress counters.
+        Counters are incremented in place with a single UPDATE so concurrent
+        webhooks never overwrite each other's deltas. The progress event is
+        published when the transaction commits. Returns False if the
+        campaign does not exist.
+        """
+        if not (completed_delta or failed_delta or successful_delta):
+            return True
         
-        campaign.completed_calls += completed_delta
-        campaign.failed_calls += failed_delta
-        campaign.successful_calls += successful_delta
+        campaigns = models.BulkCallCampaign.__table__
+        counters = db.execute(
+            update(campaigns)
+            .where(campaigns.c.id == campaign_id)
+            .values(
+                completed_calls=campaigns.c.completed_calls + completed_delta,
+                failed_calls=campaigns.c.failed_calls + failed_delta,
+                successful_calls=campaigns.c.successful_calls + successful_delta
+            )
+            .returning(
+                campaigns.c.tenant_id,
+                campaigns.c.total_calls,
+                campaigns.c.completed_calls,
+                campaigns.c.failed_calls,
+                campaigns.c.successful_calls
+            )
+        ).first()
+        if counters is None:
+            return False
         
-        # Check if campaign is complete
-        if campaign.completed_calls >= campaign.total_calls:
-            campaign.status = models.BulkCallStatusEnum.completed
-            campaign.completed_at = datetime.now(timezone.utc)
+        # Only the update that crosses the finish line moves the campaign to completed
+        finished = db.execute(
+            update(campaigns)
+            .where(
+                campaigns.c.id == campaign_id,
+                campaigns.c.completed_calls >= campaigns.c.total_calls,
+                campaigns.c.status.notin_(FINISHED_CAMPAIGN_STATUSES)
+            )
+            .values(
+                status=models.BulkCallStatusEnum.completed,
+                completed_at=datetime.now(timezone.utc)
+            )
+        ).rowcount
         
-        db.commit()
-        db.refresh(campaign)
-
-        logger.info(f"✅ Campaign {campaign_id} progress: {campaign.calculate_progress()}%")
-        return campaign
+        # The stream only shows counters once they are stored
+        def publish_progress():
+            if finished:
+                logger.info(f"✅ Campaign {campaign_id} completed")
+            publish_live_event(counters.tenant_id, "progress", {
+                "campaign_id": campaign_id,
+                "total_calls": counters.total_calls,
+                "completed_calls": counters.completed_calls,
+                "failed_calls": counters.failed_calls,
+                "successful_calls": counters.successful_calls,
+                "finished": bool(finished),
+            }, campaign_id=campaign_id)
+        run_after_commit(db, publish_progress)
+        
+        if commit:
+            db.commit()
+        return True
 
     @staticmethod
     def delete_campaign(
@@ -380,15 +466,32 @@ class BulkCallResultService:
         recording_url: Optional[str] = None,
         error_message: Optional[str] = None,
         twilio_call_sid: Optional[str] = None,
-        twilio_status: Optional[str] = None
+        twilio_status: Optional[str] = None,
+        commit: bool = True
     ) -> Optional[models.BulkCallResult]:
-        """Update call result"""
+        """
+        Update call result.
+        With ``commit=False`` the changes are only flushed; the caller commits
+        and calls notify_slot_released for the campaign.
+        """
         result = db.query(models.BulkCallResult).filter_by(id=result_id).first()
         if not result:
             return None
         
+        # Move into a terminal status with a conditional UPDATE so that duplicate
+        # or concurrent webhooks for the same call are counted exactly once
+        reached_terminal = False
+        if status in TERMINAL_RESULT_STATUSES:
+            reached_terminal = bool(db.query(models.BulkCallResult).filter(
+                models.BulkCallResult.id == result_id,
+                models.BulkCallResult.status.notin_(TERMINAL_RESULT_STATUSES)
+            ).update({models.BulkCallResult.status: status}, synchronize_session=False))
+            db.refresh(result)
+        elif result.status not in TERMINAL_RESULT_STATUSES:
+            # Late, out-of-order events never move a finished call backwards
+            result.status = status
+        
         # Update fields
-        result.status = status
         result.updated_at = datetime.now(timezone.utc)
         
         if outcome:
@@ -404,20 +507,35 @@ class BulkCallResultService:
         if twilio_status:
             result.twilio_status = twilio_status
         
-        db.commit()
-        db.refresh(result)
-        
-        # Update campaign progress
-        if status in [models.BulkCallResultStatusEnum.success, models.BulkCallResultStatusEnum.failed,
-                      models.BulkCallResultStatusEnum.voicemail, models.BulkCallResultStatusEnum.no_answer,
-                      models.BulkCallResultStatusEnum.busy]:
-            BulkCallCampaignService.update_campaign_progress(
-                db,
-                result.campaign_id,
+        # Update campaign progress in the same transaction as the result.
+        # Buffered deltas, cache invalidation and live events wait for the commit,
+        # so a batch that rolls back and is retried does not count or announce twice.
+        campaign_id, tenant_id = result.campaign_id, result.tenant_id
+        if reached_terminal and status in COMPLETED_RESULT_STATUSES:
+            deltas = dict(
                 completed_delta=1,
                 failed_delta=1 if status == models.BulkCallResultStatusEnum.failed else 0,
                 successful_delta=1 if status == models.BulkCallResultStatusEnum.success else 0
             )
+            if CAMPAIGN_PROGRESS_FLUSH_MS > 0:
+                run_after_commit(db, lambda: get_progress_buffer().add(campaign_id, **deltas))
+            else:
+                BulkCallCampaignService.update_campaign_progress(db, campaign_id, commit=False, **deltas)
+            run_after_commit(db, lambda: invalidate_dashboard(tenant_id))
+        
+        db.flush()
+        # Commit expires the result, and callbacks cannot load it again
+        snapshot = SimpleNamespace(**{field: getattr(result, field) for field in RESULT_EVENT_FIELDS})
+        run_after_commit(db, lambda: publish_result_event(snapshot))
+        if not commit:
+            return result
+        
+        db.commit()
+        db.refresh(result)
+        
+        # Free the dialer slot held by this call
+        if reached_terminal:
+            notify_slot_released(campaign_id)
         
         return result
     
@@ -445,116 +563,79 @@ class BulkCallExecutionService:
     def initialize_campaign_calls(
         db: Session,
         campaign: models.BulkCallCampaign,
-        tenant_id: str
-    ) -> List[models.BulkCallResult]:
-        """Initialize call results for all customers in campaign"""
-        
-        # Get customers
-        customers = db.query(models.Customer).filter(
-            models.Customer.id.in_(campaign.customer_ids)
-        ).all()
-        
-        results = []
-        for customer in customers:
-            result = BulkCallResultService.create_result(
-                db=db,
-                campaign_id=campaign.id,
-                tenant_id=tenant_id,
-                customer_id=customer.id,
-                customer_name=customer.name,
-                customer_phone=customer.phone
-            )
-            results.append(result)
-        
-        logger.info(f"✅ Initialized {len(results)} call results for campaign {campaign.id}")
-        return results
-    
-    @staticmethod
-    def process_campaign_batch(
-        db: Session,
-        campaign: models.BulkCallCampaign,
-        results: List[models.BulkCallResult],
-        webhook_base_url: str
-    ) -> Dict[str, Any]:
-        """Process a batch of calls for campaign"""
-        
-        twilio_service = get_twilio_service()
-        
-        if not twilio_service.is_configured():
-            logger.error("❌ Twilio not configured. Cannot make calls.")
-            return {
-                "success": False,
-                "error": "Twilio not configured",
-                "processed": 0,
-                "failed": len(results)
-            }
-        
-        processed = 0
-        failed = 0
+        tenant_id: str,
+        chunk_size: int = RESULT_INSERT_CHUNK_SIZE
+    ) -> int:
+        """
+        Initialize call results for all customers in campaign that don't have one yet.
+        Customers are read chunk by chunk and results are written with one
+        multi-row INSERT per chunk, all inside a single transaction.
+        Returns the number of results created.
+        """
+        customer_ids = list(dict.fromkeys(campaign.customer_ids or []))
+        created = 0
         
-        for result in results:
-            if result.status != models.BulkCallResultStatusEnum.queued:
-                continue
-            
-            try:
-                # Create voice session for the call
-                session = models.VoiceSession(
-                    id=f"vs_{secrets.token_hex(8)}",
-                    tenant_id=campaign.tenant_id,
-                    customer_id=result.customer_id,
-                    direction="outbound",
-                    locale="ar-SA",
-                    agent_type=campaign.agent_type,
-                    status=models.VoiceSessionStatus.ACTIVE
-                )
-                
-                db.add(session)
-                db.flush()
+        try:
+            for i in range(0, len(customer_ids), chunk_size):
+                chunk = customer_ids[i:i + chunk_size]
                 
-                # Update result with voice session
-                result.voice_session_id = session.id
-                result.status = models.BulkCallResultStatusEnum.in_progress
+                # Customers that already have a result were initialized by an earlier run
+                existing_customer_ids = set(db.execute(
+                    select(models.BulkCallResult.customer_id).where(
+                        models.BulkCallResult.campaign_id == campaign.id,
+                        models.BulkCallResult.customer_id.in_(chunk)
+                    )
+                ).scalars())
                 
-                # Initiate Twilio call
-                twilio_result = twilio_service.initiate_outbound_call(
-                    to_phone=result.customer_phone,
-                    session_id=session.id,
-                    webhook_url=webhook_base_url,
-                    agent_type=campaign.agent_type
+                customers = db.execute(
+                    select(models.Customer.id, models.Customer.name, models.Customer.phone).where(
+                        models.Customer.id.in_(chunk),
+                        models.Customer.tenant_id == tenant_id
+                    ).execution_options(yield_per=chunk_size)
                 )
                 
-                # Update result with Twilio SID
-                result.twilio_call_sid = twilio_result["call_sid"]
-                result.twilio_status = twilio_result["status"]
+                now = datetime.now(timezone.utc)
+                rows = [
+                    {
+                        "id": generate_id("result"),
+                        "campaign_id": campaign.id,
+                        "tenant_id": tenant_id,
+                        "customer_id": customer_id,
+                        "customer_name": name,
+                        "customer_phone": phone,
+                        "status": models.BulkCallResultStatusEnum.queued,
+                        "created_at": now,
+                        "updated_at": now,
+                    }
+                    for customer_id, name, phone in customers
+                    if customer_id not in existing_customer_ids
+                ]
                 
-                processed += 1
-                
-                logger.info(f"✅ Initiated call to {result.customer_phone}: {twilio_result['call_sid']}")
-                
-            except Exception as e:
-                logger.error(f"❌ Failed to initiate call to {result.customer_phone}: {e}")
-                
-                result.status = models.BulkCallResultStatusEnum.failed
-                result.error_message = str(e)
-                failed += 1
+                if rows:
+                    db.execute(insert(models.BulkCallResult), rows)
+                    created += len(rows)
             
-            finally:
-                db.commit()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
         
-        return {
-            "success": True,
-            "processed": processed,
-            "failed": failed
-        }
+        logger.info(f"✅ Initialized {created} call results for campaign {campaign.id}")
+        return created
     
     @staticmethod
     def execute_campaign(
         db: Session,
         campaign_id: str,
         tenant_id: str,
-        webhook_base_url: str
+        webhook_base_url: str,
+        stop_event: Optional[threading.Event] = None
     ) -> Dict[str, Any]:
-        """Execute entire campaign with batch processing"""
+        """
+        Execute entire campaign through the concurrent dialer.
+        Safe to call again for a campaign that was interrupted: already
+        initialized and already dialed results are skipped.
+        """
         
         campaign = BulkCallCampaignService.get_campaign(db, campaign_id, tenant_id)
         if not campaign:
@@ -570,43 +651,518 @@ class BulkCallExecutionService:
             models.BulkCallStatusEnum.running
         )
         
-        # Initialize all call results
-        all_results = BulkCallExecutionService.initialize_campaign_calls(
+        # Initialize call results that an earlier run did not create
+        BulkCallExecutionService.initialize_campaign_calls(
             db,
             campaign,
             tenant_id
         )
         
-        # Process in batches based on concurrency limit
-        batch_size = campaign.concurrency_limit
-        total_processed = 0
-        total_failed = 0
+        dialer = CampaignDialer(db, campaign, webhook_base_url, stop_event=stop_event)
+        dial_result = dialer.run()
         
-        for i in range(0, len(all_results), batch_size):
-            batch = all_results[i:i + batch_size]
-            
-            logger.info(f"🔄 Processing batch {i // batch_size + 1}/{(len(all_results) + batch_size - 1) // batch_size}")
-            
-            batch_result = BulkCallExecutionService.process_campaign_batch(
-                db,
-                campaign,
-                batch,
-                webhook_base_url
-            )
-            
-            total_processed += batch_result.get("processed", 0)
-            total_failed += batch_result.get("failed", 0)
-        
-        logger.info(f"✅ Campaign execution complete: {total_processed} processed, {total_failed} failed")
+        logger.info(
+            f"✅ Campaign execution complete: {dial_result.get('processed', 0)} processed, "
+            f"{dial_result.get('failed', 0)} failed"
+        )
         
+        return {
+            "success": dial_result.get("success", False),
+            "campaign_id": campaign_id,
+            "total_calls": campaign.total_calls,
+            "processed": dial_result.get("processed", 0),
+            "failed": dial_result.get("failed", 0),
+            **({"error": dial_result["error"]} if dial_result.get("error") else {})
+        }
+
+
+# ============================================================================
+# CAMPAIGN DIALER
+# ============================================================================
+
+# How long the dialer sleeps between refill passes when no slot was released
+DIALER_POLL_INTERVAL_SECONDS = float(os.getenv("DIALER_POLL_INTERVAL_SECONDS", "2"))
+# An in-progress call older than this no longer holds a slot (missed status webhook)
+DIALER_SLOT_TIMEOUT_SECONDS = int(os.getenv("DIALER_SLOT_TIMEOUT_SECONDS", "900"))
+
+_slot_events: Dict[str, threading.Event] = {}
+_slot_events_lock = threading.Lock()
+
+
+def _get_slot_event(campaign_id: str) -> threading.Event:
+    with _slot_events_lock:
+        event = _slot_events.get(campaign_id)
+        if event is None:
+            event = threading.Event()
+            _slot_events[campaign_id] = event
+        return event
+
+
+def notify_slot_released(campaign_id: str) -> None:
+    """Wake the dialer of a campaign because one of its calls reached a terminal status"""
+    with _slot_events_lock:
+        event = _slot_events.get(campaign_id)
+    if event is not None:
+        event.set()
+
+
+class CampaignDialer:
+    """
+    Keeps up to ``concurrency_limit`` calls of a campaign in flight at once.
+
+    A call holds its slot from the moment it is dialed until its result reaches a
+    terminal status (normally through the Twilio status webhook). The blocking
+    Twilio client runs in a bounded thread pool; every database write stays on the
+    dialer's own thread because a SQLAlchemy Session is not thread-safe.
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        campaign: models.BulkCallCampaign,
+        webhook_base_url: str,
+        poll_interval: float = DIALER_POLL_INTERVAL_SECONDS,
+        slot_timeout: int = DIALER_SLOT_TIMEOUT_SECONDS,
+        stop_event: Optional[threading.Event] = None
+    ):
+        self.db = db
+        self.campaign = campaign
+        self.webhook_base_url = webhook_base_url
+        self.poll_interval = poll_interval
+        self.slot_timeout = slot_timeout
+        self.stop_event = stop_event
+        self.concurrency_limit = max(1, campaign.concurrency_limit or 1)
+        self.processed = 0
+        self.failed = 0
+
+    def run(self) -> Dict[str, Any]:
+        """Dial every queued result of the campaign, refilling slots as calls finish"""
+        twilio_service = get_twilio_service()
+
+        if not twilio_service.is_configured():
+            logger.error("❌ Twilio not configured. Cannot make calls.")
+            return {
+                "success": False,
+                "error": "Twilio not configured",
+                "processed": 0,
+                "failed": self._count_queued()
+            }
+
+        slot_event = _get_slot_event(self.campaign.id)
+        pending: Dict[Future, str] = {}
+
+        try:
+            with ThreadPoolExecutor(
+                max_workers=self.concurrency_limit,
+                thread_name_prefix=f"dialer-{self.campaign.id}"
+            ) as executor:
+                while True:
+                    self._collect_finished(pending)
+
+                    if not self._is_campaign_active():
+                        logger.info(f"⏹️ Campaign {self.campaign.id} is no longer running, stopping dialer")
+                        break
+
+                    free_slots = self.concurrency_limit - self._count_in_flight()
+                    if free_slots > 0:
+                        for result in self._next_queued(free_slots):
+                            session_id = self._prepare_call(result)
+                            future = executor.submit(
+                                twilio_service.initiate_outbound_call,
+                                to_phone=result.customer_phone,
+                                session_id=session_id,
+                                webhook_url=self.webhook_base_url,
+                                agent_type=self.campaign.agent_type
+                            )
+                            pending[future] = result.id
+
+                    if not pending and self._count_queued() == 0 and self._count_in_flight() == 0:
+                        break
+
+                    # Sleep until a dial returns, a slot is released or the poll interval elapses
+                    slot_event.clear()
+                    if pending:
+                        wait(list(pending), timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                    else:
+                        slot_event.wait(self.poll_interval)
+
+                # Do not leave dial outcomes unrecorded when stopping early
+                wait(list(pending))
+                self._collect_finished(pending)
+        finally:
+            with _slot_events_lock:
+                _slot_events.pop(self.campaign.id, None)
+
         return {
             "success": True,
+            "processed": self.processed,
+            "failed": self.failed
+        }
+
+    def _is_campaign_active(self) -> bool:
+        if self.stop_event is not None and self.stop_event.is_set():
+            return False
+        self.db.refresh(self.campaign)
+        return self.campaign.status == models.BulkCallStatusEnum.running
+
+    def _count_queued(self) -> int:
+        return self.db.query(func.count(models.BulkCallResult.id)).filter(
+            models.BulkCallResult.campaign_id == self.campaign.id,
+            models.BulkCallResult.status == models.BulkCallResultStatusEnum.queued
+        ).scalar() or 0
+
+    def _count_in_flight(self) -> int:
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=self.slot_timeout)
+        return self.db.query(func.count(models.BulkCallResult.id)).filter(
+            models.BulkCallResult.campaign_id == self.campaign.id,
+            models.BulkCallResult.status == models.BulkCallResultStatusEnum.in_progress,
+            models.BulkCallResult.updated_at >= stale_before
+        ).scalar() or 0
+
+    def _next_queued(self, limit: int) -> List[models.BulkCallResult]:
+        return self.db.query(models.BulkCallResult).filter(
+            models.BulkCallResult.campaign_id == self.campaign.id,
+            models.BulkCallResult.status == models.BulkCallResultStatusEnum.queued
+        ).order_by(models.BulkCallResult.created_at).limit(limit).all()
+
+    def _prepare_call(self, result: models.BulkCallResult) -> str:
+        """Create the voice session and claim the slot before the call is dialed"""
+        session = models.VoiceSession(
+            id=f"vs_{secrets.token_hex(8)}",
+            tenant_id=self.campaign.tenant_id,
+            customer_id=result.customer_id,
+            customer_phone=result.customer_phone,
+            direction="outbound",
+            locale="ar-SA",
+            agent_name=self.campaign.agent_type,
+            status=models.VoiceSessionStatus.ACTIVE
+        )
+        self.db.add(session)
+        self.db.flush()
+
+        result.voice_session_id = session.id
+        result.status = models.BulkCallResultStatusEnum.in_progress
+        result.updated_at = datetime.now(timezone.utc)
+        self.db.commit()
+        mark_kpis_dirty(session.tenant_id, session.created_at)
+        publish_session_event(session)
+        publish_result_event(result)
+
+        return session.id
+
+    def _collect_finished(self, pending: Dict[Future, str]) -> None:
+        """Record the outcome of every dial request that has returned"""
+        for future in [f for f in pending if f.done()]:
+            result_id = pending.pop(future)
+            result = self.db.query(models.BulkCallResult).filter_by(id=result_id).first()
+            if not result:
+                continue
+
+            try:
+                twilio_result = future.result()
+            except Exception as e:
+                logger.error(f"❌ Failed to initiate call to {result.customer_phone}: {e}")
+                BulkCallResultService.update_result_status(
+                    self.db,
+                    result.id,
+                    models.BulkCallResultStatusEnum.failed,
+                    error_message=str(e)
+                )
+                self.failed += 1
+                continue
+
+            # A fast status webhook may already have moved the result on
+            result.twilio_call_sid = twilio_result["call_sid"]
+            if result.status == models.BulkCallResultStatusEnum.in_progress:
+                result.twilio_status = twilio_result["status"]
+            self.db.commit()
+            get_correlation_cache().put(result.twilio_call_sid, result.id, result.voice_session_id)
+            self.processed += 1
+
+            logger.info(f"✅ Initiated call to {result.customer_phone}: {twilio_result['call_sid']}")
+
+
+# ============================================================================
+# TWILIO STATUS INGEST
+# ============================================================================
+
+# Twilio CallStatus -> result status. Early events never map back to queued,
+# otherwise the dialer would pick the customer up again.
+TWILIO_RESULT_STATUS = {
+    'queued': models.BulkCallResultStatusEnum.in_progress,
+    'initiated': models.BulkCallResultStatusEnum.in_progress,
+    'ringing': models.BulkCallResultStatusEnum.in_progress,
+    'answered': models.BulkCallResultStatusEnum.in_progress,
+    'in-progress': models.BulkCallResultStatusEnum.in_progress,
+    'completed': models.BulkCallResultStatusEnum.success,
+    'failed': models.BulkCallResultStatusEnum.failed,
+    'canceled': models.BulkCallResultStatusEnum.failed,
+    'busy': models.BulkCallResultStatusEnum.busy,
+    'no-answer': models.BulkCallResultStatusEnum.no_answer,
+}
+
+# Twilio CallStatus values after which the call produces no more events
+TWILIO_FINAL_STATUSES = ('completed', 'failed', 'canceled', 'busy', 'no-answer')
+
+# Twilio CallStatus -> voice session status. "completed" is left to the
+# ElevenLabs post-call webhook, which closes the session with its transcript.
+TWILIO_SESSION_STATUS = {
+    'ringing': models.VoiceSessionStatus.ACTIVE,
+    'answered': models.VoiceSessionStatus.ACTIVE,
+    'in-progress': models.VoiceSessionStatus.ACTIVE,
+    'failed': models.VoiceSessionStatus.FAILED,
+    'canceled': models.VoiceSessionStatus.FAILED,
+    'busy': models.VoiceSessionStatus.FAILED,
+    'no-answer': models.VoiceSessionStatus.FAILED,
+}
+
+
+class CallCorrelationCache:
+    """
+    Bounded LRU map of Twilio call SID -> (result id, voice session id).
+
+    Filled when the dialer gets the SID back from Twilio, so the status
+    events of a call resolve without touching the database. Misses (other
+    process, restart, eviction) fall back to the indexed columns.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, call_sid: str, result_id: Optional[str], session_id: Optional[str]) -> None:
+        with self._lock:
+            self._entries[call_sid] = (result_id, session_id)
+            self._entries.move_to_end(call_sid)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, call_sid: str) -> Optional[tuple]:
+        with self._lock:
+            entry = self._entries.get(call_sid)
+            if entry is not None:
+                self._entries.move_to_end(call_sid)
+            return entry
+
+    def discard(self, call_sid: str) -> None:
+        with self._lock:
+            self._entries.pop(call_sid, None)
+
+
+_correlation_cache_instance = None
+
+def get_correlation_cache() -> CallCorrelationCache:
+    """Get or create the singleton CallCorrelationCache instance"""
+    global _correlation_cache_instance
+    if _correlation_cache_instance is None:
+        _correlation_cache_instance = CallCorrelationCache(CALL_CORRELATION_CACHE_SIZE)
+    return _correlation_cache_instance
+
+
+class CallStatusIngestService:
+    """Single entry point for Twilio call status callbacks"""
+
+    @staticmethod
+    def resolve(
+        db: Session,
+        call_sid: Optional[str],
+        session_id: Optional[str] = None
+    ) -> tuple:
+        """Find the (result id, voice session id) a Twilio call belongs to"""
+        cache = get_correlation_cache()
+        if call_sid:
+            entry = cache.get(call_sid)
+            if entry is not None:
+                return entry[0], entry[1] or session_id
+
+        row = None
+        if call_sid:
+            row = db.query(
+                models.BulkCallResult.id, models.BulkCallResult.voice_session_id
+            ).filter(models.BulkCallResult.twilio_call_sid == call_sid).first()
+        if row is None and session_id:
+            # The first events can arrive before the dialer stored the SID
+            row = db.query(
+                models.BulkCallResult.id, models.BulkCallResult.voice_session_id
+            ).filter(models.BulkCallResult.voice_session_id == session_id).first()
+
+        result_id = row.id if row else None
+        session_id = session_id or (row.voice_session_id if row else None)
+        if call_sid and (result_id or session_id):
+            cache.put(call_sid, result_id, session_id)
+        return result_id, session_id
+
+    @staticmethod
+    def ingest_status(
+        db: Session,
+        call_sid: Optional[str],
+        call_status: str,
+        session_id: Optional[str] = None,
+        commit: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Apply a Twilio status event to the voice session and the bulk call
+        result of the call, committed in one transaction.
+        With ``commit=False`` the caller owns the transaction (batched ingest).
+        """
+        result_id, session_id = CallStatusIngestService.resolve(db, call_sid, session_id)
+
+        if session_id and call_status in TWILIO_SESSION_STATUS:
+            session_status = TWILIO_SESSION_STATUS[call_status]
+            updated = db.query(models.VoiceSession).filter(
+                models.VoiceSession.id == session_id,
+                models.VoiceSession.status != session_status
+            ).update({models.VoiceSession.status: session_status}, synchronize_session=False)
+            if updated:
+                db.execute(session_status_update(session_id, session_status))
+            failed = session_status == models.VoiceSessionStatus.FAILED
+            if updated and (failed or get_live_event_broker().has_subscribers()):
+                owner = db.query(models.VoiceSession.tenant_id, models.VoiceSession.created_at).filter(
+                    models.VoiceSession.id == session_id
+                ).first()
+                if owner:
+                    if failed:
+                        # Failed calls count in the KPI rollup of the session's day
+                        run_after_commit(db, lambda: mark_kpis_dirty(owner.tenant_id, owner.created_at))
+                    event = {
+                        "session_id": session_id,
+                        "status": session_status.value,
+                        "twilio_status": call_status,
+                    }
+                    run_after_commit(db, lambda: publish_live_event(owner.tenant_id, "session", event))
+
+        result_status = None
+        campaign_id = None
+        if result_id:
+            result_status = TWILIO_RESULT_STATUS.get(call_status, models.BulkCallResultStatusEnum.in_progress)
+            # Commits the session update together with the result
+            result = BulkCallResultService.update_result_status(
+                db=db,
+                result_id=result_id,
+                status=result_status,
+                twilio_call_sid=call_sid,
+                twilio_status=call_status,
+                commit=commit
+            )
+            campaign_id = result.campaign_id if result else None
+            if call_sid and result_status in TERMINAL_RESULT_STATUSES:
+                get_correlation_cache().discard(call_sid)
+        elif commit:
+            db.commit()
+
+        return {
+            "result_id": result_id,
+            "session_id": session_id,
             "campaign_id": campaign_id,
-            "total_calls": len(all_results),
-            "processed": total_processed,
-            "failed": total_failed
+            "result_status": result_status.value if result_status else None,
         }
 
+    @staticmethod
+    def ingest_status_now(
+        call_sid: Optional[str],
+        call_status: str,
+        session_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        ingest_status in its own session. Async webhooks run it in the
+        threadpool when the status buffer is off or full.
+        """
+        db = SessionLocal()
+        try:
+            return CallStatusIngestService.ingest_status(db, call_sid, call_status, session_id=session_id)
+        finally:
+            db.close()
+
+
+# ============================================================================
+# CAMPAIGN PROGRESS BUFFER
+# ============================================================================
+
+class CampaignProgressBuffer:
+    """
+    Aggregates campaign counter deltas in memory and flushes them periodically.
+
+    With hundreds of calls finishing at once, each flush turns many webhook
+    increments into one atomic UPDATE per campaign. Deltas that fail to flush
+    are put back and retried on the next tick.
+    """
+
+    def __init__(self, flush_interval_ms: int):
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._deltas: Dict[str, List[int]] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def add(self, campaign_id: str, completed_delta: int = 0, failed_delta: int = 0, successful_delta: int = 0) -> None:
+        with self._lock:
+            delta = self._deltas.setdefault(campaign_id, [0, 0, 0])
+            delta[0] += completed_delta
+            delta[1] += failed_delta
+            delta[2] += successful_delta
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="campaign-progress-flush", daemon=True)
+                self._thread.start()
+
+    def flush(self) -> int:
+        """Write pending deltas. Returns the number of campaigns flushed."""
+        with self._lock:
+            pending, self._deltas = self._deltas, {}
+        if not pending:
+            return 0
+
+        db = SessionLocal()
+        try:
+            for campaign_id, (completed, failed, successful) in pending.items():
+                BulkCallCampaignService.update_campaign_progress(
+                    db,
+                    campaign_id,
+                    completed_delta=completed,
+                    failed_delta=failed,
+                    successful_delta=successful,
+                    commit=False
+                )
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            logger.error(f"❌ Failed to flush campaign progress, will retry: {e}")
+            for campaign_id, (completed, failed, successful) in pending.items():
+                self.add(campaign_id, completed, failed, successful)
+            return 0
+        finally:
+            db.close()
+
+        for campaign_id in pending:
+            notify_slot_released(campaign_id)
+        return len(pending)
+
+    def stop(self) -> None:
+        """Stop the flush thread and write whatever is still buffered"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+
+_progress_buffer_instance = None
+
+def get_progress_buffer() -> CampaignProgressBuffer:
+    """Get or create the singleton CampaignProgressBuffer instance"""
+    global _progress_buffer_instance
+    if _progress_buffer_instance is None:
+        _progress_buffer_instance = CampaignProgressBuffer(CAMPAIGN_PROGRESS_FLUSH_MS)
+    return _progress_buffer_instance
+
+def shutdown_progress_buffer() -> None:
+    """Flush buffered campaign progress before the process exits"""
+    if _progress_buffer_instance is not None:
+        _progress_buffer_instance.stop()
+
 
 # ============================================================================
 # SERVICE EXPORTS
@@ -617,6 +1173,15 @@ __all__ = [
     "BulkCallCampaignService",
     "BulkCallResultService",
     "BulkCallExecutionService",
+    "CampaignDialer",
+    "notify_slot_released",
+    "CampaignProgressBuffer",
+    "get_progress_buffer",
+    "shutdown_progress_buffer",
+    "CallCorrelationCache",
+    "get_correlation_cache",
+    "CallStatusIngestService",
+    "TWILIO_FINAL_STATUSES",
     "generate_id",
     "extract_variables_from_script",
 ]
@@ -0,0 +1,170 @@
+"""
+Call Feed Service Module
+Maintains the call_feed projection behind GET /calls.
+
+A call's response row combines Call, Conversation, Customer and VoiceSession.
+Instead of joining the four tables (and coercing enums) on every read, the
+writers of those rows project the affected calls into call_feed in the same
+transaction: call creation, webhook processing (history records, duration and
+recording URL), voice session status changes and customer renames. Reading the
+feed is then a single-table range scan of (tenant_id, created_at, id).
+``rebuild_call_feed`` recomputes the whole table from the source tables.
+"""
+
+import logging
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Union
+
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+FEED_COLUMNS = [column.name for column in models.CallFeed.__table__.columns]
+
+
+def _value(value: Any) -> Any:
+    """Enum members are stored by value, plain strings as they are"""
+    return value.value if hasattr(value, "value") else value
+
+
+def feed_row(
+    call: Union[models.Call, Mapping[str, Any]],
+    customer_id: Optional[str],
+    customer_name: Optional[str],
+    voice_session: Optional[models.VoiceSession] = None,
+    conversation_recording_url: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    The call_feed row of a call, its conversation's customer and its voice session.
+    ``call`` may also be the column values of a call being bulk inserted.
+    """
+    if isinstance(call, Mapping):
+        call = SimpleNamespace(**call)
+    vs = voice_session
+    return {
+        "id": call.id,
+        "tenant_id": call.tenant_id,
+        "conversation_id": call.conversation_id,
+        "customer_id": customer_id,
+        "customer_name": customer_name,
+        "direction": str(_value(call.direction)),
+        "status": str(_value(call.status)),
+        "outcome": _value(call.outcome) if call.outcome else None,
+        "created_at": call.created_at,
+        "handle_sec": call.handle_sec,
+        # The webhook stores the recording on both the call and its conversation
+        "recording_url": call.recording_url or conversation_recording_url,
+        "voice_session_id": vs.id if vs else None,
+        "extracted_intent": vs.extracted_intent if vs else None,
+        "summary": vs.summary if vs else None,
+        "agent_name": vs.agent_name if vs else None,
+        "session_status": _value(vs.status) if vs else None,
+        "updated_at": datetime.utcnow(),
+    }
+
+
+def _source_query():
+    """The four-way join the feed is projected from"""
+    return select(
+        models.Call, models.Conversation.customer_id, models.Customer.name, models.VoiceSession,
+        models.Conversation.recording_url
+    )\
+        .outerjoin(models.Conversation, models.Call.conversation_id == models.Conversation.id)\
+        .outerjoin(models.Customer, models.Conversation.customer_id == models.Customer.id)\
+        .outerjoin(models.VoiceSession, models.Call.conversation_id == models.VoiceSession.conversation_id)
+
+
+def _upsert_statement(dialect_name: str):
+    """INSERT ... ON CONFLICT (id) DO UPDATE, executed with a list of rows (executemany)"""
+    dialect_insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(models.CallFeed)
+    return stmt.on_conflict_do_update(
+        index_elements=[models.CallFeed.id],
+        set_={name: stmt.excluded[name] for name in FEED_COLUMNS if name != "id"}
+    )
+
+
+async def upsert_call_feed(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """Write feed rows built by ``feed_row`` in the caller's transaction"""
+    if not rows:
+        return
+    await db.execute(_upsert_statement(db.get_bind().dialect.name), rows)
+
+
+async def refresh_call_feed(db: AsyncSession, conversation_ids: Iterable[str]) -> int:
+    """
+    Re-project the calls of the given conversations from the source tables.
+    Pending changes are flushed first, so uncommitted writes are included.
+    """
+    conversation_ids = [conv_id for conv_id in set(conversation_ids) if conv_id]
+    if not conversation_ids:
+        return 0
+    await db.flush()
+    result = await db.execute(_source_query().where(models.Call.conversation_id.in_(conversation_ids)))
+    rows = [feed_row(*row) for row in result.all()]
+    await upsert_call_feed(db, rows)
+    return len(rows)
+
+
+def session_status_update(session_id: str, status: Union[models.VoiceSessionStatus, str]):
+    """Statement that copies a voice session's new status to its calls' feed rows"""
+    return update(models.CallFeed).where(
+        models.CallFeed.voice_session_id == session_id
+    ).values(session_status=_value(status), updated_at=datetime.utcnow())
+
+
+def customer_name_update(customer_id: str, name: Optional[str]):
+    """Statement that copies a customer's new name to its calls' feed rows"""
+    return update(models.CallFeed).where(
+        models.CallFeed.customer_id == customer_id,
+        models.CallFeed.customer_name.is_distinct_from(name)
+    ).values(customer_name=name, updated_at=datetime.utcnow())
+
+
+def recording_url_update(conversation_id: str, recording_url: Optional[str]):
+    """Statement that copies a conversation's recording URL to its call's feed row"""
+    return update(models.CallFeed).where(
+        models.CallFeed.id.in_(select(models.Call.id).where(models.Call.conversation_id == conversation_id))
+    ).values(recording_url=recording_url, updated_at=datetime.utcnow())
+
+
+def rebuild_call_feed(db: Session, tenant_id: Optional[str] = None, batch_size: int = 1000) -> int:
+    """Recompute the feed rows of every call (of one tenant) and commit"""
+    query = _source_query().order_by(models.Call.id)
+    if tenant_id:
+        query = query.where(models.Call.tenant_id == tenant_id)
+
+    dialect_name = db.get_bind().dialect.name
+    written = 0
+    last_id = None
+    while True:
+        page = query.where(models.Call.id > last_id) if last_id is not None else query
+        batch = db.execute(page.limit(batch_size)).all()
+        if not batch:
+            break
+        rows = [feed_row(*row) for row in batch]
+        db.execute(_upsert_statement(dialect_name), rows)
+        db.commit()
+        db.expunge_all()
+        written += len(rows)
+        last_id = rows[-1]["id"]
+
+    logger.info(f"🧮 Call feed rebuilt: {written} calls{f' for tenant {tenant_id}' if tenant_id else ''}")
+    return written
+
+
+__all__ = [
+    "feed_row",
+    "upsert_call_feed",
+    "refresh_call_feed",
+    "session_status_update",
+    "customer_name_update",
+    "recording_url_update",
+    "rebuild_call_feed",
+]
@@ -0,0 +1,180 @@
+"""
+Call Status Buffer Module
+Batched ingest of Twilio call status callbacks.
+
+Twilio sends up to seven status callbacks per outbound call. The webhook
+routes only hand the event to this buffer and answer Twilio immediately; a
+writer thread keeps the latest event per call and applies all pending calls
+in one transaction every few hundred milliseconds.
+"""
+
+import logging
+import os
+import threading
+from typing import Dict, Optional
+
+from app.db import SessionLocal
+from app.services.bulk_call_service import (
+    CallStatusIngestService,
+    TWILIO_FINAL_STATUSES,
+    notify_slot_released,
+)
+
+logger = logging.getLogger(__name__)
+
+# Flush pending status events every N milliseconds (0 = apply each event synchronously)
+CALL_STATUS_FLUSH_MS = int(os.getenv("CALL_STATUS_FLUSH_MS", "250"))
+# Max number of calls with a pending event; beyond that callers apply events themselves
+CALL_STATUS_QUEUE_SIZE = int(os.getenv("CALL_STATUS_QUEUE_SIZE", "10000"))
+
+
+class CallStatusEvent:
+    """Latest known Twilio status of one call"""
+
+    __slots__ = ("call_sid", "call_status", "session_id", "sequence")
+
+    def __init__(self, call_sid: Optional[str], call_status: str, session_id: Optional[str], sequence: Optional[int]):
+        self.call_sid = call_sid
+        self.call_status = call_status
+        self.session_id = session_id
+        self.sequence = sequence
+
+    def supersedes(self, other: "CallStatusEvent") -> bool:
+        """Whether this event should replace ``other`` for the same call"""
+        if (other.call_status in TWILIO_FINAL_STATUSES) != (self.call_status in TWILIO_FINAL_STATUSES):
+            # A final status is never replaced by a late intermediate one
+            return self.call_status in TWILIO_FINAL_STATUSES
+        if self.sequence is not None and other.sequence is not None:
+            return self.sequence >= other.sequence
+        return True
+
+
+class CallStatusBuffer:
+    """Bounded, coalescing queue of Twilio status events with a batch writer"""
+
+    def __init__(self, flush_interval_ms: int, max_size: int):
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_size = max_size
+        self._pending: Dict[str, CallStatusEvent] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(
+        self,
+        call_sid: Optional[str],
+        call_status: Optional[str],
+        session_id: Optional[str] = None,
+        sequence: Optional[str] = None
+    ) -> bool:
+        """
+        Queue an event. Returns False when the buffer is full or stopped, in
+        which case the caller must apply the event itself.
+        """
+        key = call_sid or session_id
+        if not key or not call_status or self._stop.is_set():
+            return False
+
+        event = CallStatusEvent(
+            call_sid,
+            call_status,
+            session_id,
+            int(sequence) if sequence and str(sequence).isdigit() else None
+        )
+
+        with self._lock:
+            current = self._pending.get(key)
+            if current is None:
+                if len(self._pending) >= self.max_size:
+                    return False
+                self._pending[key] = event
+            elif event.supersedes(current):
+                event.session_id = event.session_id or current.session_id
+                self._pending[key] = event
+            else:
+                current.session_id = current.session_id or event.session_id
+
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="call-status-flush", daemon=True)
+                self._thread.start()
+        return True
+
+    def flush(self) -> int:
+        """Apply all pending events. Returns the number of calls written."""
+        with self._lock:
+            batch, self._pending = list(self._pending.values()), {}
+        if not batch:
+            return 0
+
+        db = SessionLocal()
+        try:
+            campaign_ids = set()
+            try:
+                for event in batch:
+                    ingested = CallStatusIngestService.ingest_status(
+                        db, event.call_sid, event.call_status, session_id=event.session_id, commit=False
+                    )
+                    if ingested["campaign_id"]:
+                        campaign_ids.add(ingested["campaign_id"])
+                db.commit()
+            except Exception as e:
+                # Retry one by one so a single bad event does not drop the batch.
+                # The rollback also drops the failed pass's after-commit effects
+                # (progress deltas, live events), so nothing is counted twice.
+                db.rollback()
+                logger.error(f"❌ Batched call status write failed, retrying per call: {e}")
+                campaign_ids = set()
+                for event in batch:
+                    try:
+                        CallStatusIngestService.ingest_status(
+                            db, event.call_sid, event.call_status, session_id=event.session_id
+                        )
+                    except Exception as event_error:
+                        db.rollback()
+                        logger.error(f"❌ Failed to apply status {event.call_status} for call {event.call_sid}: {event_error}")
+        finally:
+            db.close()
+
+        for campaign_id in campaign_ids:
+            notify_slot_released(campaign_id)
+
+        logger.debug(f"📞 Flushed status of {len(batch)} calls")
+        return len(batch)
+
+    def stop(self) -> None:
+        """Stop the writer thread and apply whatever is still pending"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Call status writer error: {e}", exc_info=True)
+
+
+_call_status_buffer_instance = None
+
+def get_call_status_buffer() -> Optional[CallStatusBuffer]:
+    """Get or create the singleton CallStatusBuffer (None when buffering is disabled)"""
+    global _call_status_buffer_instance
+    if CALL_STATUS_FLUSH_MS <= 0:
+        return None
+    if _call_status_buffer_instance is None:
+        _call_status_buffer_instance = CallStatusBuffer(CALL_STATUS_FLUSH_MS, CALL_STATUS_QUEUE_SIZE)
+    return _call_status_buffer_instance
+
+def shutdown_call_status_buffer() -> None:
+    """Apply buffered status events before the process exits"""
+    if _call_status_buffer_instance is not None:
+        _call_status_buffer_instance.stop()
+
+
+__all__ = [
+    "CallStatusBuffer",
+    "get_call_status_buffer",
+    "shutdown_call_status_buffer",
+]
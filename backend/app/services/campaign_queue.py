@@ -0,0 +1,325 @@
+"""
+Campaign Job Queue Module
+Durable, database-backed queue for bulk call campaigns.
+
+Campaign rows are the jobs: a worker claims a campaign by taking a lease on it,
+keeps the lease alive with heartbeats while the dialer runs, and releases it when
+dialing is done. A campaign whose lease expired (crashed or partitioned worker) is
+claimed again by another worker and resumes from the results already stored.
+"""
+
+import logging
+import os
+import socket
+import threading
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import SessionLocal
+from app.services.bulk_call_service import (
+    BulkCallCampaignService,
+    BulkCallResultService,
+    BulkCallExecutionService,
+)
+
+logger = logging.getLogger(__name__)
+
+CAMPAIGN_LEASE_SECONDS = int(os.getenv("CAMPAIGN_LEASE_SECONDS", "60"))
+CAMPAIGN_HEARTBEAT_SECONDS = int(os.getenv("CAMPAIGN_HEARTBEAT_SECONDS", "15"))
+CAMPAIGN_WORKER_POLL_SECONDS = float(os.getenv("CAMPAIGN_WORKER_POLL_SECONDS", "5"))
+CAMPAIGN_MAX_ATTEMPTS = int(os.getenv("CAMPAIGN_MAX_ATTEMPTS", "5"))
+DEFAULT_WEBHOOK_BASE_URL = os.getenv("API_URL", "http://localhost:8000")
+
+
+def generate_worker_id() -> str:
+    """Unique, human-readable identity for a worker process"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+
+
+def _claimable():
+    """Queued campaigns, or running campaigns whose worker lost its lease"""
+    now = datetime.now(timezone.utc)
+    return or_(
+        models.BulkCallCampaign.status == models.BulkCallStatusEnum.queued,
+        and_(
+            models.BulkCallCampaign.status == models.BulkCallStatusEnum.running,
+            models.BulkCallCampaign.lease_owner.isnot(None),
+            models.BulkCallCampaign.lease_expires_at < now
+        )
+    )
+
+
+class CampaignJobQueue:
+    """Lease-based claiming of bulk call campaigns"""
+
+    @staticmethod
+    def enqueue(db: Session, campaign: models.BulkCallCampaign, webhook_base_url: str) -> models.BulkCallCampaign:
+        """Mark a campaign as ready to be picked up by a worker"""
+        campaign.webhook_base_url = webhook_base_url
+        campaign.status = models.BulkCallStatusEnum.queued
+        db.commit()
+        db.refresh(campaign)
+
+        logger.info(f"📥 Campaign {campaign.id} queued for execution")
+        return campaign
+
+    @staticmethod
+    def claim_next(db: Session, worker_id: str) -> Optional[models.BulkCallCampaign]:
+        """
+        Claim the oldest claimable campaign.
+        The claim is a conditional UPDATE, so two workers racing for the same
+        row cannot both win it.
+        """
+        candidates = db.query(models.BulkCallCampaign.id).filter(
+            _claimable()
+        ).order_by(models.BulkCallCampaign.created_at).limit(10).all()
+
+        for (campaign_id,) in candidates:
+            now = datetime.now(timezone.utc)
+            claimed = db.query(models.BulkCallCampaign).filter(
+                models.BulkCallCampaign.id == campaign_id,
+                _claimable()
+            ).update({
+                models.BulkCallCampaign.status: models.BulkCallStatusEnum.running,
+                models.BulkCallCampaign.lease_owner: worker_id,
+                models.BulkCallCampaign.lease_expires_at: now + timedelta(seconds=CAMPAIGN_LEASE_SECONDS),
+                models.BulkCallCampaign.heartbeat_at: now,
+                models.BulkCallCampaign.attempts: models.BulkCallCampaign.attempts + 1,
+            }, synchronize_session=False)
+            db.commit()
+
+            if claimed:
+                campaign = db.query(models.BulkCallCampaign).filter_by(id=campaign_id).first()
+                logger.info(f"🔒 Worker {worker_id} claimed campaign {campaign_id} (attempt {campaign.attempts})")
+                return campaign
+
+        return None
+
+    @staticmethod
+    def heartbeat(db: Session, campaign_id: str, worker_id: str) -> bool:
+        """Extend the lease. Returns False if the worker no longer owns the campaign."""
+        now = datetime.now(timezone.utc)
+        extended = db.query(models.BulkCallCampaign).filter(
+            models.BulkCallCampaign.id == campaign_id,
+            models.BulkCallCampaign.lease_owner == worker_id
+        ).update({
+            models.BulkCallCampaign.lease_expires_at: now + timedelta(seconds=CAMPAIGN_LEASE_SECONDS),
+            models.BulkCallCampaign.heartbeat_at: now,
+        }, synchronize_session=False)
+        db.commit()
+        return bool(extended)
+
+    @staticmethod
+    def release(db: Session, campaign_id: str, worker_id: str, requeue: bool = False) -> None:
+        """
+        Give up the lease once dialing has finished or stopped.
+        With ``requeue`` a still-running campaign goes back to the queue so
+        another worker picks up the remaining calls. A hand-back is not a
+        crash, so its claim does not count toward CAMPAIGN_MAX_ATTEMPTS.
+        """
+        db.query(models.BulkCallCampaign).filter(
+            models.BulkCallCampaign.id == campaign_id,
+            models.BulkCallCampaign.lease_owner == worker_id
+        ).update({
+            models.BulkCallCampaign.lease_owner: None,
+            models.BulkCallCampaign.lease_expires_at: None,
+        }, synchronize_session=False)
+        if requeue:
+            db.query(models.BulkCallCampaign).filter(
+                models.BulkCallCampaign.id == campaign_id,
+                models.BulkCallCampaign.status == models.BulkCallStatusEnum.running
+            ).update({
+                models.BulkCallCampaign.status: models.BulkCallStatusEnum.queued,
+                models.BulkCallCampaign.attempts: models.BulkCallCampaign.attempts - 1,
+            }, synchronize_session=False)
+        db.commit()
+
+    @staticmethod
+    def recover_interrupted_calls(db: Session, campaign_id: str) -> int:
+        """
+        Fail results that were claimed by a dead worker but never confirmed by Twilio.
+        They are not re-queued because the call may already have been placed.
+        """
+        orphaned = db.query(models.BulkCallResult).filter(
+            models.BulkCallResult.campaign_id == campaign_id,
+            models.BulkCallResult.status == models.BulkCallResultStatusEnum.in_progress,
+            models.BulkCallResult.twilio_call_sid.is_(None)
+        ).all()
+
+        for result in orphaned:
+            BulkCallResultService.update_result_status(
+                db,
+                result.id,
+                models.BulkCallResultStatusEnum.failed,
+                error_message="Worker stopped before the call was confirmed"
+            )
+
+        if orphaned:
+            logger.warning(f"⚠️ Failed {len(orphaned)} interrupted calls of campaign {campaign_id}")
+        return len(orphaned)
+
+    @staticmethod
+    def finish(db: Session, campaign_id: str, outcome: dict) -> None:
+        """
+        Settle a campaign whose dialer returned without being stopped. If the
+        campaign is still running, it could not dial at all (failed), or only calls
+        whose final Twilio status never arrived are left: they are failed and the
+        campaign is completed. Otherwise no worker would ever claim it again.
+        """
+        campaign = db.query(models.BulkCallCampaign).filter_by(id=campaign_id).first()
+        if not campaign or campaign.status != models.BulkCallStatusEnum.running:
+            return
+
+        if not outcome.get("success"):
+            logger.error(f"❌ Campaign {campaign_id} could not be dialed: {outcome.get('error')}")
+            BulkCallCampaignService.update_campaign_status(db, campaign_id, models.BulkCallStatusEnum.failed)
+            return
+
+        unconfirmed = db.query(models.BulkCallResult.id).filter(
+            models.BulkCallResult.campaign_id == campaign_id,
+            models.BulkCallResult.status == models.BulkCallResultStatusEnum.in_progress
+        ).all()
+        for (result_id,) in unconfirmed:
+            BulkCallResultService.update_result_status(
+                db,
+                result_id,
+                models.BulkCallResultStatusEnum.failed,
+                error_message="No final call status received from Twilio"
+            )
+        if unconfirmed:
+            logger.warning(f"⚠️ Failed {len(unconfirmed)} calls of campaign {campaign_id} without a final status")
+
+        # Progress may reach the finish line first; only a still-running campaign changes
+        db.refresh(campaign)
+        if campaign.status == models.BulkCallStatusEnum.running:
+            BulkCallCampaignService.update_campaign_status(db, campaign_id, models.BulkCallStatusEnum.completed)
+
+
+class CampaignWorker:
+    """Claims campaigns from the queue and runs them one at a time"""
+
+    def __init__(self, worker_id: Optional[str] = None, poll_interval: float = CAMPAIGN_WORKER_POLL_SECONDS):
+        self.worker_id = worker_id or generate_worker_id()
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+
+    def run_forever(self, stop_event: Optional[threading.Event] = None) -> None:
+        """Poll for campaigns until ``stop_event`` is set"""
+        stop_event = stop_event or threading.Event()
+        self.stop_event = stop_event
+        logger.info(f"👷 Campaign worker {self.worker_id} started")
+
+        while not stop_event.is_set():
+            try:
+                worked = self.run_once()
+            except Exception as e:
+                logger.error(f"❌ Campaign worker {self.worker_id} error: {e}", exc_info=True)
+                worked = False
+            if not worked:
+                stop_event.wait(self.poll_interval)
+
+        logger.info(f"👷 Campaign worker {self.worker_id} stopped")
+
+    def run_once(self) -> bool:
+        """Claim and execute a single campaign. Returns False if the queue was empty."""
+        db = SessionLocal()
+        try:
+            campaign = CampaignJobQueue.claim_next(db, self.worker_id)
+            if not campaign:
+                return False
+
+            if campaign.attempts > CAMPAIGN_MAX_ATTEMPTS:
+                logger.error(f"❌ Campaign {campaign.id} exceeded {CAMPAIGN_MAX_ATTEMPTS} attempts, marking failed")
+                BulkCallCampaignService.update_campaign_status(db, campaign.id, models.BulkCallStatusEnum.failed)
+                CampaignJobQueue.release(db, campaign.id, self.worker_id)
+                return True
+
+            if campaign.attempts > 1:
+                CampaignJobQueue.recover_interrupted_calls(db, campaign.id)
+
+            self._execute(db, campaign)
+            return True
+        finally:
+            db.close()
+
+    def _execute(self, db: Session, campaign: models.BulkCallCampaign) -> None:
+        # Set when the dialer must stop: lease lost or worker shutting down
+        halt = threading.Event()
+        lease_lost = threading.Event()
+        done = threading.Event()
+        heartbeat = threading.Thread(
+            target=self._heartbeat_loop,
+            args=(campaign.id, halt, lease_lost, done),
+            name=f"heartbeat-{campaign.id}",
+            daemon=True
+        )
+        heartbeat.start()
+
+        try:
+            outcome = BulkCallExecutionService.execute_campaign(
+                db=db,
+                campaign_id=campaign.id,
+                tenant_id=campaign.tenant_id,
+                webhook_base_url=campaign.webhook_base_url or DEFAULT_WEBHOOK_BASE_URL,
+                stop_event=halt
+            )
+            if not halt.is_set():
+                CampaignJobQueue.finish(db, campaign.id, outcome)
+        except Exception as e:
+            logger.error(f"❌ Campaign execution failed: {e}", exc_info=True)
+            db.rollback()
+            BulkCallCampaignService.update_campaign_status(db, campaign.id, models.BulkCallStatusEnum.failed)
+        finally:
+            done.set()
+            heartbeat.join()
+            if not lease_lost.is_set():
+                CampaignJobQueue.release(db, campaign.id, self.worker_id, requeue=halt.is_set())
+
+    def _heartbeat_loop(
+        self,
+        campaign_id: str,
+        halt: threading.Event,
+        lease_lost: threading.Event,
+        done: threading.Event
+    ) -> None:
+        # Heartbeats use their own session; the dialer's session belongs to the dialer thread
+        db = SessionLocal()
+        try:
+            while not done.wait(CAMPAIGN_HEARTBEAT_SECONDS):
+                if self.stop_event.is_set():
+                    logger.info(f"🛑 Worker {self.worker_id} shutting down, handing campaign {campaign_id} back")
+                    halt.set()
+                    return
+                try:
+                    if not CampaignJobQueue.heartbeat(db, campaign_id, self.worker_id):
+                        logger.warning(f"⚠️ Worker {self.worker_id} lost the lease on campaign {campaign_id}")
+                        lease_lost.set()
+                        halt.set()
+                        return
+                except Exception as e:
+                    db.rollback()
+                    logger.error(f"❌ Heartbeat failed for campaign {campaign_id}: {e}")
+        finally:
+            db.close()
+
+
+def start_embedded_worker() -> threading.Event:
+    """Run a campaign worker in a daemon thread of the current process"""
+    stop_event = threading.Event()
+    worker = CampaignWorker()
+    thread = threading.Thread(target=worker.run_forever, args=(stop_event,), name="campaign-worker", daemon=True)
+    thread.start()
+    return stop_event
+
+
+__all__ = [
+    "CampaignJobQueue",
+    "CampaignWorker",
+    "start_embedded_worker",
+    "generate_worker_id",
+]
@@ -0,0 +1,467 @@
+"""
+Customer Import Service Module
+Bulk customer imports from CSV, NDJSON or XLSX files.
+
+The upload is streamed to a file and a job row is created; the import runs on
+a background thread and reports its progress on the job. Rows are read lazily
+and handled in chunks of CUSTOMER_IMPORT_CHUNK_ROWS: phones are normalized to
+E.164 and emails validated, duplicates within the file are dropped, existing
+customers of the tenant are found with one ``phone_e164 IN (...)`` query per
+chunk, and the new ones are written with batched multi-row inserts
+(ON CONFLICT DO NOTHING, so customers created meanwhile by webhooks are kept).
+Each chunk commits with the job's counters, so an interrupted import can be
+uploaded again: rows already imported count as duplicates.
+"""
+
+import csv
+import json
+import logging
+import os
+import re
+import secrets
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+
+from pydantic import EmailStr, TypeAdapter, ValidationError
+from sqlalchemy import select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models
+from app.db import SessionLocal
+from app.phone_utils import to_e164
+from app.search_utils import customer_search_text
+
+logger = logging.getLogger(__name__)
+
+CUSTOMER_IMPORT_DIR = os.getenv("CUSTOMER_IMPORT_DIR", tempfile.gettempdir())
+CUSTOMER_IMPORT_MAX_BYTES = int(os.getenv("CUSTOMER_IMPORT_MAX_BYTES", str(200 * 1024 * 1024)))
+CUSTOMER_IMPORT_CHUNK_ROWS = int(os.getenv("CUSTOMER_IMPORT_CHUNK_ROWS", "5000"))
+CUSTOMER_IMPORT_WORKERS = max(int(os.getenv("CUSTOMER_IMPORT_WORKERS", "2")), 1)
+CUSTOMER_IMPORT_MAX_ERRORS = 100
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+FILE_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".xlsx": "xlsx"}
+CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet": "xlsx",
+}
+
+# Column names accepted for each customer field (compared lower-cased, spaces as "_")
+FIELD_ALIASES = {
+    "name": "name", "full_name": "name", "customer_name": "name",
+    "phone": "phone", "phone_number": "phone", "mobile": "phone", "customer_phone": "phone",
+    "email": "email", "email_address": "email",
+    "neighborhoods": "neighborhoods",
+    "consent": "consent",
+}
+
+_email_adapter = TypeAdapter(EmailStr)
+# Dot-atom local part (RFC 5322), Unicode allowed as by EmailStr
+_LOCAL_PART = re.compile(r'^(?!\.)(?!.*\.\.)[^\s@"(),:;<>\[\]\\]{1,64}(?<!\.)$')
+
+
+class ImportFileError(ValueError):
+    """The uploaded file cannot be imported"""
+
+
+def generate_id(prefix: str) -> str:
+    return f"{prefix}_{secrets.token_hex(8)}"
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str]) -> Optional[str]:
+    """csv, ndjson or xlsx from the file extension, else from the content type"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    return FILE_FORMATS.get(extension) or CONTENT_TYPES.get((content_type or "").split(";")[0].strip())
+
+
+def save_upload(source: BinaryIO, file_format: str) -> Tuple[str, int]:
+    """
+    Copy an upload to CUSTOMER_IMPORT_DIR in fixed-size chunks.
+    Returns the file's path and its estimated number of data rows.
+    """
+    fd, path = tempfile.mkstemp(prefix="customer-import-", suffix=f".{file_format}", dir=CUSTOMER_IMPORT_DIR)
+    size = 0
+    lines = 0
+    last_byte = b"\n"
+    try:
+        with os.fdopen(fd, "wb") as target:
+            while True:
+                block = source.read(UPLOAD_CHUNK_BYTES)
+                if not block:
+                    break
+                size += len(block)
+                if size > CUSTOMER_IMPORT_MAX_BYTES:
+                    raise ImportFileError(f"File is larger than {CUSTOMER_IMPORT_MAX_BYTES} bytes")
+                lines += block.count(b"\n")
+                last_byte = block[-1:]
+                target.write(block)
+        # A last line without a newline is a row too
+        if last_byte != b"\n":
+            lines += 1
+    except Exception:
+        os.remove(path)
+        raise
+
+    if file_format == "csv":
+        lines -= 1  # header
+    elif file_format == "xlsx":
+        lines = 0  # counted from the sheet when the import starts
+    return path, max(lines, 0)
+
+
+# ============================================================================
+# READERS
+# ============================================================================
+
+def _read_csv(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    # utf-8-sig drops the byte order mark spreadsheet exports start with
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        if not reader.fieldnames:
+            raise ImportFileError("The CSV file has no header row")
+        for record in reader:
+            yield reader.line_num, record
+
+
+def _read_ndjson(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    with open(path, encoding="utf-8-sig") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, {"__error__": f"Invalid JSON: {e.msg}"}
+                continue
+            yield line_number, record if isinstance(record, dict) else {"__error__": "Not a JSON object"}
+
+
+def _read_xlsx(path: str) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError("XLSX import needs the openpyxl library (pip install openpyxl); upload a CSV instead")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if not header:
+            raise ImportFileError("The sheet has no header row")
+        header = [str(cell) if cell is not None else "" for cell in header]
+        for row_number, values in enumerate(rows, start=2):
+            if any(value is not None for value in values):
+                yield row_number, dict(zip(header, values))
+    finally:
+        workbook.close()
+
+
+READERS = {"csv": _read_csv, "ndjson": _read_ndjson, "xlsx": _read_xlsx}
+
+
+def _xlsx_row_count(path: str) -> int:
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        return 0
+    workbook = load_workbook(path, read_only=True)
+    try:
+        return max((workbook.active.max_row or 1) - 1, 0)
+    finally:
+        workbook.close()
+
+
+def _chunks(rows: Iterator[Tuple[int, Dict[str, Any]]], size: int) -> Iterator[List[Tuple[int, Dict[str, Any]]]]:
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# ============================================================================
+# ROWS
+# ============================================================================
+
+def _canonical(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Customer fields of a record, whatever the column names' case and spacing"""
+    fields = {}
+    for key, value in record.items():
+        if key is None:
+            continue
+        field = FIELD_ALIASES.get(str(key).strip().lower().replace(" ", "_").replace("-", "_"))
+        if field and field not in fields:
+            fields[field] = value.strip() if isinstance(value, str) else value
+    return fields
+
+
+def _neighborhoods(value: Any) -> Optional[List[str]]:
+    if value in (None, ""):
+        return None
+    if isinstance(value, list):
+        return [str(item) for item in value]
+    return [part.strip() for part in str(value).replace(";", ",").split(",") if part.strip()]
+
+
+def _consent(value: Any) -> bool:
+    if value in (None, ""):
+        return True
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() not in ("0", "false", "no", "n")
+
+
+def _validate_emails(emails: Set[str]) -> Dict[str, Optional[str]]:
+    """
+    Normalized form of each distinct email of a chunk, or None if invalid.
+    Lead lists share a handful of domains, so each distinct domain is validated
+    once with EmailStr (IDNA, normalization) and local parts with a dot-atom pattern.
+    """
+    domains: Dict[str, Optional[str]] = {}
+    validated = {}
+    for email in emails:
+        local, _, domain = email.rpartition("@")
+        if not local or not _LOCAL_PART.match(local) or len(email) > 254:
+            validated[email] = None
+            continue
+        if domain not in domains:
+            try:
+                domains[domain] = str(_email_adapter.validate_python(f"x@{domain}")).partition("@")[2]
+            except ValidationError:
+                domains[domain] = None
+        validated[email] = f"{local}@{domains[domain]}" if domains[domain] else None
+    return validated
+
+
+class ChunkResult:
+    def __init__(self):
+        self.processed = 0
+        self.created = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.errors: List[Dict[str, Any]] = []
+
+    def reject(self, row_number: int, error: str) -> None:
+        self.invalid += 1
+        self.errors.append({"row": row_number, "error": error})
+
+
+def import_chunk(
+    db: Session,
+    tenant_id: str,
+    chunk: List[Tuple[int, Dict[str, Any]]],
+    seen_phones: Set[str]
+) -> ChunkResult:
+    """
+    Validate, dedupe and insert one chunk of rows in the caller's transaction.
+    ``seen_phones`` holds the E.164 phones of earlier chunks of the same file.
+    """
+    result = ChunkResult()
+    result.processed = len(chunk)
+
+    records = []
+    for row_number, record in chunk:
+        if "__error__" in record:
+            result.reject(row_number, record["__error__"])
+            continue
+        records.append((row_number, _canonical(record)))
+
+    emails = _validate_emails({str(fields["email"]) for _, fields in records if fields.get("email")})
+
+    now = datetime.utcnow()
+    rows = []
+    for row_number, fields in records:
+        phone_e164 = to_e164(str(fields["phone"])) if fields.get("phone") not in (None, "") else None
+        if not phone_e164:
+            result.reject(row_number, f"Invalid phone number: {fields.get('phone')!r}")
+            continue
+        email = None
+        if fields.get("email"):
+            email = emails[str(fields["email"])]
+            if email is None:
+                result.reject(row_number, f"Invalid email: {fields['email']!r}")
+                continue
+        if phone_e164 in seen_phones:
+            result.duplicates += 1
+            continue
+        seen_phones.add(phone_e164)
+        name = str(fields.get("name") or "").strip() or "Unknown"
+        rows.append({
+            "id": generate_id("cust"),
+            "tenant_id": tenant_id,
+            "name": name,
+            "phone": phone_e164,
+            "phone_e164": phone_e164,
+            "email": email,
+            "search_text": customer_search_text(name, email),
+            "neighborhoods": _neighborhoods(fields.get("neighborhoods")),
+            "consent": _consent(fields.get("consent")),
+            "created_at": now,
+        })
+
+    if rows:
+        # One set-based lookup of the chunk's phones among the tenant's customers
+        existing = set(db.scalars(select(models.Customer.phone_e164).where(
+            models.Customer.tenant_id == tenant_id,
+            models.Customer.phone_e164.in_([row["phone_e164"] for row in rows])
+        )))
+        new_rows = [row for row in rows if row["phone_e164"] not in existing]
+        inserted = []
+        if new_rows:
+            dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+            stmt = dialect_insert(models.Customer).on_conflict_do_nothing(
+                index_elements=[models.Customer.tenant_id, models.Customer.phone_e164]
+            ).returning(models.Customer.id)
+            # Core execution on the session's connection sends multi-row INSERT ... VALUES
+            # batches (the ORM bulk path would run one statement per row for RETURNING)
+            inserted = db.connection().execute(stmt, new_rows).all()
+        result.created = len(inserted)
+        result.duplicates += len(rows) - len(inserted)
+
+    return result
+
+
+# ============================================================================
+# JOBS
+# ============================================================================
+
+class ImportInterrupted(Exception):
+    """The process is shutting down"""
+
+
+_stopping = threading.Event()
+# Job id -> saved upload of the imports waiting for a thread
+_queued_jobs: Dict[str, str] = {}
+_queued_jobs_lock = threading.Lock()
+
+
+def run_import(job_id: str, path: str) -> None:
+    """Import a saved upload, committing the job's progress after every chunk"""
+    with _queued_jobs_lock:
+        _queued_jobs.pop(job_id, None)
+
+    db = SessionLocal()
+    try:
+        job = db.get(models.CustomerImportJob, job_id)
+        if job is None:
+            return
+        job.status = models.CustomerImportStatusEnum.running
+        job.started_at = datetime.utcnow()
+        if job.file_format == "xlsx":
+            job.total_rows = _xlsx_row_count(path)
+        db.commit()
+        logger.info(f"📥 Customer import {job_id} started ({job.file_format}, ~{job.total_rows} rows)")
+
+        seen_phones: Set[str] = set()
+        totals = {"processed_rows": 0, "created_rows": 0, "duplicate_rows": 0, "invalid_rows": 0}
+        errors: List[Dict[str, Any]] = []
+        for chunk in _chunks(READERS[job.file_format](path), CUSTOMER_IMPORT_CHUNK_ROWS):
+            if _stopping.is_set():
+                raise ImportInterrupted()
+            result = import_chunk(db, job.tenant_id, chunk, seen_phones)
+            totals["processed_rows"] += result.processed
+            totals["created_rows"] += result.created
+            totals["duplicate_rows"] += result.duplicates
+            totals["invalid_rows"] += result.invalid
+            errors.extend(result.errors[:CUSTOMER_IMPORT_MAX_ERRORS - len(errors)])
+            db.execute(update(models.CustomerImportJob).where(
+                models.CustomerImportJob.id == job_id
+            ).values(**totals, errors=errors or None))
+            db.commit()
+
+        db.execute(update(models.CustomerImportJob).where(models.CustomerImportJob.id == job_id).values(
+            status=models.CustomerImportStatusEnum.completed,
+            total_rows=totals["processed_rows"],
+            completed_at=datetime.utcnow()
+        ))
+        db.commit()
+        logger.info(
+            f"✅ Customer import {job_id} completed: {totals['created_rows']} created, "
+            f"{totals['duplicate_rows']} duplicates, {totals['invalid_rows']} invalid"
+        )
+    except Exception as e:
+        db.rollback()
+        if isinstance(e, ImportInterrupted):
+            message = "Interrupted by a server shutdown; upload the file again to import the remaining rows"
+        elif isinstance(e, (ImportFileError, UnicodeDecodeError, csv.Error)):
+            message = str(e)
+        else:
+            logger.error(f"❌ Customer import {job_id} failed: {e}", exc_info=True)
+            message = "Import failed"
+        _mark_failed(db, [job_id], message)
+    finally:
+        db.close()
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _mark_failed(db: Session, job_ids: List[str], message: str) -> None:
+    db.execute(update(models.CustomerImportJob).where(
+        models.CustomerImportJob.id.in_(job_ids)
+    ).values(status=models.CustomerImportStatusEnum.failed, error_message=message, completed_at=datetime.utcnow()))
+    db.commit()
+
+
+_import_pool_instance = None
+
+def get_import_pool() -> ThreadPoolExecutor:
+    """Get or create the thread pool that runs customer imports"""
+    global _import_pool_instance
+    if _import_pool_instance is None:
+        _import_pool_instance = ThreadPoolExecutor(
+            max_workers=CUSTOMER_IMPORT_WORKERS, thread_name_prefix="customer-import"
+        )
+    return _import_pool_instance
+
+def submit_import(job_id: str, path: str) -> None:
+    """Queue a saved upload for import"""
+    with _queued_jobs_lock:
+        _queued_jobs[job_id] = path
+    get_import_pool().submit(run_import, job_id, path)
+
+def shutdown_import_pool() -> None:
+    """Stop running imports after their current chunk and fail the queued ones"""
+    global _import_pool_instance
+    if _import_pool_instance is None:
+        return
+    _stopping.set()
+    _import_pool_instance.shutdown(wait=True, cancel_futures=True)
+    _import_pool_instance = None
+    with _queued_jobs_lock:
+        queued = dict(_queued_jobs)
+        _queued_jobs.clear()
+    if queued:
+        db = SessionLocal()
+        try:
+            _mark_failed(db, list(queued), "Interrupted by a server shutdown before it started; upload the file again")
+        finally:
+            db.close()
+        for path in queued.values():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+__all__ = [
+    "ImportFileError",
+    "detect_format",
+    "save_upload",
+    "import_chunk",
+    "run_import",
+    "submit_import",
+    "get_import_pool",
+    "shutdown_import_pool",
+]
@@ -0,0 +1,117 @@
+"""
+Customer Search Service Module
+Typeahead search over a tenant's customers by name, email or phone.
+
+Phone-like queries (digits, optionally with "+", "00" or a trunk "0") are turned
+into E.164 prefixes and answered by range scans of the (tenant_id, phone_e164)
+unique index. Other queries are normalized like the customers' search_text
+(app.search_utils: case, Arabic diacritics, alef/hamza variants, taa marbuta)
+and every word is matched as a word prefix in the full-text index: a GIN
+tsvector index on Postgres, the customers_fts FTS5 table on SQLite. Results
+are not ranked, so the index lookup can stop at the first ``limit`` matches.
+"""
+
+import logging
+import re
+from typing import List
+
+from sqlalchemy import func, literal_column, or_, select, text
+from sqlalchemy.orm import Session
+
+from app import models
+from app.phone_utils import DEFAULT_PHONE_COUNTRY_CODE
+from app.search_utils import normalize_search_text
+
+logger = logging.getLogger(__name__)
+
+# Shorter phone queries match too many numbers to be useful as you type
+MIN_PHONE_DIGITS = 3
+# Words beyond this are ignored; a longer query has narrowed things down already
+MAX_QUERY_WORDS = 8
+
+_PHONE_QUERY = re.compile(r"^\+?[\d\s\-\(\)\.]+$")
+_PHONE_FORMATTING = re.compile(r"[\s\-\(\)\.]")
+
+_SQLITE_FTS_SEARCH = text(
+    "SELECT customers.* FROM customers_fts CROSS JOIN customers ON customers.rowid = customers_fts.rowid "
+    "WHERE customers_fts MATCH :match AND customers.tenant_id = :tenant_id LIMIT :limit"
+)
+
+
+def phone_prefixes(query: str) -> List[str]:
+    """
+    E.164 prefixes a phone-like query can be the start of, following the rules of
+    app.phone_utils.to_e164; empty when the query is not a phone number.
+    """
+    query = query.strip()
+    if not _PHONE_QUERY.match(query):
+        return []
+    # \d also matched Arabic-Indic digits; normalize_search_text makes them ASCII
+    compact = _PHONE_FORMATTING.sub("", query)
+    digits = normalize_search_text(compact).replace(" ", "")
+    if not digits.isdigit() or len(digits) < MIN_PHONE_DIGITS:
+        return []
+
+    if compact.startswith("+"):
+        return ["+" + digits]
+    if digits.startswith("00"):
+        return ["+" + digits[2:]] if digits[2:] else []
+    if digits.startswith("0"):
+        # A trunk 0: Egyptian 01X and Saudi 05X mobiles, else the default country
+        national = digits[1:]
+        prefixes = {"+" + DEFAULT_PHONE_COUNTRY_CODE + national}
+        if digits.startswith("01"):
+            prefixes.add("+20" + national)
+        if digits.startswith("05"):
+            prefixes.add("+966" + national)
+        return sorted(prefixes)
+    # Digits with their country code, or a Saudi mobile without the trunk 0
+    prefixes = {"+" + digits}
+    if digits.startswith("5"):
+        prefixes.add("+966" + digits)
+    return sorted(prefixes)
+
+
+def _prefix_range(prefix: str):
+    """phone_e164 LIKE 'prefix%' as a range, so it is a btree range scan under any collation"""
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+    return (models.Customer.phone_e164 >= prefix) & (models.Customer.phone_e164 < upper)
+
+
+def search_customers(db: Session, tenant_id: str, query: str, limit: int = 20) -> List[models.Customer]:
+    """
+    Customers of a tenant whose phone starts with the query's digits, or whose
+    name/email words start with each of the query's words (in any order).
+    """
+    prefixes = phone_prefixes(query)
+    if prefixes:
+        return db.scalars(select(models.Customer).where(
+            models.Customer.tenant_id == tenant_id,
+            or_(*[_prefix_range(prefix) for prefix in prefixes])
+        ).limit(limit)).all()
+
+    words = normalize_search_text(query).split()[:MAX_QUERY_WORDS]
+    if not words:
+        return []
+
+    if db.get_bind().dialect.name == "postgresql":
+        # Same expression as ix_customers_search_text_fts (a bound 'simple' would not match it)
+        return db.scalars(select(models.Customer).where(
+            models.Customer.tenant_id == tenant_id,
+            func.to_tsvector(literal_column("'simple'"), models.Customer.search_text).op("@@")(
+                func.to_tsquery(literal_column("'simple'"), " & ".join(f"{word}:*" for word in words))
+            )
+        ).limit(limit)).all()
+
+    # SQLite: CROSS JOIN keeps the FTS5 table as the outer loop, so LIMIT stops the
+    # scan early (with a plain JOIN the planner walks the tenant's index and runs
+    # MATCH for every customer). Normalized words hold only letters and digits.
+    return db.scalars(select(models.Customer).from_statement(_SQLITE_FTS_SEARCH.bindparams(
+        match=" ".join(f'"{word}"*' for word in words), tenant_id=tenant_id, limit=limit
+    ))).all()
+
+
+__all__ = [
+    "phone_prefixes",
+    "search_customers",
+]
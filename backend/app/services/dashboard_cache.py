@@ -0,0 +1,145 @@
+"""
+Dashboard Cache Module
+Per-tenant cache of the dashboard KPI response.
+
+Every operator of a tenant polls the same payload. Responses are kept for a
+short TTL, and concurrent requests for a tenant whose entry is missing share
+one computation. Writes that change dashboard numbers bump the tenant's
+version, which invalidates the cached response (in this process; other
+processes catch up within the TTL).
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_CACHE_TTL_SECONDS = float(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "5"))
+DASHBOARD_CACHE_MAX_TENANTS = int(os.getenv("DASHBOARD_CACHE_MAX_TENANTS", "1024"))
+
+
+class _Flight:
+    """One in-progress computation that concurrent callers wait on"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class DashboardCache:
+    """Versioned, TTL-bounded response cache with single-flight computation"""
+
+    def __init__(self, ttl: float, max_tenants: int):
+        self.ttl = ttl
+        self.max_tenants = max_tenants
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._inflight: Dict[tuple, _Flight] = {}
+        self._lock = threading.Lock()
+        self._metrics = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+
+    def get_or_compute(self, tenant_id: str, compute: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the tenant's cached response, or compute it once for all concurrent callers"""
+        if self.ttl <= 0:
+            return compute()
+
+        with self._lock:
+            version = self._versions.get(tenant_id, 0)
+            entry = self._entries.get(tenant_id)
+            if entry is not None:
+                entry_version, expires_at, payload = entry
+                if entry_version == version and expires_at > time.monotonic():
+                    self._entries.move_to_end(tenant_id)
+                    self._metrics["hits"] += 1
+                    return payload
+                del self._entries[tenant_id]
+
+            key = (tenant_id, version)
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+                self._metrics["misses"] += 1
+            else:
+                self._metrics["coalesced"] += 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = compute()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._metrics["errors"] += 1
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+                # A write during the computation bumped the version; do not keep a stale payload
+                if flight.error is None and self._versions.get(tenant_id, 0) == version:
+                    self._entries[tenant_id] = (version, time.monotonic() + self.ttl, flight.result)
+                    self._entries.move_to_end(tenant_id)
+                    while len(self._entries) > self.max_tenants:
+                        self._entries.popitem(last=False)
+                        self._metrics["evictions"] += 1
+            flight.done.set()
+        return flight.result
+
+    def invalidate(self, tenant_id: Optional[str] = None) -> None:
+        """Bump the version of one tenant, or of every tenant when none is given"""
+        with self._lock:
+            self._metrics["invalidations"] += 1
+            tenant_ids = [tenant_id] if tenant_id else set(self._entries) | {tenant for tenant, _ in self._inflight}
+            for tenant in tenant_ids:
+                self._versions[tenant] = self._versions.get(tenant, 0) + 1
+                self._entries.pop(tenant, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._metrics["hits"] + self._metrics["misses"] + self._metrics["coalesced"]
+            return {
+                **self._metrics,
+                "size": len(self._entries),
+                "max_tenants": self.max_tenants,
+                "ttl_seconds": self.ttl,
+                "hit_ratio": round((lookups - self._metrics["misses"]) / lookups, 4) if lookups else 0.0,
+            }
+
+
+_dashboard_cache_instance = None
+
+def get_dashboard_cache() -> DashboardCache:
+    """Get or create the singleton DashboardCache instance"""
+    global _dashboard_cache_instance
+    if _dashboard_cache_instance is None:
+        _dashboard_cache_instance = DashboardCache(DASHBOARD_CACHE_TTL_SECONDS, DASHBOARD_CACHE_MAX_TENANTS)
+    return _dashboard_cache_instance
+
+def invalidate_dashboard(tenant_id: Optional[str] = None) -> None:
+    """Drop the cached dashboard of a tenant (all tenants when None) after a write"""
+    get_dashboard_cache().invalidate(tenant_id)
+
+
+__all__ = [
+    "DashboardCache",
+    "get_dashboard_cache",
+    "invalidate_dashboard",
+]
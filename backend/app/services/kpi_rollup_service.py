@@ -0,0 +1,298 @@
+"""
+KPI Rollup Service Module
+Per-tenant, per-day KPI rollups (tenant_daily_kpis).
+
+Every voice session, booking and conversation is counted in the day (UTC) of
+its created_at. Write paths mark the (tenant, day) buckets they touched; a
+refresher thread recomputes those buckets from their own day of raw rows a
+couple of seconds later, so many writes to the same day cost one refresh. A
+periodic reconciler recomputes the most recent days for every tenant (and
+backfills everything on an empty table) to catch writes that were never
+marked. Readers sum one row per day instead of scanning raw tables.
+"""
+
+import logging
+import os
+import threading
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import and_, case, delete, func, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import IntegrityError
+
+from app import models
+from app.db import engine
+from app.services.dashboard_cache import invalidate_dashboard
+
+logger = logging.getLogger(__name__)
+
+# Marked days are recomputed every N milliseconds
+KPI_ROLLUP_FLUSH_MS = max(int(os.getenv("KPI_ROLLUP_FLUSH_MS", "2000")), 100)
+# The reconciler recomputes the last N days of every tenant every interval
+KPI_RECONCILE_INTERVAL_SECONDS = int(os.getenv("KPI_RECONCILE_INTERVAL_SECONDS", "600"))
+KPI_RECONCILE_DAYS = int(os.getenv("KPI_RECONCILE_DAYS", "2"))
+
+# CSAT proxy: 'positive' -> 5, 'neutral' -> 3, 'negative' -> 1
+SENTIMENT_SCORES = (('positive', 5), ('neutral', 3), ('negative', 1))
+
+ROLLUP_COUNTERS = (
+    "calls",
+    "completed_calls",
+    "failed_calls",
+    "intents",
+    "handled_calls",
+    "handle_seconds",
+    "bookings",
+    "revenue",
+    "sentiment_count",
+    "sentiment_sum",
+)
+
+RollupKey = Tuple[str, date]
+
+
+def _as_day(value: Any) -> date:
+    """SQLite returns date() as text, PostgreSQL as a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+class KpiRollupService:
+    """Compute and store tenant_daily_kpis"""
+
+    @staticmethod
+    def aggregate(
+        conn: Connection,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        tenant_id: Optional[str] = None
+    ) -> Dict[RollupKey, Dict[str, Any]]:
+        """Recompute the counters of every (tenant, day) in [start, end) from raw rows"""
+
+        def scoped(model, *columns):
+            day = func.date(model.created_at)
+            stmt = select(model.tenant_id, day.label("day"), *columns).group_by(model.tenant_id, day)
+            if tenant_id is not None:
+                stmt = stmt.where(model.tenant_id == tenant_id)
+            if start is not None:
+                stmt = stmt.where(model.created_at >= _day_start(start))
+            if end is not None:
+                stmt = stmt.where(model.created_at < _day_start(end))
+            return stmt
+
+        vs = models.VoiceSession
+        handled = and_(vs.status == models.VoiceSessionStatus.COMPLETED, vs.ended_at.isnot(None))
+        sessions = scoped(
+            vs,
+            func.count().label("calls"),
+            func.count().filter(vs.status == models.VoiceSessionStatus.COMPLETED).label("completed_calls"),
+            func.count().filter(vs.status == models.VoiceSessionStatus.FAILED).label("failed_calls"),
+            func.count().filter(vs.extracted_intent.isnot(None)).label("intents"),
+            func.count().filter(handled).label("handled_calls"),
+            func.sum(
+                func.extract('epoch', vs.ended_at) - func.extract('epoch', vs.created_at)
+            ).filter(handled).label("handle_seconds"),
+        )
+
+        bk = models.Booking
+        bookings = scoped(
+            bk,
+            func.count().label("bookings"),
+            func.sum(bk.price_sar).label("revenue"),
+        )
+
+        conv = models.Conversation
+        conversations = scoped(
+            conv,
+            func.count().filter(conv.sentiment.isnot(None)).label("sentiment_count"),
+            func.sum(
+                case(*((conv.sentiment == label, score) for label, score in SENTIMENT_SCORES), else_=0)
+            ).filter(conv.sentiment.isnot(None)).label("sentiment_sum"),
+        )
+
+        rollups: Dict[RollupKey, Dict[str, Any]] = {}
+        for stmt in (sessions, bookings, conversations):
+            for row in conn.execute(stmt).mappings():
+                key = (row["tenant_id"], _as_day(row["day"]))
+                counters = rollups.setdefault(key, dict.fromkeys(ROLLUP_COUNTERS, 0))
+                for name, value in row.items():
+                    if name in counters:
+                        counters[name] = value or 0
+        return rollups
+
+    @staticmethod
+    def refresh(
+        conn: Connection,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        tenant_id: Optional[str] = None
+    ) -> int:
+        """
+        Replace the stored rollups of [start, end) with freshly computed ones.
+        Days without any rows left are removed. Returns the number of rows written.
+        """
+        rollups = KpiRollupService.aggregate(conn, start, end, tenant_id)
+
+        kpi = models.TenantDailyKpi
+        stmt = delete(kpi)
+        if tenant_id is not None:
+            stmt = stmt.where(kpi.tenant_id == tenant_id)
+        if start is not None:
+            stmt = stmt.where(kpi.day >= start)
+        if end is not None:
+            stmt = stmt.where(kpi.day < end)
+        conn.execute(stmt)
+
+        if rollups:
+            now = datetime.utcnow()
+            conn.execute(insert(kpi), [
+                {"tenant_id": tenant, "day": day, "updated_at": now, **counters}
+                for (tenant, day), counters in rollups.items()
+            ])
+        return len(rollups)
+
+    @staticmethod
+    def refresh_days(keys: Iterable[RollupKey]) -> None:
+        """Recompute the given (tenant, day) buckets in one transaction"""
+        keys = sorted(set(keys))
+        for attempt in range(2):
+            try:
+                with engine.begin() as conn:
+                    for tenant_id, day in keys:
+                        KpiRollupService.refresh(conn, day, day + timedelta(days=1), tenant_id)
+                break
+            except IntegrityError:
+                # Another process refreshed the same day concurrently; recompute once more
+                if attempt:
+                    raise
+
+        for tenant_id in {tenant_id for tenant_id, _ in keys}:
+            invalidate_dashboard(tenant_id)
+
+    @staticmethod
+    def reconcile(days: int = KPI_RECONCILE_DAYS) -> int:
+        """
+        Recompute the last ``days`` days of every tenant, or everything when the
+        rollup table is still empty. Returns the number of rows written.
+        """
+        with engine.begin() as conn:
+            has_rollups = conn.execute(select(models.TenantDailyKpi.day).limit(1)).first() is not None
+            if has_rollups:
+                start = datetime.utcnow().date() - timedelta(days=max(days, 1) - 1)
+                written = KpiRollupService.refresh(conn, start)
+            else:
+                written = KpiRollupService.refresh(conn)
+                logger.info(f"📊 Backfilled {written} daily KPI rollups")
+
+        invalidate_dashboard()
+        return written
+
+
+class KpiRollupRefresher:
+    """Collects marked (tenant, day) buckets and refreshes them periodically"""
+
+    def __init__(self, flush_interval_ms: int):
+        self.flush_interval = flush_interval_ms / 1000.0
+        self._dirty: Set[RollupKey] = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def mark(self, tenant_id: Optional[str], moment: Any = None) -> None:
+        if not tenant_id:
+            return
+        day = _as_day(moment) if moment is not None else datetime.utcnow().date()
+        with self._lock:
+            self._dirty.add((tenant_id, day))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="kpi-rollup-refresh", daemon=True)
+                self._thread.start()
+
+    def flush(self) -> int:
+        """Refresh all marked buckets. Returns the number of buckets refreshed."""
+        with self._lock:
+            pending, self._dirty = self._dirty, set()
+        if not pending:
+            return 0
+
+        try:
+            KpiRollupService.refresh_days(pending)
+        except Exception:
+            with self._lock:
+                self._dirty |= pending
+            raise
+        return len(pending)
+
+    def stop(self) -> None:
+        """Stop the refresher thread and refresh whatever is still marked"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ KPI rollup refresh failed: {e}", exc_info=True)
+
+
+_kpi_rollup_refresher_instance = None
+
+def get_kpi_rollup_refresher() -> KpiRollupRefresher:
+    """Get or create the singleton KpiRollupRefresher instance"""
+    global _kpi_rollup_refresher_instance
+    if _kpi_rollup_refresher_instance is None:
+        _kpi_rollup_refresher_instance = KpiRollupRefresher(KPI_ROLLUP_FLUSH_MS)
+    return _kpi_rollup_refresher_instance
+
+def mark_kpis_dirty(tenant_id: Optional[str], *moments: Any) -> None:
+    """
+    Schedule a rollup refresh for the days of ``moments`` (datetimes or dates;
+    today when none is given). Call it from any write path that creates,
+    changes or deletes voice sessions, bookings or conversations.
+    """
+    refresher = get_kpi_rollup_refresher()
+    for moment in moments or (None,):
+        refresher.mark(tenant_id, moment)
+
+def shutdown_kpi_rollup_refresher() -> None:
+    """Refresh marked days before the process exits"""
+    if _kpi_rollup_refresher_instance is not None:
+        _kpi_rollup_refresher_instance.stop()
+
+
+def _run_reconciler(stop_event: threading.Event) -> None:
+    while True:
+        try:
+            KpiRollupService.reconcile()
+        except Exception as e:
+            logger.error(f"❌ KPI rollup reconcile failed: {e}", exc_info=True)
+        if stop_event.wait(KPI_RECONCILE_INTERVAL_SECONDS):
+            return
+
+def start_kpi_reconciler() -> threading.Event:
+    """Run the KPI reconciler in a daemon thread of the current process"""
+    stop_event = threading.Event()
+    thread = threading.Thread(target=_run_reconciler, args=(stop_event,), name="kpi-reconciler", daemon=True)
+    thread.start()
+    return stop_event
+
+
+__all__ = [
+    "KpiRollupService",
+    "KpiRollupRefresher",
+    "get_kpi_rollup_refresher",
+    "mark_kpis_dirty",
+    "shutdown_kpi_rollup_refresher",
+    "start_kpi_reconciler",
+]
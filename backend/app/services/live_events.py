@@ -0,0 +1,199 @@
+"""
+Live Events Module
+In-process pub/sub for the server-sent event streams.
+
+The webhook paths, the status buffer and the dialer publish small events
+(voice session state, bulk call result status, campaign counters) from any
+thread. Each SSE connection subscribes for one tenant, optionally narrowed
+to one campaign, and receives the events on its own bounded asyncio queue.
+A subscriber that falls too far behind is sent a ``resync`` event and
+disconnected, so it reconnects and starts again from a fresh snapshot.
+Publishing with nobody subscribed costs one dict lookup.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Max events waiting per connection before it is told to resync
+LIVE_EVENTS_QUEUE_SIZE = int(os.getenv("LIVE_EVENTS_QUEUE_SIZE", "256"))
+# Comment line sent on idle streams so proxies keep the connection open
+LIVE_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("LIVE_EVENTS_KEEPALIVE_SECONDS", "15"))
+
+RESYNC_EVENT = "resync"
+
+
+class LiveSubscription:
+    """One SSE connection's queue of pending events"""
+
+    def __init__(self, tenant_id: str, campaign_id: Optional[str], loop: asyncio.AbstractEventLoop, max_size: int):
+        self.tenant_id = tenant_id
+        self.campaign_id = campaign_id
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_size)
+        self.lagged = False
+
+    def matches(self, campaign_id: Optional[str]) -> bool:
+        return self.campaign_id is None or self.campaign_id == campaign_id
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        """Runs on the subscriber's loop"""
+        if self.lagged:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.lagged = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": RESYNC_EVENT, "data": {}})
+
+
+class LiveEventBroker:
+    """Routes published events to the subscriptions of their tenant"""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscriptions: Dict[str, Set[LiveSubscription]] = {}
+        self._lock = threading.Lock()
+        self._metrics = {"published": 0, "delivered": 0, "resyncs": 0}
+
+    def has_subscribers(self, tenant_id: Optional[str] = None) -> bool:
+        if tenant_id is None:
+            return bool(self._subscriptions)
+        return tenant_id in self._subscriptions
+
+    def subscribe(self, tenant_id: str, campaign_id: Optional[str] = None) -> LiveSubscription:
+        subscription = LiveSubscription(tenant_id, campaign_id, asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscriptions.setdefault(tenant_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LiveSubscription) -> None:
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.tenant_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.tenant_id]
+        if subscription.lagged:
+            self._metrics["resyncs"] += 1
+
+    def publish(self, tenant_id: Optional[str], event_type: str, data: Dict[str, Any], campaign_id: Optional[str] = None) -> int:
+        """
+        Deliver an event to every matching subscription. Safe to call from any
+        thread. Returns the number of subscriptions it was queued for.
+        """
+        if not tenant_id or tenant_id not in self._subscriptions:
+            return 0
+
+        with self._lock:
+            targets = [s for s in self._subscriptions.get(tenant_id, ()) if s.matches(campaign_id)]
+
+        event = {"type": event_type, "data": data}
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, event)
+            except RuntimeError:
+                # The subscriber's loop is already closed
+                self.unsubscribe(subscription)
+        self._metrics["published"] += 1
+        self._metrics["delivered"] += len(targets)
+        return len(targets)
+
+    async def stream(self, subscription: LiveSubscription, snapshot: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+        """Encode a subscription as a text/event-stream body"""
+        try:
+            if snapshot is not None:
+                yield encode_sse(snapshot)
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), LIVE_EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield encode_sse(event)
+                if event["type"] == RESYNC_EVENT:
+                    return
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            connections = sum(len(subscriptions) for subscriptions in self._subscriptions.values())
+            tenants = len(self._subscriptions)
+        return {**self._metrics, "connections": connections, "tenants": tenants}
+
+
+def encode_sse(event: Dict[str, Any]) -> str:
+    """One server-sent event; ``data`` is JSON on a single line"""
+    payload = json.dumps(event["data"], ensure_ascii=False, default=str)
+    return f"event: {event['type']}\ndata: {payload}\n\n"
+
+
+_live_event_broker_instance = None
+
+def get_live_event_broker() -> LiveEventBroker:
+    """Get or create the singleton LiveEventBroker instance"""
+    global _live_event_broker_instance
+    if _live_event_broker_instance is None:
+        _live_event_broker_instance = LiveEventBroker(LIVE_EVENTS_QUEUE_SIZE)
+    return _live_event_broker_instance
+
+def publish_live_event(tenant_id: Optional[str], event_type: str, data: Dict[str, Any], campaign_id: Optional[str] = None) -> None:
+    """Publish an event to the tenant's (and campaign's) live streams; never raises"""
+    try:
+        data.setdefault("ts", time.time())
+        get_live_event_broker().publish(tenant_id, event_type, data, campaign_id)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to publish live event {event_type}: {e}")
+
+
+def _value(value: Any) -> Any:
+    return value.value if hasattr(value, "value") else value
+
+def publish_session_event(session: Any) -> None:
+    """A voice session was created or changed state"""
+    # Reading expired ORM attributes after a commit costs a query; skip it when nobody listens
+    if not get_live_event_broker().has_subscribers():
+        return
+    publish_live_event(session.tenant_id, "session", {
+        "session_id": session.id,
+        "status": _value(session.status),
+        "direction": session.direction,
+        "customer_phone": session.customer_phone,
+        "created_at": session.created_at,
+        "ended_at": session.ended_at,
+    })
+
+def publish_result_event(result: Any) -> None:
+    """A bulk call result changed status"""
+    if not get_live_event_broker().has_subscribers():
+        return
+    publish_live_event(result.tenant_id, "result", {
+        "id": result.id,
+        "campaign_id": result.campaign_id,
+        "customer_id": result.customer_id,
+        "status": _value(result.status),
+        "outcome": _value(result.outcome),
+        "duration_seconds": result.duration_seconds,
+        "twilio_status": result.twilio_status,
+        "voice_session_id": result.voice_session_id,
+    }, campaign_id=result.campaign_id)
+
+
+__all__ = [
+    "LiveEventBroker",
+    "LiveSubscription",
+    "get_live_event_broker",
+    "publish_live_event",
+    "publish_session_event",
+    "publish_result_event",
+    "encode_sse",
+]
@@ -0,0 +1,365 @@
+"""
+Post-Call Inbox Module
+Durable inbox and worker pool for ElevenLabs post-call webhooks.
+
+The webhook only stores the raw payload in post_call_inbox, keyed by
+conversation_id, and answers right away; a redelivered webhook finds the row
+already there and is acknowledged without new work. Workers claim due rows
+with a lease (a conditional UPDATE, so a row is processed by one worker at a
+time), run the usual webhook processing, and mark the row done. A failed
+attempt is retried with jittered exponential backoff; after
+POST_CALL_MAX_ATTEMPTS attempts the row is dead-lettered for inspection and
+manual retry. A row whose worker died is claimed again once its lease expires;
+processing itself skips conversations whose call was already recorded.
+
+Workers are asyncio tasks on the event loop that owns the ElevenLabs client
+and the async engine: the API loop by default, or the loop of ``python -m
+app.worker`` with POST_CALL_IN_WORKER=true (and RUN_POST_CALL_WORKERS=false
+on the API). Exactly one of the two should run them.
+"""
+
+import asyncio
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.db import AsyncSessionLocal, dispose_async_engine
+from app.services.campaign_queue import generate_worker_id
+from app.services.voice.elevenlabs_client import get_elevenlabs_client, close_elevenlabs_client
+from app.services.voice.webhook_service import process_webhook_payload
+
+logger = logging.getLogger(__name__)
+
+POST_CALL_WORKERS = int(os.getenv("POST_CALL_WORKERS", "4"))
+POST_CALL_LEASE_SECONDS = int(os.getenv("POST_CALL_LEASE_SECONDS", "120"))
+# Processing must give up well before the lease (taken at claim time) runs out, or
+# another worker can reclaim the row while this one is still writing
+POST_CALL_PROCESS_TIMEOUT_SECONDS = min(
+    float(os.getenv("POST_CALL_PROCESS_TIMEOUT_SECONDS", str(POST_CALL_LEASE_SECONDS * 0.75))),
+    POST_CALL_LEASE_SECONDS * 0.9,
+)
+POST_CALL_POLL_SECONDS = float(os.getenv("POST_CALL_POLL_SECONDS", "1"))
+POST_CALL_MAX_ATTEMPTS = int(os.getenv("POST_CALL_MAX_ATTEMPTS", "6"))
+POST_CALL_BACKOFF_BASE_SECONDS = float(os.getenv("POST_CALL_BACKOFF_BASE_SECONDS", "5"))
+POST_CALL_BACKOFF_MAX_SECONDS = float(os.getenv("POST_CALL_BACKOFF_MAX_SECONDS", "600"))
+# Done rows are deleted after this many hours; dead rows are kept
+POST_CALL_INBOX_RETENTION_HOURS = int(os.getenv("POST_CALL_INBOX_RETENTION_HOURS", "72"))
+POST_CALL_PURGE_INTERVAL_SECONDS = 600
+
+Inbox = models.PostCallInbox
+InboxStatus = models.PostCallInboxStatusEnum
+
+
+def _claimable(now: datetime):
+    """Pending rows that are due, or rows whose worker lost its lease"""
+    return or_(
+        and_(Inbox.status == InboxStatus.pending, Inbox.next_attempt_at <= now),
+        and_(Inbox.status == InboxStatus.processing, Inbox.lease_expires_at < now),
+    )
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Delay before the next attempt: exponential in the attempts made, with jitter"""
+    delay = min(POST_CALL_BACKOFF_MAX_SECONDS, POST_CALL_BACKOFF_BASE_SECONDS * (2 ** max(attempts - 1, 0)))
+    return random.uniform(delay / 2, delay)
+
+
+class PostCallInboxQueue:
+    """Storage and lease-based claiming of post-call webhooks"""
+
+    @staticmethod
+    async def enqueue(db: AsyncSession, conversation_id: str, payload: Dict[str, Any]) -> bool:
+        """Store a webhook. Returns False if the conversation was already in the inbox."""
+        dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+        now = datetime.utcnow()
+        stmt = dialect_insert(Inbox).values(
+            conversation_id=conversation_id,
+            payload=payload,
+            status=InboxStatus.pending,
+            attempts=0,
+            next_attempt_at=now,
+            received_at=now,
+        ).on_conflict_do_nothing(index_elements=[Inbox.conversation_id])
+        result = await db.execute(stmt)
+        await db.commit()
+        return bool(result.rowcount)
+
+    @staticmethod
+    async def claim_next(db: AsyncSession, worker_id: str) -> Optional[models.PostCallInbox]:
+        """
+        Claim the oldest due row.
+        The claim is a conditional UPDATE, so two workers racing for the same
+        row cannot both win it.
+        """
+        now = datetime.utcnow()
+        candidates = (await db.execute(
+            select(Inbox.conversation_id).where(_claimable(now)).order_by(Inbox.next_attempt_at).limit(10)
+        )).scalars().all()
+
+        for conversation_id in candidates:
+            claimed = await db.execute(
+                update(Inbox).where(
+                    Inbox.conversation_id == conversation_id,
+                    _claimable(now)
+                ).values(
+                    status=InboxStatus.processing,
+                    lease_owner=worker_id,
+                    lease_expires_at=now + timedelta(seconds=POST_CALL_LEASE_SECONDS),
+                    attempts=Inbox.attempts + 1,
+                )
+            )
+            await db.commit()
+            if claimed.rowcount:
+                return await db.get(Inbox, conversation_id, populate_existing=True)
+
+        return None
+
+    @staticmethod
+    async def complete(db: AsyncSession, conversation_id: str, worker_id: str, result: Dict[str, Any]) -> None:
+        """Mark a claimed row done"""
+        await db.execute(
+            update(Inbox).where(
+                Inbox.conversation_id == conversation_id,
+                Inbox.lease_owner == worker_id
+            ).values(
+                status=InboxStatus.done,
+                lease_owner=None,
+                lease_expires_at=None,
+                last_error=None,
+                result=result,
+                processed_at=datetime.utcnow(),
+            )
+        )
+        await db.commit()
+
+    @staticmethod
+    async def fail(db: AsyncSession, item: models.PostCallInbox, worker_id: str, error: str) -> InboxStatus:
+        """Schedule a retry of a claimed row, or dead-letter it after the last attempt"""
+        if item.attempts >= POST_CALL_MAX_ATTEMPTS:
+            status, next_attempt_at = InboxStatus.dead, datetime.utcnow()
+        else:
+            status = InboxStatus.pending
+            next_attempt_at = datetime.utcnow() + timedelta(seconds=backoff_seconds(item.attempts))
+
+        await db.execute(
+            update(Inbox).where(
+                Inbox.conversation_id == item.conversation_id,
+                Inbox.lease_owner == worker_id
+            ).values(
+                status=status,
+                lease_owner=None,
+                lease_expires_at=None,
+                last_error=error[:4000],
+                next_attempt_at=next_attempt_at,
+            )
+        )
+        await db.commit()
+        return status
+
+    @staticmethod
+    async def requeue(db: AsyncSession, conversation_id: str) -> bool:
+        """Give a dead-lettered row a fresh set of attempts"""
+        result = await db.execute(
+            update(Inbox).where(
+                Inbox.conversation_id == conversation_id,
+                Inbox.status == InboxStatus.dead
+            ).values(status=InboxStatus.pending, attempts=0, next_attempt_at=datetime.utcnow())
+        )
+        await db.commit()
+        return bool(result.rowcount)
+
+    @staticmethod
+    async def stats(db: AsyncSession) -> Dict[str, Any]:
+        """Row counts per status and the age of the oldest due row"""
+        counts = dict((await db.execute(select(Inbox.status, func.count()).group_by(Inbox.status))).all())
+        oldest = await db.scalar(
+            select(func.min(Inbox.received_at)).where(Inbox.status.in_([InboxStatus.pending, InboxStatus.processing]))
+        )
+        return {
+            **{status.value: counts.get(status, 0) for status in InboxStatus},
+            "oldest_unprocessed_seconds": round((datetime.utcnow() - oldest).total_seconds(), 1) if oldest else 0.0,
+        }
+
+    @staticmethod
+    async def dead_letters(db: AsyncSession, limit: int = 100) -> List[models.PostCallInbox]:
+        return list((await db.execute(
+            select(Inbox).where(Inbox.status == InboxStatus.dead).order_by(Inbox.received_at.desc()).limit(limit)
+        )).scalars().all())
+
+    @staticmethod
+    async def purge_processed(db: AsyncSession, older_than: timedelta) -> int:
+        """Delete done rows processed before ``older_than`` ago"""
+        result = await db.execute(
+            delete(Inbox).where(
+                Inbox.status == InboxStatus.done,
+                Inbox.processed_at < datetime.utcnow() - older_than
+            )
+        )
+        await db.commit()
+        return result.rowcount or 0
+
+
+class PostCallWorkerPool:
+    """A fixed number of asyncio workers draining the post-call inbox"""
+
+    def __init__(self, size: int = POST_CALL_WORKERS, poll_interval: float = POST_CALL_POLL_SECONDS):
+        self.size = max(size, 1)
+        self.poll_interval = poll_interval
+        self.worker_id = generate_worker_id()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._tasks: List[asyncio.Task] = []
+        self._last_purge = 0.0
+
+    def start(self) -> None:
+        """Start the workers on the running event loop"""
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._tasks = [
+            asyncio.create_task(self._run(f"{self.worker_id}/{index}"), name=f"post-call-worker-{index}")
+            for index in range(self.size)
+        ]
+        logger.info(f"👷 {self.size} post-call workers started ({self.worker_id})")
+
+    def notify(self) -> None:
+        """Wake idle workers (new rows were enqueued by this process)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Let in-flight rows finish for up to ``timeout`` seconds, then cancel"""
+        self._stopping = True
+        self.notify()
+        if not self._tasks:
+            return
+        _, pending = await asyncio.wait(self._tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        self._tasks = []
+        logger.info(f"👷 Post-call workers {self.worker_id} stopped")
+
+    async def _run(self, worker_id: str) -> None:
+        while not self._stopping:
+            try:
+                worked = await self.run_once(worker_id)
+            except Exception as e:
+                logger.error(f"❌ Post-call worker {worker_id} error: {e}", exc_info=True)
+                worked = False
+            if worked:
+                continue
+            await self._purge_if_due()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def run_once(self, worker_id: str) -> bool:
+        """Claim and process one row. Returns False if nothing was due."""
+        async with AsyncSessionLocal() as db:
+            item = await PostCallInboxQueue.claim_next(db, worker_id)
+            if item is None:
+                return False
+            conversation_id, attempts, payload = item.conversation_id, item.attempts, item.payload
+
+            started = time.perf_counter()
+            error = None
+            result = None
+            try:
+                # Processing uses its own session; a rollback there must not touch the claim
+                async with AsyncSessionLocal() as work_db:
+                    result = await asyncio.wait_for(
+                        process_webhook_payload(work_db, payload), timeout=POST_CALL_PROCESS_TIMEOUT_SECONDS
+                    )
+                if result.get("status") != "success":
+                    error = result.get("message") or "processing failed"
+            except asyncio.TimeoutError:
+                error = f"timed out after {POST_CALL_PROCESS_TIMEOUT_SECONDS:g}s"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+
+            if error is None:
+                await PostCallInboxQueue.complete(db, conversation_id, worker_id, result)
+                logger.info(f"✅ Post-call {conversation_id} processed in {time.perf_counter() - started:.2f}s (attempt {attempts})")
+                return True
+
+            status = await PostCallInboxQueue.fail(db, item, worker_id, error)
+            if status == InboxStatus.dead:
+                logger.error(f"💀 Post-call {conversation_id} dead-lettered after {attempts} attempts: {error}")
+            else:
+                logger.warning(f"⚠️ Post-call {conversation_id} attempt {attempts} failed, retrying: {error}")
+            return True
+
+    async def _purge_if_due(self) -> None:
+        if time.monotonic() - self._last_purge < POST_CALL_PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        try:
+            async with AsyncSessionLocal() as db:
+                purged = await PostCallInboxQueue.purge_processed(db, timedelta(hours=POST_CALL_INBOX_RETENTION_HOURS))
+            if purged:
+                logger.info(f"🧹 Purged {purged} processed post-call webhooks")
+        except Exception as e:
+            logger.error(f"❌ Post-call inbox purge failed: {e}")
+
+
+_post_call_pool_instance = None
+
+def get_post_call_worker_pool() -> Optional[PostCallWorkerPool]:
+    """The pool running in this process, if any"""
+    return _post_call_pool_instance
+
+def start_post_call_workers() -> PostCallWorkerPool:
+    """Start the worker pool on the running event loop"""
+    global _post_call_pool_instance
+    if _post_call_pool_instance is None:
+        _post_call_pool_instance = PostCallWorkerPool()
+        _post_call_pool_instance.start()
+    return _post_call_pool_instance
+
+async def stop_post_call_workers() -> None:
+    global _post_call_pool_instance
+    if _post_call_pool_instance is not None:
+        await _post_call_pool_instance.stop()
+        _post_call_pool_instance = None
+
+def notify_post_call_workers() -> None:
+    """Wake this process's workers after an enqueue; others pick rows up on their next poll"""
+    if _post_call_pool_instance is not None:
+        _post_call_pool_instance.notify()
+
+
+def run_post_call_workers_forever(stop_event: threading.Event) -> None:
+    """Run the worker pool on a new event loop until ``stop_event`` is set (dedicated worker process)"""
+    async def main() -> None:
+        await get_elevenlabs_client().start()
+        start_post_call_workers()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, stop_event.wait)
+        finally:
+            await stop_post_call_workers()
+            await close_elevenlabs_client()
+            await dispose_async_engine()
+
+    asyncio.run(main())
+
+
+__all__ = [
+    "PostCallInboxQueue",
+    "PostCallWorkerPool",
+    "get_post_call_worker_pool",
+    "start_post_call_workers",
+    "stop_post_call_workers",
+    "notify_post_call_workers",
+    "run_post_call_workers_forever",
+]
@@ -0,0 +1,136 @@
+"""
+Principal Cache Module
+Short-lived cache of the authenticated user behind a JWT.
+
+Every authenticated request resolves the token's ``sub`` to a user to check
+that it still exists and is active, and to read its role and tenant. Resolved
+principals are kept for a short TTL per user id. Deactivating a user, changing
+its role or deleting it bumps the user's version, which drops the cached
+principal at once in this process; other processes catch up within the TTL.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+AUTH_PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("AUTH_PRINCIPAL_CACHE_TTL_SECONDS", "30"))
+AUTH_PRINCIPAL_CACHE_MAX_USERS = int(os.getenv("AUTH_PRINCIPAL_CACHE_MAX_USERS", "10000"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    """
+    Read-only snapshot of a User for request handling. It has the attributes
+    routes read from ``current_user``, and is safe to share between requests.
+    """
+    id: str
+    email: str
+    name: str
+    role: Any
+    tenant_id: str
+    is_active: bool
+    created_at: Optional[datetime] = None
+    last_login_at: Optional[datetime] = None
+
+    @classmethod
+    def from_user(cls, user: Any) -> "Principal":
+        return cls(
+            id=user.id,
+            email=user.email,
+            name=user.name,
+            role=user.role,
+            tenant_id=user.tenant_id,
+            is_active=user.is_active,
+            created_at=user.created_at,
+            last_login_at=user.last_login_at,
+        )
+
+
+class PrincipalCache:
+    """Versioned, TTL-bounded cache of principals by user id"""
+
+    def __init__(self, ttl: float, max_users: int):
+        self.ttl = ttl
+        self.max_users = max_users
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._metrics = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0}
+
+    def get(self, user_id: str) -> Tuple[Optional[Principal], int]:
+        """
+        The cached principal of a user (or None) and the user's current version,
+        which must be handed back to ``put`` after loading the principal
+        """
+        with self._lock:
+            version = self._versions.get(user_id, 0)
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry_version, expires_at, principal = entry
+                if entry_version == version and expires_at > time.monotonic():
+                    self._entries.move_to_end(user_id)
+                    self._metrics["hits"] += 1
+                    return principal, version
+                del self._entries[user_id]
+            self._metrics["misses"] += 1
+            return None, version
+
+    def put(self, user_id: str, version: int, principal: Principal) -> None:
+        """Cache a principal loaded at ``version``, unless the user changed meanwhile"""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            if self._versions.get(user_id, 0) != version:
+                return
+            self._entries[user_id] = (version, time.monotonic() + self.ttl, principal)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+                self._metrics["evictions"] += 1
+
+    def invalidate(self, user_id: str) -> None:
+        """Bump a user's version so its cached principal is reloaded"""
+        with self._lock:
+            self._metrics["invalidations"] += 1
+            self._versions[user_id] = self._versions.get(user_id, 0) + 1
+            self._entries.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._metrics["hits"] + self._metrics["misses"]
+            return {
+                **self._metrics,
+                "size": len(self._entries),
+                "max_users": self.max_users,
+                "ttl_seconds": self.ttl,
+                "hit_ratio": round(self._metrics["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+_principal_cache_instance = None
+
+def get_principal_cache() -> PrincipalCache:
+    """Get or create the singleton PrincipalCache instance"""
+    global _principal_cache_instance
+    if _principal_cache_instance is None:
+        _principal_cache_instance = PrincipalCache(AUTH_PRINCIPAL_CACHE_TTL_SECONDS, AUTH_PRINCIPAL_CACHE_MAX_USERS)
+    return _principal_cache_instance
+
+def invalidate_principal(user_id: str) -> None:
+    """Drop a user's cached principal after a change to its account (role, activation, deletion)"""
+    get_principal_cache().invalidate(user_id)
+
+
+__all__ = [
+    "Principal",
+    "PrincipalCache",
+    "get_principal_cache",
+    "invalidate_principal",
+]
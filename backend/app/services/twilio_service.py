@@ -9,6 +9,8 @@ from typing import Optional, Dict, Any
 from twilio.rest import Client
 from twilio.base.exceptions import TwilioRestException
 
+from app.phone_utils import to_e164
+
 logger = logging.getLogger(__name__)
 
 
@@ -137,27 +139,13 @@ class TwilioService:
             phone: Phone number in various formats
             
         Returns:
-            Phone number in E.164 format
+            Phone number in E.164 format (app.phone_utils.to_e164), the same form
+            customers are stored and matched in
         """
-        # Remove spaces, dashes, parentheses
-        cleaned = phone.replace(' ', '').replace('-', '').replace('(', '').replace(')', '')
-        
-        # If starts with +, assume E.164
-        if cleaned.startswith('+'):
-            return cleaned
-        
-        # If starts with 1 and is 11 digits (US format)
-        if cleaned.startswith('1') and len(cleaned) == 11:
-            return f"+{cleaned}"
-        
-        # If 10 digits, assume US (add +1)
-        if len(cleaned) == 10 and cleaned.isdigit():
-            return f"+1{cleaned}"
-        
-        # If has country code but no +
-        if len(cleaned) > 10 and cleaned.isdigit():
-            return f"+{cleaned}"
-        
+        normalized = to_e164(phone)
+        if normalized:
+            return normalized
+
         # Return original if can't normalize
         logger.warning(f"⚠️ Could not normalize phone number: {phone}")
         return phone
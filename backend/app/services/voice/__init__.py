@@ -27,6 +27,12 @@ from .elevenlabs_service import (
     extract_conversation_id_from_payload
 )
 
+from .transcript_service import (
+    save_transcript,
+    get_stored_transcript,
+    load_transcript
+)
+
 from .webhook_service import (
     process_webhook_payload
 )
@@ -60,6 +66,11 @@ __all__ = [
     "extract_conversation_data",
     "extract_conversation_id_from_payload",
 
+    # Transcript Store
+    "save_transcript",
+    "get_stored_transcript",
+    "load_transcript",
+
     # Webhook Orchestrator
     "process_webhook_payload",
 
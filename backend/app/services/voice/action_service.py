@@ -1,10 +1,11 @@
 import logging
 import secrets
 from datetime import datetime, timezone, timedelta
-from typing import Dict, Any, Union
-from sqlalchemy.orm import Session
-from sqlalchemy.exc import IntegrityError
+from typing import Dict, Any, Optional, Union
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models
+from app.services.call_feed_service import refresh_call_feed
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +20,32 @@ def get_val(data: Dict[str, Any], key: str) -> str:
         return str(obj.get("value", "")).strip()
     return str(obj).strip()
 
+def as_utc_naive(value: Any) -> Optional[datetime]:
+    """
+    Naive UTC datetime, as DateTime columns store it, from an aware or naive
+    datetime, an ISO string or unix seconds. None if it cannot be read.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return datetime.fromtimestamp(value, tz=timezone.utc).replace(tzinfo=None)
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if not isinstance(value, datetime):
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+def _insert_or_ignore(db: AsyncSession, model: Any, conflict_column: Any):
+    """
+    INSERT ... ON CONFLICT (conflict_column) DO NOTHING. With RETURNING, a
+    conflicting row returns nothing, so the database settles duplicates.
+    """
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    return dialect_insert(model).on_conflict_do_nothing(index_elements=[conflict_column])
+
 def parse_iso_date(date_str: str) -> datetime:
     fallback = (datetime.now(timezone.utc) + timedelta(days=1)).replace(hour=10, minute=0, second=0, microsecond=0)
     if not date_str:
@@ -33,70 +60,57 @@ def parse_iso_date(date_str: str) -> datetime:
         logger.warning(f"⚠️ Date parse failed for '{date_str}': {e}. Using fallback.")
         return fallback
 
-def create_booking_from_conversation(
-    db: Session,
+async def create_booking_from_conversation(
+    db: AsyncSession,
     session: Any,
     customer: models.Customer,
     data: Dict[str, Any]
 ):
-    # Check if a booking already exists for this session to prevent duplicates
-    session_id = getattr(session, "id", None)
-    if session_id:
-        existing_booking = db.query(models.Booking).filter(
-            models.Booking.session_id == session_id
-        ).first()
-
-        if existing_booking:
-            logger.info(f"ℹ️ Booking already exists for session {session_id}, skipping creation.")
-            return
-
     logger.info(f"📅 Creating Booking for: {customer.name}")
     raw_date = get_val(data, "preferred_datetime")
     project_val = get_val(data, "project") or "General Inquiry"
-    final_date = parse_iso_date(raw_date)
+    final_date = as_utc_naive(parse_iso_date(raw_date))
     is_real_session = hasattr(session, "_sa_instance_state")
+    session_id = getattr(session, "id", None) if is_real_session else None
 
+    await db.flush()
     try:
-        booking = models.Booking(
-            id=generate_id("bk"),
-            tenant_id=session.tenant_id,
-            customer_id=customer.id,
-            session_id=getattr(session, "id", None) if is_real_session else None,
-            customer_name=customer.name,
-            phone=customer.phone,
-            property_code=project_val,
-            project=project_val,
-            start_date=final_date,
-            preferred_datetime=final_date,
-            price_sar=0.0,
-            source=models.ChannelEnum.voice,
-            status=models.BookingStatusEnum.pending,
-            created_by=models.AIOrHumanEnum.AI,
-            created_at=datetime.now(timezone.utc)
-        )
-        db.add(booking)
-        logger.info(f"✅ Booking Created: {booking.id} @ {final_date}")
+        # One booking per session (uq_bookings_session_id): a duplicate inserts nothing.
+        # The savepoint confines a failure to this insert, so the transaction stays usable.
+        async with db.begin_nested():
+            booking_id = await db.scalar(
+                _insert_or_ignore(db, models.Booking, models.Booking.session_id).values(
+                    id=generate_id("bk"),
+                    tenant_id=session.tenant_id,
+                    customer_id=customer.id,
+                    session_id=session_id,
+                    customer_name=customer.name,
+                    phone=customer.phone,
+                    property_code=project_val,
+                    project=project_val,
+                    start_date=final_date,
+                    preferred_datetime=final_date,
+                    price_sar=0.0,
+                    source=models.ChannelEnum.voice,
+                    status=models.BookingStatusEnum.pending,
+                    created_by=models.AIOrHumanEnum.AI,
+                    created_at=datetime.utcnow()
+                ).returning(models.Booking.id)
+            )
+        if booking_id:
+            logger.info(f"✅ Booking Created: {booking_id} @ {final_date}")
+        else:
+            logger.info(f"ℹ️ Booking already exists for session {session_id}, skipping creation.")
     except Exception as e:
         logger.error(f"❌ Booking Creation Failed: {e}", exc_info=True)
         # Don't raise, allow flow to continue (best effort)
 
-def create_ticket_from_conversation(
-    db: Session,
+async def create_ticket_from_conversation(
+    db: AsyncSession,
     session: Any,
     customer: models.Customer,
     data: Dict[str, Any]
 ):
-    # Check if a ticket already exists for this session to prevent duplicates
-    session_id = getattr(session, "id", None)
-    if session_id:
-        existing_ticket = db.query(models.Ticket).filter(
-            models.Ticket.session_id == session_id
-        ).first()
-
-        if existing_ticket:
-            logger.info(f"ℹ️ Ticket already exists for session {session_id}, skipping creation.")
-            return
-
     logger.info(f"🎫 Creating Ticket for: {customer.name}")
     issue_val = get_val(data, "issue") or getattr(session, "summary", "Voice Interaction Issue")
     project_val = get_val(data, "project") or "General"
@@ -109,119 +123,116 @@ def create_ticket_from_conversation(
         priority_enum = models.TicketPriorityEnum.low
 
     is_real_session = hasattr(session, "_sa_instance_state")
+    session_id = getattr(session, "id", None) if is_real_session else None
 
+    await db.flush()
     try:
-        ticket = models.Ticket(
-            id=generate_id("tkt"),
-            tenant_id=session.tenant_id,
-            customer_id=customer.id,
-            session_id=getattr(session, "id", None) if is_real_session else None,
-            customer_name=customer.name,
-            phone=customer.phone,
-            issue=issue_val,
-            project=project_val,
-            category="Voice Support",
-            priority=priority_enum,
-            status=models.TicketStatusEnum.open,
-            created_at=datetime.now(timezone.utc)
-        )
-        db.add(ticket)
-        logger.info(f"✅ Ticket Created: {ticket.id} (Priority: {priority_enum.value})")
+        # One ticket per session (uq_tickets_session_id): a duplicate inserts nothing.
+        # The savepoint confines a failure to this insert, so the transaction stays usable.
+        async with db.begin_nested():
+            ticket_id = await db.scalar(
+                _insert_or_ignore(db, models.Ticket, models.Ticket.session_id).values(
+                    id=generate_id("tkt"),
+                    tenant_id=session.tenant_id,
+                    customer_id=customer.id,
+                    session_id=session_id,
+                    customer_name=customer.name,
+                    phone=customer.phone,
+                    issue=issue_val,
+                    project=project_val,
+                    category="Voice Support",
+                    priority=priority_enum,
+                    status=models.TicketStatusEnum.open,
+                    created_at=datetime.utcnow()
+                ).returning(models.Ticket.id)
+            )
+        if ticket_id:
+            logger.info(f"✅ Ticket Created: {ticket_id} (Priority: {priority_enum.value})")
+        else:
+            logger.info(f"ℹ️ Ticket already exists for session {session_id}, skipping creation.")
     except Exception as e:
         logger.error(f"❌ Ticket Creation Failed: {e}", exc_info=True)
         # Don't raise, allow flow to continue
 
-def create_history_records(db: Session, session: Any, customer: models.Customer):
+async def create_history_records(db: AsyncSession, session: Any, customer: models.Customer) -> bool:
     """
-    Safely creates Conversation and Call records.
-    Uses nested transaction (begin_nested) to handle race conditions where 
-    ElevenLabs sends duplicate webhooks simultaneously.
+    Creates the Conversation and Call records of a session and projects the call
+    into the calls feed. Both inserts are ON CONFLICT DO NOTHING (conversation id,
+    uq_calls_conversation_id), so duplicate webhooks that ElevenLabs sends
+    simultaneously are settled by the database without reading first.
+    Returns True only for the webhook whose insert created the call, False when
+    the call already exists. Database errors propagate.
     """
     conv_id = getattr(session, "conversation_id", None) or generate_id("conv")
-    
-    # 1. Ensure Conversation Exists
-    conversation = db.query(models.Conversation).filter(models.Conversation.id == conv_id).first()
-    
-    if not conversation:
-        try:
-            # Create savepoint for safe insertion attempt
-            with db.begin_nested():
-                conversation = models.Conversation(
-                    id=conv_id,
-                    tenant_id=session.tenant_id,
-                    channel=models.ChannelEnum.voice,
-                    customer_id=customer.id,
-                    summary=getattr(session, "summary", "Auto-log"),
-                    ai_or_human=models.AIOrHumanEnum.AI,
-                    created_at=getattr(session, "created_at", datetime.now(timezone.utc)),
-                    ended_at=getattr(session, "ended_at", datetime.now(timezone.utc))
-                )
-                db.add(conversation)
-                # Flush to trigger constraint check immediately within nested transaction
-                db.flush()
-        except IntegrityError:
-            # Race condition caught: another request created it just now
-            logger.info(f"⚠️ Conversation {conv_id} already exists (race condition), fetching existing.")
-            # Re-fetch the conversation that blocked us
-            conversation = db.query(models.Conversation).filter(models.Conversation.id == conv_id).first()
-        except Exception as e:
-            logger.error(f"❌ Failed to create conversation: {e}")
-            return
-
-    # 2. Add Call Record (if conversation exists)
-    if conversation:
-        # Check if call already logged for this conversation (deduplication)
-        existing_call = db.query(models.Call).filter(models.Call.conversation_id == conv_id).first()
-        if existing_call:
-            logger.info(f"ℹ️ Call record already exists for conversation {conv_id}")
-            return
-
-        try:
-            # Calculate handle_sec if session has start and end times
-            handle_sec = None
-            if hasattr(session, 'created_at') and hasattr(session, 'ended_at') and session.created_at and session.ended_at:
-                duration_seconds = (session.ended_at - session.created_at).total_seconds()
-                handle_sec = int(duration_seconds)
+    now = datetime.utcnow()
+    started_at = as_utc_naive(getattr(session, "created_at", None))
+    ended_at = as_utc_naive(getattr(session, "ended_at", None))
+    handle_sec = int((ended_at - started_at).total_seconds()) if started_at and ended_at else None
+
+    # The customer and session changes must reach the database before rows referencing them
+    await db.flush()
+
+    # Both inserts share a savepoint. A failure rolls it back and propagates, so
+    # the caller rolls back and the post-call inbox retries the webhook.
+    async with db.begin_nested():
+        # 1. Ensure Conversation Exists
+        await db.execute(
+            _insert_or_ignore(db, models.Conversation, models.Conversation.id).values(
+                id=conv_id,
+                tenant_id=session.tenant_id,
+                channel=models.ChannelEnum.voice,
+                customer_id=customer.id,
+                summary=getattr(session, "summary", "Auto-log"),
+                ai_or_human=models.AIOrHumanEnum.AI,
+                created_at=started_at or now,
+                ended_at=ended_at or now
+            )
+        )
 
-            call = models.Call(
+        # 2. Add Call Record, unless the conversation already has one
+        call_id = await db.scalar(
+            _insert_or_ignore(db, models.Call, models.Call.conversation_id).values(
                 id=generate_id("call"),
                 tenant_id=session.tenant_id,
-                conversation_id=conversation.id,
+                conversation_id=conv_id,
                 direction=models.CallDirectionEnum.inbound,
                 status=models.CallStatusEnum.connected,
                 ai_or_human=models.AIOrHumanEnum.AI,
                 handle_sec=handle_sec,
-                created_at=datetime.now(timezone.utc)
-            )
-            db.add(call)
-            # We don't strictly need to flush here, main commit will handle it
-        except Exception as e:
-            logger.error(f"❌ Failed to create call record: {e}")
-    else:
-        logger.error(f"❌ Could not link Call to Conversation {conv_id} (Missing)")
+                created_at=now
+            ).returning(models.Call.id)
+        )
+    if not call_id:
+        logger.info(f"ℹ️ Call record already exists for conversation {conv_id}")
+        return False
+
+    await refresh_call_feed(db, [conv_id])
+    return True
 
-def create_full_interaction_record(
-    db: Session,
+async def create_full_interaction_record(
+    db: AsyncSession,
     session: Any,
     customer: models.Customer,
     data: Dict[str, Any]
 ):
-    # 1. Log History (Safe Mode)
-    create_history_records(db, session, customer)
+    # 1. Log History. Only the webhook that recorded the call goes on,
+    # so a booking or ticket is created once per conversation.
+    if not await create_history_records(db, session, customer):
+        return
     
     # 2. Execute Business Logic
     intent = get_val(data, "extracted_intent")
     logger.info(f"🧠 Action Routing: Intent='{intent}'")
     
     if intent == "book_appointment":
-        create_booking_from_conversation(db, session, customer, data)
+        await create_booking_from_conversation(db, session, customer, data)
     elif intent == "raise_ticket":
-        create_ticket_from_conversation(db, session, customer, data)
+        await create_ticket_from_conversation(db, session, customer, data)
     else:
         # Fallback Heuristics
         if get_val(data, "issue"):
             logger.info("↪️ Fallback: Found 'issue', creating Ticket.")
-            create_ticket_from_conversation(db, session, customer, data)
+            await create_ticket_from_conversation(db, session, customer, data)
         elif get_val(data, "preferred_datetime"):
             logger.info("↪️ Fallback: Found 'date', creating Booking.")
-            create_booking_from_conversation(db, session, customer, data)
+            await create_booking_from_conversation(db, session, customer, data)
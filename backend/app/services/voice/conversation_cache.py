@@ -0,0 +1,239 @@
+"""
+ElevenLabs Conversation Cache
+Read-through cache for ElevenLabs conversation payloads.
+
+The post-call webhook, manual sync and both transcript endpoints fetch the same
+conversation JSON. Finished conversations do not change, so they are kept in a
+bounded in-memory LRU with a TTL, optionally backed by a shared on-disk or
+Redis store. Concurrent requests for the same id share a single API call.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+ELEVENLABS_CACHE_MAX_ENTRIES = int(os.getenv("ELEVENLABS_CACHE_MAX_ENTRIES", "512"))
+ELEVENLABS_CACHE_TTL_SECONDS = float(os.getenv("ELEVENLABS_CACHE_TTL_SECONDS", "900"))
+# "memory" (default), "disk" or "redis"
+ELEVENLABS_CACHE_BACKEND = os.getenv("ELEVENLABS_CACHE_BACKEND", "memory").lower()
+ELEVENLABS_CACHE_DIR = os.getenv("ELEVENLABS_CACHE_DIR", "/tmp/elevenlabs-cache")
+ELEVENLABS_CACHE_REDIS_URL = os.getenv("ELEVENLABS_CACHE_REDIS_URL", "redis://localhost:6379/0")
+
+# Conversations still in these states may change, so they are never cached
+UNFINISHED_CONVERSATION_STATUSES = {"initiated", "in-progress", "processing"}
+
+
+class DiskCacheBackend:
+    """One JSON file per conversation; shared by processes on the same host"""
+
+    def __init__(self, directory: str, ttl: float):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode("utf-8")).hexdigest() + ".json")
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            if time.time() - os.path.getmtime(path) > self.ttl:
+                os.remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _write(self, key: str, value: Dict[str, Any]) -> None:
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self._read, key)
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        await asyncio.to_thread(self._write, key, value)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await asyncio.to_thread(os.remove, self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class RedisCacheBackend:
+    """Any Redis-compatible server; shared by every API process"""
+
+    def __init__(self, url: str, ttl: float):
+        from redis import asyncio as redis_asyncio
+
+        self.ttl = int(ttl)
+        self._client = redis_asyncio.from_url(url)
+
+    @staticmethod
+    def _key(key: str) -> str:
+        return f"elevenlabs:conversation:{key}"
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        raw = await self._client.get(self._key(key))
+        return json.loads(raw) if raw else None
+
+    async def set(self, key: str, value: Dict[str, Any]) -> None:
+        await self._client.set(self._key(key), json.dumps(value, ensure_ascii=False), ex=self.ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self._key(key))
+
+
+class ConversationCache:
+    """LRU + TTL cache with single-flight loading and hit/miss counters"""
+
+    def __init__(self, max_entries: int, ttl: float, backend: Optional[Any] = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._metrics = {
+            "hits": 0,
+            "backend_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "errors": 0,
+        }
+
+    async def get_or_fetch(
+        self,
+        conversation_id: str,
+        fetch: Callable[[str], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """Return the cached payload, or fetch it once for all concurrent callers"""
+        cached = self._get_local(conversation_id)
+        if cached is not None:
+            self._metrics["hits"] += 1
+            return cached
+
+        inflight = self._inflight.get(conversation_id)
+        if inflight is not None:
+            self._metrics["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[conversation_id] = future
+        try:
+            data = await self._load(conversation_id, fetch)
+            future.set_result(data)
+            return data
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(conversation_id, None)
+
+    async def _load(
+        self,
+        conversation_id: str,
+        fetch: Callable[[str], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        if self.backend is not None:
+            try:
+                stored = await self.backend.get(conversation_id)
+            except Exception as e:
+                self._metrics["errors"] += 1
+                logger.warning(f"⚠️ Conversation cache backend read failed: {e}")
+                stored = None
+            if stored is not None:
+                self._metrics["backend_hits"] += 1
+                self._set_local(conversation_id, stored)
+                return stored
+
+        self._metrics["misses"] += 1
+        data = await fetch(conversation_id)
+
+        if self.is_cacheable(data):
+            self._set_local(conversation_id, data)
+            if self.backend is not None:
+                try:
+                    await self.backend.set(conversation_id, data)
+                except Exception as e:
+                    self._metrics["errors"] += 1
+                    logger.warning(f"⚠️ Conversation cache backend write failed: {e}")
+        return data
+
+    @staticmethod
+    def is_cacheable(data: Any) -> bool:
+        """Only finished conversations are immutable"""
+        return isinstance(data, dict) and data.get("status") not in UNFINISHED_CONVERSATION_STATUSES
+
+    def _get_local(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(conversation_id)
+        if entry is None:
+            return None
+        expires_at, data = entry
+        if expires_at < time.monotonic():
+            del self._entries[conversation_id]
+            return None
+        self._entries.move_to_end(conversation_id)
+        return data
+
+    def _set_local(self, conversation_id: str, data: Dict[str, Any]) -> None:
+        self._entries[conversation_id] = (time.monotonic() + self.ttl, data)
+        self._entries.move_to_end(conversation_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._metrics["evictions"] += 1
+
+    async def invalidate(self, conversation_id: str) -> None:
+        self._entries.pop(conversation_id, None)
+        if self.backend is not None:
+            await self.backend.delete(conversation_id)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._metrics["hits"] + self._metrics["backend_hits"] + self._metrics["misses"]
+        return {
+            **self._metrics,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hit_ratio": round((lookups - self._metrics["misses"]) / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _create_backend() -> Optional[Any]:
+    if ELEVENLABS_CACHE_BACKEND == "disk":
+        return DiskCacheBackend(ELEVENLABS_CACHE_DIR, ELEVENLABS_CACHE_TTL_SECONDS)
+    if ELEVENLABS_CACHE_BACKEND == "redis":
+        try:
+            return RedisCacheBackend(ELEVENLABS_CACHE_REDIS_URL, ELEVENLABS_CACHE_TTL_SECONDS)
+        except ImportError:
+            logger.error("redis library not installed. Install with: pip install redis. Using in-memory cache only")
+    return None
+
+
+_conversation_cache_instance = None
+
+def get_conversation_cache() -> ConversationCache:
+    """Get or create the singleton ConversationCache instance"""
+    global _conversation_cache_instance
+    if _conversation_cache_instance is None:
+        _conversation_cache_instance = ConversationCache(
+            ELEVENLABS_CACHE_MAX_ENTRIES,
+            ELEVENLABS_CACHE_TTL_SECONDS,
+            backend=_create_backend()
+        )
+    return _conversation_cache_instance
@@ -1,10 +1,13 @@
 import logging
 import secrets
-import re
-from datetime import datetime, timezone
-from sqlalchemy.orm import Session
+from datetime import datetime
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from app import models
+from app.phone_utils import normalize_phone, to_e164
+from app.search_utils import customer_search_text
+from app.services.call_feed_service import customer_name_update
 
 logger = logging.getLogger(__name__)
 
@@ -13,71 +16,60 @@ def generate_id(prefix: str = "cust") -> str:
 
 def normalize_phone_number(phone: str) -> str:
     """
-    Standardizes phone numbers to International format (+20, +966).
+    Standardizes phone numbers to E.164 (+20, +966, ...), see app.phone_utils.to_e164.
+    Numbers that cannot be read are returned as given.
     """
-    if not phone: 
-        return ""
-        
-    # Remove spaces, dashes, parentheses
-    clean = re.sub(r'[\s\-\(\)]', '', phone.strip())
-    
-    # Already international
-    if clean.startswith('+'): 
-        return clean
-        
-    # Egypt Handling (01X... -> +201X...)
-    if clean.startswith('0020'): 
-        return '+' + clean[2:]
-    if clean.startswith('01') and len(clean) == 11: 
-        return '+20' + clean[1:] # ✅ FIX: Drop the leading '0'
-        
-    # Saudi Handling (05X... -> +9665X...)
-    if clean.startswith('966'): 
-        return '+' + clean
-    if clean.startswith('05') and len(clean) == 10: 
-        return '+966' + clean[1:] # Drop the leading '0'
-        
-    # Fallback: Just add plus if it looks like digits
-    if clean.isdigit(): 
-        return '+' + clean
-        
-    return clean
+    return normalize_phone(phone)
 
-def upsert_customer(db: Session, phone: str, name: Optional[str], tenant_id: str) -> models.Customer:
+async def upsert_customer(db: AsyncSession, phone: str, name: Optional[str], tenant_id: str) -> models.Customer:
     """
     Finds existing customer or creates a new one.
     Crucial: Ensures we always have a valid Customer object for bookings.
+
+    One INSERT ... ON CONFLICT (tenant_id, phone_e164) DO UPDATE ... RETURNING:
+    concurrent webhooks from the same caller resolve to the same customer.
     """
-    # 1. Handle missing phone scenarios
-    if not phone:
-        phone = f"UNKNOWN_{secrets.token_hex(4)}"
-        
-    normalized = normalize_phone_number(phone)
-    
-    # 2. Lookup
-    customer = db.query(models.Customer).filter(
-        models.Customer.phone == normalized,
-        models.Customer.tenant_id == tenant_id
-    ).first()
-    
-    # 3. Update Existing
-    if customer:
-        if name and name.strip() and customer.name != name:
-            logger.info(f"📝 Updating Name: {customer.name} -> {name}")
-            customer.name = name
-            db.add(customer)
-        return customer
-    
-    # 4. Create New
-    new_customer = models.Customer(
+    phone_e164 = to_e164(phone)
+    new_name = name.strip() if name and name.strip() else None
+
+    # 1. Handle missing or unreadable phone scenarios: nothing to match on
+    if not phone_e164:
+        new_customer = models.Customer(
+            id=generate_id(),
+            tenant_id=tenant_id,
+            name=new_name or "New Customer",
+            phone=phone.strip() if phone else f"UNKNOWN_{secrets.token_hex(4)}",
+            phone_e164=None,
+            created_at=datetime.utcnow()
+        )
+        db.add(new_customer)
+        await db.flush()
+        logger.info(f"🆕 Created Customer without a readable phone: {new_customer.name} ({new_customer.phone})")
+        return new_customer
+
+    # 2. Upsert: a new customer, or the existing one with the new name
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = dialect_insert(models.Customer).values(
         id=generate_id(),
         tenant_id=tenant_id,
-        name=name or "New Customer",
-        phone=normalized,
-        created_at=datetime.now(timezone.utc)
+        name=new_name or "New Customer",
+        phone=phone_e164,
+        phone_e164=phone_e164,
+        created_at=datetime.utcnow()
     )
-    db.add(new_customer)
-    db.flush() 
-    
-    logger.info(f"🆕 Created Customer: {new_customer.name} ({normalized})")
-    return new_customer
\ No newline at end of file
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[models.Customer.tenant_id, models.Customer.phone_e164],
+        # Without a name the update is a no-op, so RETURNING still yields the row
+        set_={"name": stmt.excluded.name if new_name else models.Customer.name}
+    ).returning(models.Customer)
+    customer = await db.scalar(stmt, execution_options={"populate_existing": True})
+
+    # 3. Copy a new name to the customer's search text and calls (rows already carrying it are skipped)
+    if new_name:
+        search_text = customer_search_text(customer.name, customer.email)
+        if customer.search_text != search_text:
+            customer.search_text = search_text
+        await db.execute(customer_name_update(customer.id, new_name))
+
+    logger.info(f"👤 Customer resolved: {customer.name} ({phone_e164})")
+    return customer
@@ -0,0 +1,114 @@
+"""
+ElevenLabs HTTP Client
+One pooled aiohttp session for the whole process, opened and closed by the app lifespan.
+
+Keeps connections alive between post-call webhooks and transcript views, caps
+connections per host, and retries 429/5xx responses with jittered backoff.
+"""
+
+import asyncio
+import logging
+import os
+import random
+from typing import Any, Dict, Optional
+
+import aiohttp
+from fastapi import HTTPException
+
+logger = logging.getLogger(__name__)
+
+ELEVENLABS_API_BASE_URL = os.getenv("ELEVENLABS_API_BASE_URL", "https://api.elevenlabs.io")
+ELEVENLABS_TIMEOUT_SECONDS = float(os.getenv("ELEVENLABS_TIMEOUT_SECONDS", "30"))
+ELEVENLABS_CONNECT_TIMEOUT_SECONDS = float(os.getenv("ELEVENLABS_CONNECT_TIMEOUT_SECONDS", "5"))
+ELEVENLABS_MAX_CONNECTIONS = int(os.getenv("ELEVENLABS_MAX_CONNECTIONS", "100"))
+ELEVENLABS_MAX_CONNECTIONS_PER_HOST = int(os.getenv("ELEVENLABS_MAX_CONNECTIONS_PER_HOST", "20"))
+ELEVENLABS_KEEPALIVE_SECONDS = float(os.getenv("ELEVENLABS_KEEPALIVE_SECONDS", "60"))
+ELEVENLABS_MAX_RETRIES = int(os.getenv("ELEVENLABS_MAX_RETRIES", "3"))
+ELEVENLABS_BACKOFF_BASE_SECONDS = float(os.getenv("ELEVENLABS_BACKOFF_BASE_SECONDS", "0.5"))
+ELEVENLABS_BACKOFF_MAX_SECONDS = float(os.getenv("ELEVENLABS_BACKOFF_MAX_SECONDS", "8"))
+
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+
+class ElevenLabsClient:
+    """Pooled, retrying client for the ElevenLabs REST API"""
+
+    def __init__(self, base_url: str = ELEVENLABS_API_BASE_URL):
+        self.base_url = base_url.rstrip("/")
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        if self._session is not None and not self._session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=ELEVENLABS_MAX_CONNECTIONS,
+            limit_per_host=ELEVENLABS_MAX_CONNECTIONS_PER_HOST,
+            keepalive_timeout=ELEVENLABS_KEEPALIVE_SECONDS,
+            ttl_dns_cache=300
+        )
+        timeout = aiohttp.ClientTimeout(
+            total=ELEVENLABS_TIMEOUT_SECONDS,
+            sock_connect=ELEVENLABS_CONNECT_TIMEOUT_SECONDS
+        )
+        self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        logger.info("🔌 ElevenLabs client session opened")
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            logger.info("🔌 ElevenLabs client session closed")
+        self._session = None
+
+    async def get_json(self, path: str, headers: Dict[str, str]) -> Dict[str, Any]:
+        """GET ``path`` and decode the JSON body, retrying throttled and failed requests"""
+        await self.start()
+        url = f"{self.base_url}{path}"
+
+        for attempt in range(ELEVENLABS_MAX_RETRIES + 1):
+            last_attempt = attempt == ELEVENLABS_MAX_RETRIES
+            try:
+                async with self._session.get(url, headers=headers) as response:
+                    if response.status == 200:
+                        return await response.json()
+
+                    error_txt = await response.text()
+                    if response.status not in RETRYABLE_STATUSES or last_attempt:
+                        logger.error(f"❌ API Error {response.status}: {error_txt}")
+                        raise HTTPException(status_code=response.status, detail="Failed to fetch conversation")
+
+                    delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                    logger.warning(f"⚠️ ElevenLabs returned {response.status}, retry {attempt + 1} in {delay:.2f}s")
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if last_attempt:
+                    logger.error(f"❌ ElevenLabs request failed after {attempt + 1} attempts: {e}")
+                    raise HTTPException(status_code=502, detail="Failed to reach ElevenLabs")
+                delay = self._backoff(attempt)
+                logger.warning(f"⚠️ ElevenLabs request error ({e!r}), retry {attempt + 1} in {delay:.2f}s")
+
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than Retry-After"""
+        delay = random.uniform(0, min(ELEVENLABS_BACKOFF_MAX_SECONDS, ELEVENLABS_BACKOFF_BASE_SECONDS * (2 ** attempt)))
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), ELEVENLABS_BACKOFF_MAX_SECONDS))
+            except ValueError:
+                pass
+        return delay
+
+
+_elevenlabs_client_instance = None
+
+def get_elevenlabs_client() -> ElevenLabsClient:
+    """Get or create the singleton ElevenLabsClient instance"""
+    global _elevenlabs_client_instance
+    if _elevenlabs_client_instance is None:
+        _elevenlabs_client_instance = ElevenLabsClient()
+    return _elevenlabs_client_instance
+
+async def close_elevenlabs_client() -> None:
+    """Close the pooled session on shutdown"""
+    if _elevenlabs_client_instance is not None:
+        await _elevenlabs_client_instance.close()
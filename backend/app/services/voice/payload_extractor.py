@@ -0,0 +1,359 @@
+"""
+ElevenLabs Payload Extractor
+Single-pass extraction of everything the backend needs from a conversation payload.
+
+The recording URL used to be searched with up to six recursive walks of the
+payload, and the transcript was extracted again for every caller. Here the
+direct field probes are plain dict lookups, the payload is walked at most once
+(stopping as soon as the best possible match is found), and the transcript,
+recording URL, data collection fields and metadata are produced together.
+"""
+
+import json
+import logging
+import re
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Recording URL probes, in priority order
+URL_FIELDS = ("recording_url", "audio_url", "download_url", "playback_url", "file_url", "url")
+SECTION_URL_FIELDS = URL_FIELDS + ("conversation_url",)
+ELEVENLABS_URL_FIELDS = (
+    "conversation_recording_url",
+    "audio_recording_url",
+    "recording_download_url",
+    "conversation_audio_url",
+    "call_recording_url",
+    "voice_recording_url",
+    "recording_file_url",
+    "audio_file_url",
+    "conversation_file_url",
+)
+TURN_URL_FIELDS = ("audio_url", "recording_url", "url", "audio_file", "recording_file")
+URL_KEYWORDS = re.compile(r"recording|audio|download|playback|file|mp3|wav|m4a")
+KEY_KEYWORDS = re.compile(r"recording|audio|download")
+AUDIO_EXTENSIONS = re.compile(r"\.(?:mp3|wav|m4a|flac|aac)")
+
+# Ranks of the matches found while walking the payload (lower wins)
+RANK_CONVERSATION_ID = 0
+RANK_TOP_LEVEL_AUDIO = 1
+RANK_URL_KEYWORD = 2
+RANK_KEY_KEYWORD = 3
+RANK_AUDIO_EXTENSION = 4
+RANK_FILE_OBJECT = 5
+
+# Transcript role normalization
+USER_ROLES = frozenset(("user", "customer", "caller", "human"))
+ASSISTANT_ROLES = frozenset(("assistant", "agent", "ai", "subagent"))
+FALLBACK_ASSISTANT_ROLES = frozenset(("assistant", "agent", "ai"))
+MESSAGE_FIELDS = ("messages", "conversation", "transcript", "dialogue")
+TEXT_KEYS = ("text", "message", "content")
+TIMESTAMPED_TEXT = re.compile(r"(\d+:\d+)\s*(.*?)(?=\d+:\d+|$)", re.DOTALL)
+SUBAGENT_LABEL = re.compile(r"^.*?subagent\s*", re.DOTALL)
+AGENT_LABEL = re.compile(r"^.*?ممثل.*?\d+:\d+\s*", re.DOTALL)
+
+
+class ConversationPayload(NamedTuple):
+    """Everything extracted from one ElevenLabs conversation payload"""
+    data_collection: Dict[str, Any]
+    intent: str
+    phone: str
+    summary: str
+    customer_name: str
+    client_ref_id: Optional[str]
+    recording_url: Optional[str]
+    transcript: List[Dict[str, Any]]
+    metadata: Dict[str, Any]
+
+
+def _is_url(value: Any) -> bool:
+    return isinstance(value, str) and value.startswith("http")
+
+
+def _probe(section: Any, fields: tuple) -> Optional[str]:
+    if not isinstance(section, dict):
+        return None
+    for field_name in fields:
+        value = section.get(field_name)
+        if value and _is_url(value):
+            return value
+    return None
+
+
+def _conversation_id(data: Dict[str, Any]) -> Optional[str]:
+    nested = data.get("data")
+    if isinstance(nested, dict) and nested.get("conversation_id"):
+        return nested["conversation_id"]
+    conversation_id = data.get("conversation_id") or data.get("conversationId") or data.get("id")
+    return conversation_id if isinstance(conversation_id, str) else None
+
+
+def _walk_for_recording_url(data: Any, conversation_id: Optional[str], found: Dict[int, str]) -> Optional[str]:
+    """
+    One pre-order walk that ranks every URL it meets and stops as soon as the
+    best rank still possible is found.
+    """
+    best_possible = RANK_CONVERSATION_ID if conversation_id else RANK_URL_KEYWORD
+
+    def offer(rank: int, url: str) -> bool:
+        if rank not in found:
+            found[rank] = url
+        return rank == best_possible
+
+    def visit_url(url: str, parent_key: Optional[str]) -> bool:
+        if conversation_id and conversation_id in url and offer(RANK_CONVERSATION_ID, url):
+            return True
+        lowered = url.lower()
+        if URL_KEYWORDS.search(lowered) and offer(RANK_URL_KEYWORD, url):
+            return True
+        if parent_key is not None and KEY_KEYWORDS.search(parent_key.lower()):
+            offer(RANK_KEY_KEYWORD, url)
+        if AUDIO_EXTENSIONS.search(lowered):
+            offer(RANK_AUDIO_EXTENSION, url)
+        return False
+
+    def visit(obj: Any) -> bool:
+        # Only containers are visited; strings are checked inline by their parent
+        if type(obj) is dict:
+            name = obj.get("name")
+            if "url" in obj and isinstance(name, str) and _is_url(obj["url"]) and AUDIO_EXTENSIONS.search(name.lower()):
+                offer(RANK_FILE_OBJECT, obj["url"])
+            for key, value in obj.items():
+                value_type = type(value)
+                if value_type is str:
+                    if value.startswith("http") and visit_url(value, key if type(key) is str else None):
+                        return True
+                elif (value_type is dict or value_type is list) and visit(value):
+                    return True
+        else:
+            for item in obj:
+                item_type = type(item)
+                if item_type is str:
+                    if item.startswith("http") and visit_url(item, None):
+                        return True
+                elif (item_type is dict or item_type is list) and visit(item):
+                    return True
+        return False
+
+    visit(data)
+    return found[min(found)] if found else None
+
+
+def find_recording_url(data: Dict[str, Any]) -> Optional[str]:
+    """Recording URL of a conversation payload, or None if it has none"""
+    if not isinstance(data, dict):
+        return None
+
+    recording_url = data.get("recording_url")
+    if recording_url:
+        return recording_url
+
+    url = (
+        _probe(data, URL_FIELDS)
+        or _probe(data.get("metadata"), URL_FIELDS)
+        or _probe(data.get("analysis"), SECTION_URL_FIELDS)
+        or _probe(data.get("conversation"), SECTION_URL_FIELDS)
+        or _probe(data, ELEVENLABS_URL_FIELDS)
+    )
+    if url:
+        return url
+
+    # Per-turn audio
+    conversation = data.get("conversation")
+    if isinstance(conversation, dict) and isinstance(conversation.get("turns"), list):
+        for turn in conversation["turns"]:
+            url = _probe(turn, TURN_URL_FIELDS)
+            if url:
+                return url
+
+    conversation_id = _conversation_id(data)
+    if conversation_id:
+        for value in data.values():
+            if _is_url(value) and conversation_id in value:
+                return value
+
+    found: Dict[int, str] = {}
+    for value in data.values():
+        if _is_url(value) and AUDIO_EXTENSIONS.search(value.lower()):
+            found[RANK_TOP_LEVEL_AUDIO] = value
+            break
+    if found and not conversation_id:
+        return found[RANK_TOP_LEVEL_AUDIO]
+
+    url = _walk_for_recording_url(data, conversation_id, found)
+    if url:
+        return url
+
+    logger.info(f"🔍 No recording URL found in ElevenLabs response for conversation {conversation_id}")
+    return None
+
+
+def _normalize_role(role: Any, assistant_roles: frozenset) -> Any:
+    lowered = str(role).lower()
+    if lowered in USER_ROLES:
+        return "user"
+    if lowered in assistant_roles:
+        return "assistant"
+    return role
+
+
+def _text_of(entry: Dict[str, Any]) -> Any:
+    return entry.get("text", entry.get("content", entry.get("message", "")))
+
+
+def _timestamp_key(entry: Dict[str, Any]) -> float:
+    try:
+        return float(entry.get("timestamp") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def iter_transcript_entries(data: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """
+    Transcript entries in payload order, each with role, text and timestamp.
+    Lazy, so callers that only need to know whether a transcript exists can
+    stop at the first entry.
+    """
+    conversation_data = data.get("conversation") or data
+    if not isinstance(conversation_data, (dict, list)):
+        conversation_data = data
+
+    messages: Any = None
+    if isinstance(conversation_data, list):
+        messages = conversation_data
+    else:
+        # The first list wins, even an empty one
+        for field_name in MESSAGE_FIELDS:
+            if isinstance(conversation_data.get(field_name), list):
+                messages = conversation_data[field_name]
+                break
+
+    yielded = False
+
+    if not messages and isinstance(conversation_data, dict):
+        turns = conversation_data.get("turns") or conversation_data.get("conversation_turns")
+        if isinstance(turns, list):
+            for turn in turns:
+                if not isinstance(turn, dict):
+                    continue
+                speaker = str(turn.get("speaker") or "").lower()
+                yielded = True
+                yield {
+                    "role": "user" if speaker in ("user", "customer", "caller") else "assistant",
+                    "text": turn.get("text", turn.get("message", turn.get("content", ""))),
+                    "timestamp": turn.get("timestamp", turn.get("time", turn.get("time_in_call_secs", 0)))
+                }
+            if yielded:
+                return
+
+        # Timestamped free text such as "0:00 ... 0:27 ..."
+        full_text = conversation_data.get("full_text", "") or conversation_data.get("summary", "")
+        if isinstance(full_text, str) and full_text:
+            for timestamp, content in TIMESTAMPED_TEXT.findall(full_text):
+                lowered = content.lower()
+                speaker = "assistant" if "agent" in lowered or "ممثل" in lowered else "user"
+                content_text = SUBAGENT_LABEL.sub("", content).strip()
+                content_text = AGENT_LABEL.sub("", content_text).strip()
+                if content_text:
+                    minutes, _, seconds = timestamp.partition(":")
+                    yielded = True
+                    yield {"role": speaker, "text": content_text, "timestamp": int(minutes) * 60 + int(seconds)}
+
+    if messages:
+        for msg in messages:
+            if not isinstance(msg, dict):
+                logger.warning(f"🔍 Unexpected message format: {type(msg)}")
+                continue
+            yielded = True
+            yield {
+                "role": _normalize_role(msg.get("role", msg.get("speaker", "unknown")), ASSISTANT_ROLES),
+                "text": _text_of(msg),
+                "timestamp": msg.get("time_in_call_secs", msg.get("timestamp", msg.get("time", 0)))
+            }
+
+    if yielded:
+        return
+
+    # Last resort: any top-level list whose items all look like messages
+    for key, value in data.items():
+        if not isinstance(value, list) or not value or key.lower() == "messages":
+            continue
+        if all(isinstance(item, dict) and any(k in item for k in TEXT_KEYS) for item in value):
+            for msg in value:
+                yield {
+                    "role": _normalize_role(msg.get("role", msg.get("speaker", "unknown")), FALLBACK_ASSISTANT_ROLES),
+                    "text": _text_of(msg),
+                    "timestamp": msg.get("time_in_call_secs", msg.get("timestamp", 0))
+                }
+            return
+
+
+def extract_transcript(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Transcript entries sorted by timestamp"""
+    return sorted(iter_transcript_entries(data), key=_timestamp_key)
+
+
+def has_transcript(data: Dict[str, Any]) -> bool:
+    """Whether the payload contains at least one transcript entry"""
+    return next(iter_transcript_entries(data), None) is not None
+
+
+def _collected_value(data_collection: Dict[str, Any], key: str) -> str:
+    value = data_collection.get(key)
+    if isinstance(value, dict):
+        return str(value.get("value", "")).strip()
+    return str(value if value else "").strip()
+
+
+def extract_collected_fields(data: Dict[str, Any]) -> tuple:
+    """
+    Data collection results and the fields derived from them.
+    Returns: (data_collection, intent, phone, summary, customer_name, client_ref_id)
+    """
+    analysis = data.get("analysis") or {}
+    metadata = data.get("metadata") or {}
+    data_collection = analysis.get("data_collection_results") or {}
+
+    # extracted_intent may be a string, a data collection dict or another type
+    intent_raw = data_collection.get("extracted_intent")
+    if isinstance(intent_raw, dict):
+        intent = intent_raw.get("value") or str(intent_raw)
+    elif intent_raw is not None:
+        intent = str(intent_raw)
+    else:
+        intent = "unknown"
+
+    phone = _collected_value(data_collection, "phone")
+    name = _collected_value(data_collection, "customer_name")
+    summary = analysis.get("transcript_summary") or analysis.get("call_summary_title", "Voice Interaction")
+
+    # ElevenLabs passes our session id as the conversation's user_id
+    client_ref_id = str(metadata.get("user_id", "")).strip()
+    if not client_ref_id:
+        logger.debug(f"🔍 Metadata Dump: {json.dumps(metadata)}")
+
+    # Heuristic: If ID looks like a phone number, it's not a session ID
+    if client_ref_id and len(client_ref_id) < 15 and client_ref_id.isdigit():
+        if not phone:
+            phone = client_ref_id
+        client_ref_id = None
+
+    return data_collection, intent, phone, summary, name, client_ref_id
+
+
+def extract_payload(data: Dict[str, Any]) -> ConversationPayload:
+    """Extract transcript, recording URL, data collection fields and metadata together"""
+    data_collection, intent, phone, summary, name, client_ref_id = extract_collected_fields(data)
+
+    return ConversationPayload(
+        data_collection=data_collection,
+        intent=intent,
+        phone=phone,
+        summary=summary,
+        customer_name=name,
+        client_ref_id=client_ref_id,
+        recording_url=find_recording_url(data),
+        transcript=extract_transcript(data),
+        metadata=data.get("metadata") or {},
+    )
@@ -1,17 +1,20 @@
 import logging
 import secrets
-from datetime import datetime, timezone
+from datetime import datetime
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app import models
+from app.services.kpi_rollup_service import mark_kpis_dirty
+from app.services.live_events import publish_session_event
 
 logger = logging.getLogger(__name__)
 
 def generate_id(prefix: str = "vs") -> str:
     return f"{prefix}_{secrets.token_hex(8)}"
 
-def create_voice_session(
-    db_session: Session,
+async def create_voice_session(
+    db_session: AsyncSession,
     agent_type: str,
     customer_id: Optional[str],
     tenant_id: str,
@@ -34,17 +37,19 @@ def create_voice_session(
         # ✅ FIX: Explicitly set locale
         locale="ar-SA", 
         
-        created_at=datetime.now(timezone.utc)
+        created_at=datetime.utcnow()
     )
     
     db_session.add(voice_session)
-    db_session.commit()
-    db_session.refresh(voice_session)
+    await db_session.commit()
+    await db_session.refresh(voice_session)
+    mark_kpis_dirty(tenant_id, voice_session.created_at)
+    publish_session_event(voice_session)
     
     logger.info(f"📞 Session Started: {session_id} (Agent: {agent_type})")
     return voice_session
 
-def get_voice_session(db_session: Session, session_id: str) -> Optional[models.VoiceSession]:
-    return db_session.query(models.VoiceSession).filter(
-        models.VoiceSession.id == session_id
-    ).first()
\ No newline at end of file
+async def get_voice_session(db_session: AsyncSession, session_id: str) -> Optional[models.VoiceSession]:
+    return await db_session.scalar(
+        select(models.VoiceSession).where(models.VoiceSession.id == session_id)
+    )
\ No newline at end of file
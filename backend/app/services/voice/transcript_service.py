@@ -0,0 +1,157 @@
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import exists, insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from .elevenlabs_service import (
+    fetch_conversation_from_elevenlabs,
+    extract_transcript_from_conversation
+)
+
+logger = logging.getLogger(__name__)
+
+
+def extract_transcript_details(data: Dict[str, Any]) -> Tuple[Optional[str], Any]:
+    """
+    Summary and extracted intent shown next to a transcript.
+    Returns: (summary, extracted_intent)
+    """
+    analysis = data.get("analysis") or {}
+    summary = analysis.get("transcript_summary") or analysis.get("call_summary_title")
+
+    # extracted_intent may be a string or a data collection dict
+    raw_intent = (analysis.get("data_collection_results") or {}).get("extracted_intent")
+    if isinstance(raw_intent, dict):
+        extracted_intent = raw_intent.get("value") or raw_intent
+    else:
+        extracted_intent = raw_intent
+
+    return summary, extracted_intent
+
+
+def _format_timestamp(value: float) -> Any:
+    return int(value) if float(value).is_integer() else value
+
+
+async def save_transcript(
+    db: AsyncSession,
+    conversation_id: str,
+    tenant_id: str,
+    transcript: List[Dict[str, Any]],
+    summary: Optional[str] = None,
+    extracted_intent: Any = None
+) -> Optional[models.Transcript]:
+    """
+    Store a parsed transcript and its turns. Transcripts are immutable, so an
+    existing row is kept as is. Empty transcripts are not stored so that a
+    later read can still backfill them from ElevenLabs.
+    """
+    if not transcript:
+        return None
+
+    existing = await db.get(models.Transcript, conversation_id)
+    if existing:
+        return existing
+
+    record = models.Transcript(
+        conversation_id=conversation_id,
+        tenant_id=tenant_id,
+        summary=summary,
+        extracted_intent=extracted_intent,
+        turn_count=len(transcript)
+    )
+    try:
+        db.add(record)
+        await db.flush()
+        await db.execute(insert(models.TranscriptTurn), [
+            {
+                "conversation_id": conversation_id,
+                "position": position,
+                "role": str(entry.get("role") or "unknown"),
+                "text": str(entry.get("text") or ""),
+                "timestamp": float(entry.get("timestamp") or 0),
+            }
+            for position, entry in enumerate(transcript)
+        ])
+        await db.commit()
+    except IntegrityError:
+        # Stored concurrently by the webhook or another reader
+        await db.rollback()
+        return await db.get(models.Transcript, conversation_id)
+
+    logger.info(f"📝 Stored transcript for {conversation_id}: {len(transcript)} turns")
+    return record
+
+
+async def get_stored_transcript(db: AsyncSession, conversation_id: str, tenant_id: str) -> Optional[Dict[str, Any]]:
+    """Read a stored transcript with all its turns in one indexed query"""
+    rows = (await db.execute(select(
+        models.Transcript.summary,
+        models.Transcript.extracted_intent,
+        models.TranscriptTurn.role,
+        models.TranscriptTurn.text,
+        models.TranscriptTurn.timestamp
+    ).join(
+        models.TranscriptTurn,
+        models.TranscriptTurn.conversation_id == models.Transcript.conversation_id
+    ).where(
+        models.Transcript.conversation_id == conversation_id,
+        models.Transcript.tenant_id == tenant_id
+    ).order_by(models.TranscriptTurn.position))).all()
+
+    if not rows:
+        return None
+
+    return {
+        "conversation_id": conversation_id,
+        "transcript": [
+            {"role": row.role, "text": row.text, "timestamp": _format_timestamp(row.timestamp)}
+            for row in rows
+        ],
+        "summary": rows[0].summary,
+        "extracted_intent": rows[0].extracted_intent,
+        "is_available": True,
+    }
+
+
+async def conversation_belongs_to_tenant(db: AsyncSession, conversation_id: str, tenant_id: str) -> bool:
+    """Whether the tenant has a conversation, call or voice session with this ElevenLabs conversation id"""
+    return bool(await db.scalar(select(or_(
+        exists().where(models.Call.conversation_id == conversation_id, models.Call.tenant_id == tenant_id),
+        exists().where(models.VoiceSession.conversation_id == conversation_id, models.VoiceSession.tenant_id == tenant_id),
+        exists().where(models.Conversation.id == conversation_id, models.Conversation.tenant_id == tenant_id),
+    ))))
+
+
+async def load_transcript(db: AsyncSession, conversation_id: str, tenant_id: str) -> Dict[str, Any]:
+    """
+    Return a transcript from the store, backfilling it from ElevenLabs on a miss
+    (conversations processed before transcripts were stored, or whose transcript
+    was not ready at webhook time).
+    """
+    stored = await get_stored_transcript(db, conversation_id, tenant_id)
+    if stored:
+        return stored
+
+    # Only a conversation of the caller's tenant may be fetched and stored under it
+    if not await conversation_belongs_to_tenant(db, conversation_id, tenant_id):
+        raise HTTPException(status_code=404, detail="Transcript not available for this conversation")
+
+    logger.info(f"🔄 Transcript for {conversation_id} not stored yet, fetching from ElevenLabs")
+    data = await fetch_conversation_from_elevenlabs(conversation_id)
+    transcript = extract_transcript_from_conversation(data)
+    summary, extracted_intent = extract_transcript_details(data)
+
+    await save_transcript(db, conversation_id, tenant_id, transcript, summary, extracted_intent)
+
+    return {
+        "conversation_id": conversation_id,
+        "transcript": transcript,
+        "summary": summary,
+        "extracted_intent": extracted_intent,
+        "is_available": len(transcript) > 0,
+    }
@@ -1,21 +1,23 @@
 import logging
 import os
-from datetime import datetime, timezone
-from sqlalchemy.orm import Session
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any, Optional, Tuple
 from types import SimpleNamespace
 
 from app import models
+from app.phone_utils import to_e164
+from app.search_utils import customer_search_text
 from .elevenlabs_service import (
     fetch_conversation_from_elevenlabs,
     fetch_conversation_recording,
-    extract_conversation_data,
-    extract_conversation_id_from_payload,
-    extract_recording_url_from_conversation,
-    extract_transcript_from_conversation
+    extract_conversation_id_from_payload
 )
+from .payload_extractor import extract_payload
 from .customer_service import upsert_customer
-from .action_service import create_full_interaction_record
+from .action_service import as_utc_naive, create_full_interaction_record
+from app.services.call_feed_service import customer_name_update, recording_url_update
 
 logger = logging.getLogger(__name__)
 DEFAULT_TENANT_ID = os.getenv("TENANT_ID", "demo-tenant")
@@ -35,11 +37,15 @@ class WebhookValidationHandler:
         return conv_id
     
     @staticmethod
-    def check_duplicate(db: Session, conv_id: str) -> bool:
-        """Check if conversation has already been processed to prevent duplicates."""
-        existing_call = db.query(models.Call).filter(
+    async def check_duplicate(db: AsyncSession, conv_id: str) -> bool:
+        """
+        Check if conversation has already been processed to prevent duplicates.
+        A probe of uq_calls_conversation_id that spares the ElevenLabs fetch; racing
+        webhooks that both pass it are settled by the history record inserts.
+        """
+        existing_call = await db.scalar(select(models.Call.id).where(
             models.Call.conversation_id == conv_id
-        ).first()
+        ).limit(1))
         
         if existing_call:
             logger.info(f"ℹ️ Conversation {conv_id} already processed, skipping duplicate webhook.")
@@ -67,20 +73,21 @@ class WebhookDataFetchHandler:
         if data is None:
             return None
 
-        data_dict, intent, phone, summary, name, client_ref_id = extract_conversation_data(data)
-
-        # Extract recording URL from ElevenLabs response
-        recording_url = extract_recording_url_from_conversation(data)
+        # One pass over the payload for fields, recording URL and transcript.
+        # The transcript is stored after the call records are created.
+        payload = extract_payload(data)
+        data_dict = payload.data_collection
+        intent, phone, summary, name = payload.intent, payload.phone, payload.summary, payload.customer_name
+        client_ref_id = payload.client_ref_id
+        recording_url = payload.recording_url
+        transcript_data = payload.transcript
+        transcript_count = len(transcript_data)
 
         # If no recording URL found in the initial data, try the fallback method
         if not recording_url:
             logger.info(f"🔍 No recording URL in webhook response, trying fallback method for {conv_id}")
             recording_url = await fetch_conversation_recording(conv_id)
 
-        # Extract transcript data for debugging
-        transcript_data = extract_transcript_from_conversation(data)
-        transcript_count = len(transcript_data) if transcript_data else 0
-
         # Add more detailed logging to understand the ElevenLabs response structure
         logger.info(f"🔍 Extracted: Intent='{intent}', Phone='{phone}', RefID='{client_ref_id}', Recording URL: {recording_url is not None}, Transcript Entries: {transcript_count}")
         logger.info(f"🔍 ElevenLabs API response keys: {list(data.keys())}")
@@ -118,17 +125,17 @@ class WebhookSessionHandler:
     """Handles session discovery and linking."""
     
     @staticmethod
-    def discover_session(db: Session, client_ref_id: Optional[str], conv_id: str) -> Optional[models.VoiceSession]:
+    async def discover_session(db: AsyncSession, client_ref_id: Optional[str], conv_id: str) -> Optional[models.VoiceSession]:
         """Discover and return the associated session."""
         session = None
         
         if client_ref_id:
-            session = db.query(models.VoiceSession).filter(models.VoiceSession.id == client_ref_id).first()
+            session = await db.get(models.VoiceSession, client_ref_id)
             if session:
                 logger.info(f"✅ Linked via Client Ref ID: {session.id}")
 
         if not session:
-            session = db.query(models.VoiceSession).filter(models.VoiceSession.conversation_id == conv_id).first()
+            session = await db.scalar(select(models.VoiceSession).where(models.VoiceSession.conversation_id == conv_id))
             if session:
                 logger.info(f"✅ Linked via Conversation ID: {session.id}")
         
@@ -139,8 +146,8 @@ class WebhookCustomerHandler:
     """Handles customer context and recovery."""
 
     @staticmethod
-    def get_or_create_customer(
-        db: Session,
+    async def get_or_create_customer(
+        db: AsyncSession,
         session: Optional[models.VoiceSession],
         phone: str,
         name: str,
@@ -163,12 +170,12 @@ class WebhookCustomerHandler:
             session.summary = summary
             session.extracted_intent = intent
             session.status = models.VoiceSessionStatus.COMPLETED
-            session.ended_at = datetime.now(timezone.utc)
+            session.ended_at = datetime.utcnow()
             if phone:
                 session.customer_phone = phone
 
             # Link Customer to Session if not already linked
-            customer = upsert_customer(db, phone, name, current_tenant_id)
+            customer = await upsert_customer(db, phone, name, current_tenant_id)
             if not session.customer_id:
                 session.customer_id = customer.id
         else:
@@ -177,10 +184,11 @@ class WebhookCustomerHandler:
 
             # Try to find existing customer by phone to recover Tenant ID
             existing_customer = None
-            if phone:
-                existing_customer = db.query(models.Customer).filter(
-                    models.Customer.phone == phone
-                ).order_by(models.Customer.created_at.desc()).first()
+            phone_e164 = to_e164(phone)
+            if phone_e164:
+                existing_customer = await db.scalar(select(models.Customer).where(
+                    models.Customer.phone_e164 == phone_e164
+                ).order_by(models.Customer.created_at.desc()).limit(1))
 
             if existing_customer:
                 current_tenant_id = existing_customer.tenant_id
@@ -189,16 +197,18 @@ class WebhookCustomerHandler:
                 # Update name if new one is better
                 if name and name != "Unknown" and name != customer.name:
                     customer.name = name
+                    customer.search_text = customer_search_text(name, customer.email)
                     db.add(customer)
+                    await db.execute(customer_name_update(customer.id, name))
             else:
                 # Create new customer in the Default Tenant (from .env)
                 logger.info(f"⚠️ No context found. Creating new customer in {current_tenant_id}")
-                customer = upsert_customer(db, phone, name, current_tenant_id)
+                customer = await upsert_customer(db, phone, name, current_tenant_id)
 
             # Create virtual session object for the logic
             # Use conversation timestamps from ElevenLabs data if available, otherwise use current time
-            conversation_start_time = data.get('created_at') or datetime.now(timezone.utc)
-            conversation_end_time = data.get('ended_at') or datetime.now(timezone.utc)
+            conversation_start_time = as_utc_naive(data.get('created_at')) or datetime.utcnow()
+            conversation_end_time = as_utc_naive(data.get('ended_at')) or datetime.utcnow()
 
             session = SimpleNamespace(
                 id=client_ref_id if client_ref_id else f"ghost_{conv_id[:8]}",
@@ -218,32 +228,23 @@ class WebhookRecordingHandler:
     """Handles recording URL updates to conversation and call records."""
     
     @staticmethod
-    def update_recording_urls(db: Session, session: Any, recording_url: Optional[str], transcript_count: int) -> None:
-        """Update recording URLs for conversation and call records."""
+    async def update_recording_urls(db: AsyncSession, session: Any, recording_url: Optional[str], transcript_count: int) -> None:
+        """Update recording URLs for conversation, call and calls feed records."""
         if not recording_url or not hasattr(session, 'conversation_id'):
             # Debug logging for transcript data storage (transcript is stored via create_full_interaction_record)
             logger.info(f"📝 Transcript entries processed: {transcript_count} entries for conversation {session.conversation_id if hasattr(session, 'conversation_id') else 'unknown'}")
             return
 
-        # Update Conversation record with recording URL
-        conversation_record = db.query(models.Conversation).filter(
-            models.Conversation.id == session.conversation_id
-        ).first()
-        if conversation_record:
-            old_recording_url = conversation_record.recording_url
-            conversation_record.recording_url = recording_url
-            db.add(conversation_record)
-            logger.info(f"💾 Conversation recording URL updated: {old_recording_url is None} -> {recording_url is not None} for conversation {session.conversation_id}")
-
-        # Also update the Call record with the same recording URL
-        call_record = db.query(models.Call).filter(
-            models.Call.conversation_id == session.conversation_id
-        ).first()
-        if call_record:
-            old_call_recording_url = call_record.recording_url
-            call_record.recording_url = recording_url
-            db.add(call_record)
-            logger.info(f"💾 Call recording URL updated: {old_call_recording_url is None} -> {recording_url is not None} for call {call_record.id}")
+        # Plain UPDATEs by key: no need to load the records first
+        conversation_id = session.conversation_id
+        await db.execute(update(models.Conversation).where(
+            models.Conversation.id == conversation_id
+        ).values(recording_url=recording_url))
+        await db.execute(update(models.Call).where(
+            models.Call.conversation_id == conversation_id
+        ).values(recording_url=recording_url))
+        await db.execute(recording_url_update(conversation_id, recording_url))
+        logger.info(f"💾 Recording URL stored for conversation {conversation_id}")
 
         # Debug logging for transcript data storage (transcript is stored via create_full_interaction_record)
         logger.info(f"📝 Transcript entries processed: {transcript_count} entries for conversation {session.conversation_id if hasattr(session, 'conversation_id') else 'unknown'}")
@@ -253,42 +254,25 @@ class WebhookActionHandler:
     """Handles execution of business actions."""
     
     @staticmethod
-    def execute_business_logic(
-        db: Session, 
+    async def execute_business_logic(
+        db: AsyncSession,
         session: Any, 
         customer: models.Customer, 
         data_dict: Dict[str, Any],
         conv_id: str
     ) -> bool:
-        """Execute business logic and update duration."""
+        """Execute business logic (history records with the call duration, booking or ticket)."""
         try:
-            create_full_interaction_record(db, session, customer, data_dict)
-
-            # Update call duration if conversation data contains timing info
-            # Calculate duration from ended_at - created_at and store in handle_sec
-            if (hasattr(session, 'ended_at') and 
-                hasattr(session, 'created_at') and 
-                session.ended_at and 
-                session.created_at):
-                duration_seconds = (session.ended_at - session.created_at).total_seconds()
-                # Update corresponding call record with duration
-                if hasattr(session, 'conversation_id'):
-                    # Find the call associated with this conversation
-                    call_record = db.query(models.Call).filter(
-                        models.Call.conversation_id == session.conversation_id
-                    ).first()
-                    if call_record:
-                        call_record.handle_sec = int(duration_seconds)
-                        db.add(call_record)
+            await create_full_interaction_record(db, session, customer, data_dict)
 
             # Determine if we are committing a real SQLAlchemy object or just the side-effects
             if hasattr(session, "_sa_instance_state"):
                 db.add(session)
 
-            db.commit()
+            await db.commit()
             logger.info(f"🚀 SUCCESS: Webhook processed for {customer.name} (Tenant: {session.tenant_id})")
             return True
         except Exception as e:
-            db.rollback()
+            await db.rollback()
             logger.error(f"💥 Critical Failure in Action Service: {e}", exc_info=True)
             return False
\ No newline at end of file
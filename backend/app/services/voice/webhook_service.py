@@ -1,7 +1,7 @@
 import logging
 import os
-from datetime import datetime, timezone
-from sqlalchemy.orm import Session
+from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict, Any
 
 from app import models
@@ -13,17 +13,21 @@ from .webhook_handlers import (
     WebhookRecordingHandler,
     WebhookActionHandler
 )
+from .transcript_service import save_transcript, extract_transcript_details
+from app.services.kpi_rollup_service import mark_kpis_dirty
+from app.services.dashboard_cache import invalidate_dashboard
+from app.services.live_events import publish_session_event
 
 logger = logging.getLogger(__name__)
 
 # Load default tenant from environment, fallback to demo-tenant if missing
 DEFAULT_TENANT_ID = os.getenv("TENANT_ID", "demo-tenant")
 
-async def process_webhook_payload(db: Session, payload: Dict[str, Any]) -> Dict[str, str]:
+async def process_webhook_payload(db: AsyncSession, payload: Dict[str, Any]) -> Dict[str, str]:
     conv_id = WebhookValidationHandler.validate_payload(payload)
     if not conv_id:
         return {"status": "error", "message": "Missing conversation_id"}
-    if WebhookValidationHandler.check_duplicate(db, conv_id):
+    if await WebhookValidationHandler.check_duplicate(db, conv_id):
         return {
             "status": "success",
             "message": "Webhook already processed",
@@ -37,24 +41,39 @@ async def process_webhook_payload(db: Session, payload: Dict[str, Any]) -> Dict[
     data_dict, intent, phone, summary, name, client_ref_id, recording_url, transcript_data, original_data = data_result
     transcript_count = len(transcript_data) if transcript_data else 0
 
-    session = WebhookSessionHandler.discover_session(db, client_ref_id, conv_id)
-    customer, current_tenant_id, session = WebhookCustomerHandler.get_or_create_customer(
+    session = await WebhookSessionHandler.discover_session(db, client_ref_id, conv_id)
+    customer, current_tenant_id, session = await WebhookCustomerHandler.get_or_create_customer(
         db, session, phone, name, summary, intent, client_ref_id, conv_id, original_data
     )
 
     # CRITICAL FIX: Order of operations swapped
     # 1. First, create the DB records (Conversation, Call, etc.)
-    success = WebhookActionHandler.execute_business_logic(db, session, customer, data_dict, conv_id)
+    success = await WebhookActionHandler.execute_business_logic(db, session, customer, data_dict, conv_id)
 
     # 2. THEN update the recording URL on the now-existing records
     if success:
-        WebhookRecordingHandler.update_recording_urls(db, session, recording_url, transcript_count)
+        await WebhookRecordingHandler.update_recording_urls(db, session, recording_url, transcript_count)
         # 3. Explicit commit to ensure the URL update is saved
         try:
-            db.commit()
+            await db.commit()
         except Exception as e:
             logger.error(f"Failed to commit recording URL update: {e}")
 
+        # Refresh the KPI rollups of the session's day and of today (new bookings)
+        now = datetime.utcnow()
+        mark_kpis_dirty(current_tenant_id, getattr(session, "created_at", None) or now, now)
+        invalidate_dashboard(current_tenant_id)
+        if hasattr(session, "_sa_instance_state"):
+            publish_session_event(session)
+
+        # 4. Store the transcript parsed above so transcript views never call ElevenLabs
+        try:
+            transcript_summary, transcript_intent = extract_transcript_details(original_data)
+            await save_transcript(db, conv_id, current_tenant_id, transcript_data, transcript_summary, transcript_intent)
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Failed to store transcript for {conv_id}: {e}")
+
     if success:
         return {
             "status": "success",
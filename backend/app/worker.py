@@ -0,0 +1,60 @@
+"""
+Background Worker Entrypoint
+Runs campaign execution outside the API process so it can be scaled
+separately, and post-call webhook processing when POST_CALL_IN_WORKER=true.
+
+Usage: python -m app.worker
+"""
+
+import logging
+import os
+import signal
+import threading
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from app.services.campaign_queue import CampaignWorker
+from app.services.bulk_call_service import shutdown_progress_buffer
+from app.services.kpi_rollup_service import shutdown_kpi_rollup_refresher
+from app.services.post_call_inbox import run_post_call_workers_forever
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Process post-call webhooks here instead of in the API (set RUN_POST_CALL_WORKERS=false
+# there). Live events and dashboard cache invalidation are per process, so the API's
+# SSE subscribers do not see sessions completed by this worker.
+POST_CALL_IN_WORKER = os.getenv("POST_CALL_IN_WORKER", "false").lower() == "true"
+
+
+def main() -> None:
+    stop_event = threading.Event()
+
+    def handle_signal(signum, frame):
+        logger.info(f"🛑 Received signal {signum}, finishing current work...")
+        stop_event.set()
+
+    signal.signal(signal.SIGTERM, handle_signal)
+    signal.signal(signal.SIGINT, handle_signal)
+
+    post_call_thread = None
+    if POST_CALL_IN_WORKER:
+        post_call_thread = threading.Thread(
+            target=run_post_call_workers_forever, args=(stop_event,), name="post-call-workers"
+        )
+        post_call_thread.start()
+    try:
+        CampaignWorker().run_forever(stop_event)
+    finally:
+        stop_event.set()
+        if post_call_thread is not None:
+            post_call_thread.join()
+        # Progress may complete campaigns and mark KPI days, so it is written first
+        shutdown_progress_buffer()
+        shutdown_kpi_rollup_refresher()
+
+
+if __name__ == "__main__":
+    main()
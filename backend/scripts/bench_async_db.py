@@ -0,0 +1,204 @@
+"""
+Mixed-load benchmark of the sync and async database layers
+
+Runs the same workload inside one event loop twice: once with the sync
+SQLAlchemy Session called directly from coroutines (what async routes used to
+do) and once with AsyncSession. The workload mixes report-style aggregates,
+point lookups and small writes, while "callback" tasks that only need the event
+loop (like Twilio webhooks) measure how long they wait for it.
+
+Reports DB operations per second and the callback latency percentiles. With the
+sync layer every query stalls the loop, so callback latency grows with query
+time and concurrency; with the async layer it stays low. On SQLite, aiosqlite
+runs each query through a helper thread, so raw DB throughput is lower than
+with the blocking driver; the point is that the loop keeps serving requests.
+
+Runs against a throwaway SQLite file by default. Point BENCH_DB_URL at an empty
+PostgreSQL database to benchmark asyncpg (the tables are created and dropped).
+
+Usage:
+    python -m scripts.bench_async_db
+    python -m scripts.bench_async_db --workers 32 --duration 10 --rows 50000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+# Add the backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, func, insert, select, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.db import Base, _async_url
+
+TENANTS = 8
+CALLBACK_INTERVAL = 0.005
+
+
+def seed(engine, rows: int) -> None:
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(models.VoiceSession), [
+            {
+                "id": f"vs_{i}",
+                "tenant_id": f"tenant-{i % TENANTS}",
+                "status": rng.choice(list(models.VoiceSessionStatus)),
+                "customer_phone": f"+9665{i:08d}",
+                "created_at": now - timedelta(seconds=rng.randint(0, 30 * 86400)),
+            }
+            for i in range(rows)
+        ])
+
+
+def report_query(tenant_id: str):
+    vs = models.VoiceSession
+    return select(vs.status, func.count()).where(vs.tenant_id == tenant_id).group_by(vs.status)
+
+
+def lookup_query(session_id: str):
+    return select(models.VoiceSession).where(models.VoiceSession.id == session_id)
+
+
+def write_query(session_id: str):
+    return update(models.VoiceSession).where(models.VoiceSession.id == session_id).values(
+        extracted_intent=random.choice(["book_appointment", "raise_ticket", None])
+    )
+
+
+class Stats:
+    def __init__(self):
+        self.operations = 0
+        self.callback_waits: List[float] = []
+
+
+def pick_operation(rng: random.Random, rows: int):
+    """70% point lookups, 20% tenant reports, 10% writes"""
+    roll = rng.random()
+    if roll < 0.7:
+        return "read", lookup_query(f"vs_{rng.randrange(rows)}")
+    if roll < 0.9:
+        return "read", report_query(f"tenant-{rng.randrange(TENANTS)}")
+    return "write", write_query(f"vs_{rng.randrange(rows)}")
+
+
+async def sync_worker(session_factory, rows: int, deadline: float, stats: Stats, seed_value: int) -> None:
+    rng = random.Random(seed_value)
+    db = session_factory()
+    try:
+        while time.perf_counter() < deadline:
+            kind, stmt = pick_operation(rng, rows)
+            # Blocking calls on the event loop thread
+            if kind == "read":
+                db.execute(stmt).all()
+            else:
+                db.execute(stmt)
+                db.commit()
+            stats.operations += 1
+            await asyncio.sleep(0)
+    finally:
+        db.close()
+
+
+async def async_worker(session_factory, rows: int, deadline: float, stats: Stats, seed_value: int) -> None:
+    rng = random.Random(seed_value)
+    async with session_factory() as db:
+        while time.perf_counter() < deadline:
+            kind, stmt = pick_operation(rng, rows)
+            if kind == "read":
+                (await db.execute(stmt)).all()
+            else:
+                await db.execute(stmt)
+                await db.commit()
+            stats.operations += 1
+
+
+async def callback(deadline: float, stats: Stats) -> None:
+    """A request that needs no DB: its latency is the time spent waiting for the loop"""
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        await asyncio.sleep(CALLBACK_INTERVAL)
+        stats.callback_waits.append(time.perf_counter() - started - CALLBACK_INTERVAL)
+
+
+async def run(mode: str, db_url: str, rows: int, workers: int, callbacks: int, duration: float) -> Dict[str, float]:
+    stats = Stats()
+    deadline = time.perf_counter() + duration
+
+    if mode == "sync":
+        engine = create_engine(db_url, pool_size=workers, max_overflow=0)
+        factory = sessionmaker(bind=engine)
+        tasks = [sync_worker(factory, rows, deadline, stats, i) for i in range(workers)]
+    else:
+        # aiosqlite opens a connection per session (NullPool) and takes no pool sizing
+        pool_args = {} if db_url.startswith("sqlite") else {"pool_size": workers, "max_overflow": 0}
+        engine = create_async_engine(_async_url(db_url), **pool_args)
+        factory = async_sessionmaker(bind=engine, expire_on_commit=False)
+        tasks = [async_worker(factory, rows, deadline, stats, i) for i in range(workers)]
+    tasks += [callback(deadline, stats) for _ in range(callbacks)]
+
+    started = time.perf_counter()
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - started
+
+    if mode == "sync":
+        engine.dispose()
+    else:
+        await engine.dispose()
+
+    waits = sorted(stats.callback_waits) or [0.0]
+    return {
+        "ops_per_sec": stats.operations / elapsed,
+        "callbacks_per_sec": len(stats.callback_waits) / elapsed,
+        "callback_p50_ms": statistics.median(waits) * 1000,
+        "callback_p99_ms": waits[min(len(waits) - 1, int(len(waits) * 0.99))] * 1000,
+        "callback_max_ms": waits[-1] * 1000,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--workers", type=int, default=16, help="concurrent DB-bound requests")
+    parser.add_argument("--callbacks", type=int, default=16, help="concurrent loop-only requests")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per mode")
+    args = parser.parse_args(argv)
+
+    db_url = os.getenv("BENCH_DB_URL")
+    tmp_dir = None
+    if not db_url:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_url = f"sqlite:///{os.path.join(tmp_dir.name, 'bench.db')}"
+
+    engine = create_engine(db_url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    try:
+        seed(engine, args.rows)
+        print(f"🔎 {engine.dialect.name}: {args.rows} sessions, {args.workers} DB workers, "
+              f"{args.callbacks} callbacks, {args.duration:.0f}s per mode\n")
+        print(f"{'mode':<6} {'db ops/s':>10} {'callbacks/s':>12} {'cb p50 ms':>10} {'cb p99 ms':>10} {'cb max ms':>10}")
+        for mode in ("sync", "async"):
+            result = asyncio.run(run(mode, db_url, args.rows, args.workers, args.callbacks, args.duration))
+            print(f"{mode:<6} {result['ops_per_sec']:>10.0f} {result['callbacks_per_sec']:>12.0f} "
+                  f"{result['callback_p50_ms']:>10.2f} {result['callback_p99_ms']:>10.2f} {result['callback_max_ms']:>10.2f}")
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
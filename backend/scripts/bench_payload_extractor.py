@@ -0,0 +1,107 @@
+"""
+Microbenchmark for the ElevenLabs payload extractor
+
+Times extract_payload (fields, recording URL and transcript in one pass) and
+the transcript availability check on large conversation payloads. Real payloads
+saved from the ElevenLabs API can be passed as JSON files; without arguments a
+synthetic payload shaped like a long ElevenLabs conversation is used.
+
+Usage:
+    python -m scripts.bench_payload_extractor
+    python -m scripts.bench_payload_extractor payload1.json payload2.json --runs 200
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+# Add the backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.voice.payload_extractor import extract_payload, has_transcript
+
+
+def synthetic_payload(turns: int = 400) -> dict:
+    """A long call without a recording URL, the worst case for the URL search"""
+    conversation_id = "conv_01jxbenchmark000000000000"
+    transcript = []
+    for i in range(turns):
+        role = "agent" if i % 2 == 0 else "user"
+        transcript.append({
+            "role": role,
+            "message": f"رسالة رقم {i} في المحادثة مع بعض النص الإضافي للتجربة",
+            "time_in_call_secs": i * 3,
+            "tool_calls": [{"tool_name": "lookup", "params_as_json": json.dumps({"q": i})}] if i % 10 == 0 else [],
+            "tool_results": [],
+            "feedback": None,
+            "llm_override": None,
+            "conversation_turn_metrics": {"metrics": {"convai_llm_service_ttfb": {"elapsed_time": 0.3}}},
+            "rag_retrieval_info": {"chunks": [{"document_id": f"doc_{i}", "chunk_id": f"c_{i}", "vector_distance": 0.1}]},
+        })
+    return {
+        "agent_id": "agent_benchmark",
+        "conversation_id": conversation_id,
+        "status": "done",
+        "transcript": transcript,
+        "metadata": {
+            "start_time_unix_secs": 1700000000,
+            "call_duration_secs": turns * 3,
+            "cost": 1200,
+            "user_id": "vs_0123456789abcdef",
+            "phone_call": {"direction": "outbound", "external_number": "+966500000000"},
+            "charging": {"dev_discount": False, "tier": "pro"},
+        },
+        "analysis": {
+            "call_successful": "success",
+            "transcript_summary": "ملخص المحادثة",
+            "data_collection_results": {
+                "extracted_intent": {"value": "book_appointment", "rationale": "..."},
+                "phone": {"value": "+966500000000"},
+                "customer_name": {"value": "عميل"},
+            },
+            "evaluation_criteria_results": {},
+        },
+        "conversation_initiation_client_data": {"dynamic_variables": {"customer_name": "عميل"}},
+    }
+
+
+def bench(fn, payload, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(payload)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(label: str, timings: list) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"  {label:<22} mean {statistics.mean(timings):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("payloads", nargs="*", help="ElevenLabs conversation JSON files")
+    parser.add_argument("--runs", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=400, help="turns of the synthetic payload")
+    args = parser.parse_args()
+
+    payloads = []
+    for path in args.payloads:
+        with open(path, "r", encoding="utf-8") as f:
+            payloads.append((os.path.basename(path), json.load(f)))
+    if not payloads:
+        payloads.append((f"synthetic ({args.turns} turns)", synthetic_payload(args.turns)))
+
+    for name, payload in payloads:
+        size_kb = len(json.dumps(payload, ensure_ascii=False).encode("utf-8")) / 1024
+        print(f"{name}: {size_kb:.0f} KB")
+        report("extract_payload", bench(extract_payload, payload, args.runs))
+        report("has_transcript", bench(has_transcript, payload, args.runs))
+
+
+if __name__ == "__main__":
+    main()
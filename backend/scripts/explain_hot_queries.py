@@ -0,0 +1,468 @@
+"""
+EXPLAIN regression check for the hot queries
+
+Seeds a database with several tenants' worth of calls, sessions, bookings,
+tickets, campaigns and rollups, refreshes the planner statistics, and asserts
+that every hot query (calls feed, live ops, dashboard, webhook dedupe,
+campaign results, dialer) reads its tables through the expected index instead
+of a full table scan. Exits with status 1 when any plan regresses.
+
+Runs against a throwaway SQLite file by default (EXPLAIN QUERY PLAN). Point
+EXPLAIN_DB_URL at an empty PostgreSQL database to check the production planner
+(EXPLAIN (FORMAT JSON)); the tables are created and dropped by the script.
+
+Usage:
+    python -m scripts.explain_hot_queries
+    python -m scripts.explain_hot_queries --rows 50000 --verbose
+    EXPLAIN_DB_URL=postgresql://localhost/explain_check python -m scripts.explain_hot_queries
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+# Add the backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, func, insert, select, text, tuple_
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app import models
+from app.db import Base
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN of a statement, with its bind parameters processed as usual"""
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(Explain)
+def _compile_explain(element, compiler, **kw):
+    if compiler.dialect.name == "postgresql":
+        prefix = "EXPLAIN (FORMAT JSON) "
+    else:
+        prefix = "EXPLAIN QUERY PLAN "
+    return prefix + compiler.process(element.statement, **kw)
+
+
+def primary_key(table: str) -> Tuple[str, ...]:
+    """Primary key index name on PostgreSQL and SQLite"""
+    return (f"{table}_pkey", f"sqlite_autoindex_{table}_1")
+
+
+# ============================================================================
+# SEED DATA
+# ============================================================================
+
+def seed(conn: Connection, rows: int, tenants: int) -> Dict[str, Any]:
+    """Insert ``rows`` calls (and proportional related rows) spread over 90 days"""
+    rng = random.Random(42)
+    now = datetime.utcnow().replace(microsecond=0)
+    tenant_ids = [f"tenant-{i}" for i in range(tenants)]
+
+    def moment() -> datetime:
+        return now - timedelta(seconds=rng.randint(0, 90 * 86400))
+
+    customers = []
+    for i in range(max(rows // 10, tenants)):
+        customers.append({
+            "id": f"cust_{i}",
+            "tenant_id": tenant_ids[i % tenants],
+            "name": f"Customer {i}",
+            "phone": f"+9665{i:08d}",
+            "created_at": moment(),
+        })
+    conn.execute(insert(models.Customer), customers)
+
+    conversations, calls, sessions, feed = [], [], [], []
+    for i in range(rows):
+        customer = customers[i % len(customers)]
+        created_at = moment()
+        status = rng.choice(list(models.VoiceSessionStatus))
+        conversations.append({
+            "id": f"conv_{i}",
+            "tenant_id": customer["tenant_id"],
+            "customer_id": customer["id"],
+            "sentiment": rng.choice(["positive", "neutral", "negative", None]),
+            "created_at": created_at,
+        })
+        calls.append({
+            "id": f"call_{i}",
+            "tenant_id": customer["tenant_id"],
+            "conversation_id": f"conv_{i}",
+            "handle_sec": rng.randint(10, 600),
+            "created_at": created_at,
+        })
+        sessions.append({
+            "id": f"vs_{i}",
+            "tenant_id": customer["tenant_id"],
+            "customer_id": customer["id"],
+            "conversation_id": f"conv_{i}",
+            "status": status,
+            "customer_phone": customer["phone"],
+            "created_at": created_at,
+            "ended_at": None if status == models.VoiceSessionStatus.ACTIVE else created_at + timedelta(minutes=3),
+        })
+        feed.append({
+            "id": f"call_{i}",
+            "tenant_id": customer["tenant_id"],
+            "conversation_id": f"conv_{i}",
+            "customer_id": customer["id"],
+            "customer_name": customer["name"],
+            "direction": "inbound",
+            "status": "connected",
+            "created_at": created_at,
+            "voice_session_id": f"vs_{i}",
+            "session_status": status.value,
+        })
+    conn.execute(insert(models.Conversation), conversations)
+    conn.execute(insert(models.Call), calls)
+    conn.execute(insert(models.VoiceSession), sessions)
+    conn.execute(insert(models.CallFeed), feed)
+
+    bookings, tickets = [], []
+    for i in range(rows // 4):
+        customer = customers[i % len(customers)]
+        bookings.append({
+            "id": f"bk_{i}",
+            "tenant_id": customer["tenant_id"],
+            "customer_id": customer["id"],
+            "start_date": now,
+            "price_sar": float(rng.randint(100, 5000)),
+            "created_at": moment(),
+        })
+        tickets.append({
+            "id": f"tk_{i}",
+            "tenant_id": customer["tenant_id"],
+            "customer_id": customer["id"],
+            "created_at": moment(),
+        })
+    conn.execute(insert(models.Booking), bookings)
+    conn.execute(insert(models.Ticket), tickets)
+
+    campaigns = []
+    for i in range(tenants * 5):
+        campaigns.append({
+            "id": f"camp_{i}",
+            "tenant_id": tenant_ids[i % tenants],
+            "name": f"Campaign {i}",
+            "status": models.BulkCallStatusEnum.completed,
+            "customer_ids": [],
+            "total_calls": 0,
+            "script_content": "",
+            "agent_type": "sales",
+            "created_at": moment(),
+        })
+    conn.execute(insert(models.BulkCallCampaign), campaigns)
+
+    results = []
+    for i in range(rows):
+        campaign = campaigns[i % len(campaigns)]
+        customer = customers[i % len(customers)]
+        results.append({
+            "id": f"res_{i}",
+            "campaign_id": campaign["id"],
+            "tenant_id": campaign["tenant_id"],
+            "customer_id": customer["id"],
+            "customer_name": customer["name"],
+            "customer_phone": customer["phone"],
+            "status": rng.choice(list(models.BulkCallResultStatusEnum)),
+            "twilio_call_sid": f"CA{i:032d}",
+            "created_at": moment(),
+            "updated_at": now,
+        })
+    conn.execute(insert(models.BulkCallResult), results)
+
+    rollups = []
+    for tenant_id in tenant_ids:
+        for day in range(400):
+            rollups.append({
+                "tenant_id": tenant_id,
+                "day": (now - timedelta(days=day)).date(),
+                "calls": rng.randint(0, 500),
+                "updated_at": now,
+            })
+    conn.execute(insert(models.TenantDailyKpi), rollups)
+
+    return {
+        "now": now,
+        "tenant_id": tenant_ids[0],
+        "campaign_id": campaigns[0]["id"],
+        "conversation_id": conversations[rows // 2]["id"],
+        "voice_session_id": sessions[rows // 2]["id"],
+        "phone_e164": customers[0]["phone"],
+        "twilio_call_sid": results[rows // 2]["twilio_call_sid"],
+        "boundary": (calls[rows // 3]["created_at"], calls[rows // 3]["id"]),
+    }
+
+
+# ============================================================================
+# HOT QUERIES
+# ============================================================================
+
+def hot_queries(ctx: Dict[str, Any]) -> List[Tuple[str, Any, Dict[str, Sequence[str]]]]:
+    """(name, statement, {table: acceptable index names}) for every hot query"""
+    tenant_id, now = ctx["tenant_id"], ctx["now"]
+    phone_prefix = ctx["phone_e164"][:7]
+    call, conv, vs = models.Call, models.Conversation, models.VoiceSession
+    result, kpi, feed = models.BulkCallResult, models.TenantDailyKpi, models.CallFeed
+
+    calls_feed = select(feed).where(feed.tenant_id == tenant_id)
+    feed_indexes = {"call_feed": ["ix_call_feed_tenant_created_at_id"]}
+
+    return [
+        (
+            "calls feed, first page",
+            calls_feed.order_by(feed.created_at.desc(), feed.id.desc()).limit(101),
+            feed_indexes,
+        ),
+        (
+            "calls feed, keyset page",
+            calls_feed.where(tuple_(feed.created_at, feed.id) < tuple_(*ctx["boundary"]))
+                .order_by(feed.created_at.desc(), feed.id.desc()).limit(101),
+            feed_indexes,
+        ),
+        (
+            "calls feed, refresh of one conversation",
+            select(call, conv.customer_id, models.Customer.name, vs, conv.recording_url)
+                .outerjoin(conv, call.conversation_id == conv.id)
+                .outerjoin(models.Customer, conv.customer_id == models.Customer.id)
+                .outerjoin(vs, call.conversation_id == vs.conversation_id)
+                .where(call.conversation_id == ctx["conversation_id"]),
+            {
+                "calls": ["uq_calls_conversation_id"],
+                "conversations": primary_key("conversations"),
+                "customers": primary_key("customers"),
+                "voice_sessions": ["ix_voice_sessions_conversation_id"],
+            },
+        ),
+        (
+            "calls feed, session status copy",
+            select(feed.id).where(feed.voice_session_id == ctx["voice_session_id"]),
+            {"call_feed": ["ix_call_feed_voice_session_id"]},
+        ),
+        (
+            "live ops: active sessions",
+            select(vs.id, vs.status, vs.created_at).where(
+                vs.tenant_id == tenant_id, vs.status == models.VoiceSessionStatus.ACTIVE
+            ).order_by(vs.created_at.desc()),
+            {"voice_sessions": ["ix_voice_sessions_tenant_status_created_at"]},
+        ),
+        (
+            "dashboard: rollup totals",
+            select(func.sum(kpi.calls), func.sum(kpi.bookings)).where(
+                kpi.tenant_id == tenant_id, kpi.day >= (now - timedelta(days=59)).date()
+            ),
+            {"tenant_daily_kpis": primary_key("tenant_daily_kpis")},
+        ),
+        (
+            "kpi rollup: one tenant day of sessions",
+            select(func.count()).select_from(vs).where(
+                vs.tenant_id == tenant_id,
+                vs.created_at >= now - timedelta(days=1),
+                vs.created_at < now,
+            ),
+            {"voice_sessions": ["ix_voice_sessions_tenant_created_at_id", "ix_voice_sessions_tenant_status_created_at"]},
+        ),
+        (
+            "webhook dedupe: call by conversation",
+            select(call.id).where(call.conversation_id == ctx["conversation_id"]).limit(1),
+            {"calls": ["uq_calls_conversation_id"]},
+        ),
+        (
+            "webhook: session by conversation",
+            select(vs).where(vs.conversation_id == ctx["conversation_id"]).limit(1),
+            {"voice_sessions": ["ix_voice_sessions_conversation_id"]},
+        ),
+        (
+            "webhook: customer by phone (upsert conflict target)",
+            select(models.Customer.id).where(
+                models.Customer.tenant_id == tenant_id, models.Customer.phone_e164 == ctx["phone_e164"]
+            ),
+            {"customers": ["uq_customers_tenant_phone_e164"]},
+        ),
+        (
+            "webhook: context recovery by phone",
+            select(models.Customer).where(models.Customer.phone_e164 == ctx["phone_e164"])
+                .order_by(models.Customer.created_at.desc()).limit(1),
+            {"customers": ["ix_customers_phone_e164_created_at"]},
+        ),
+        (
+            "customer search: phone prefix",
+            select(models.Customer).where(
+                models.Customer.tenant_id == tenant_id,
+                models.Customer.phone_e164 >= phone_prefix,
+                models.Customer.phone_e164 < phone_prefix[:-1] + chr(ord(phone_prefix[-1]) + 1)
+            ).limit(20),
+            {"customers": ["uq_customers_tenant_phone_e164"]},
+        ),
+        (
+            "twilio status: result by call sid",
+            select(result).where(result.twilio_call_sid == ctx["twilio_call_sid"]),
+            {"bulk_call_results": ["ix_bulk_call_results_twilio_call_sid"]},
+        ),
+        (
+            "campaign results, newest first",
+            select(result).where(
+                result.campaign_id == ctx["campaign_id"], result.tenant_id == tenant_id
+            ).order_by(result.created_at.desc()),
+            {"bulk_call_results": ["ix_bulk_call_results_campaign_created_at", "ix_bulk_call_results_campaign_status_created_at"]},
+        ),
+        (
+            "dialer: next queued results",
+            select(result).where(
+                result.campaign_id == ctx["campaign_id"],
+                result.status == models.BulkCallResultStatusEnum.queued,
+            ).order_by(result.created_at).limit(10),
+            {"bulk_call_results": ["ix_bulk_call_results_campaign_status_created_at"]},
+        ),
+        (
+            "dialer: queued count",
+            select(func.count(result.id)).where(
+                result.campaign_id == ctx["campaign_id"],
+                result.status == models.BulkCallResultStatusEnum.queued,
+            ),
+            {"bulk_call_results": ["ix_bulk_call_results_campaign_status_created_at"]},
+        ),
+        (
+            "campaign list",
+            select(models.BulkCallCampaign).where(models.BulkCallCampaign.tenant_id == tenant_id)
+                .order_by(models.BulkCallCampaign.created_at.desc()).limit(100),
+            {"bulk_call_campaigns": ["ix_bulk_call_campaigns_tenant_created_at"]},
+        ),
+        (
+            "bookings list",
+            select(models.Booking).where(models.Booking.tenant_id == tenant_id)
+                .order_by(models.Booking.created_at.desc()).limit(100),
+            {"bookings": ["ix_bookings_tenant_created_at"]},
+        ),
+        (
+            "tickets list",
+            select(models.Ticket).where(models.Ticket.tenant_id == tenant_id)
+                .order_by(models.Ticket.created_at.desc()).limit(100),
+            {"tickets": ["ix_tickets_tenant_created_at"]},
+        ),
+        (
+            "customers list",
+            select(models.Customer).where(models.Customer.tenant_id == tenant_id)
+                .order_by(models.Customer.created_at.desc(), models.Customer.id.desc()).limit(100),
+            {"customers": ["ix_customers_tenant_created_at_id"]},
+        ),
+    ]
+
+
+# ============================================================================
+# PLAN INSPECTION
+# ============================================================================
+
+SQLITE_PLAN_LINE = re.compile(
+    r"^(?P<op>SCAN|SEARCH) (?P<table>\S+)(?: AS \S+)?"
+    r"(?: USING (?:COVERING )?INDEX (?P<index>\S+)| USING (?:INTEGER )?PRIMARY KEY)?"
+)
+
+
+def plan_usage(conn: Connection, statement) -> Tuple[Set[str], Set[str], List[str]]:
+    """(indexes used, tables read by a full scan, plan lines) of a statement"""
+    rows = conn.execute(Explain(statement)).fetchall()
+    indexes: Set[str] = set()
+    full_scans: Set[str] = set()
+
+    if conn.dialect.name == "postgresql":
+        plan = rows[0][0]
+        if isinstance(plan, str):
+            import json
+            plan = json.loads(plan)
+        lines: List[str] = []
+
+        def walk(node: Dict[str, Any], depth: int = 0) -> None:
+            label = node["Node Type"]
+            if node.get("Index Name"):
+                indexes.add(node["Index Name"])
+                label += f" using {node['Index Name']}"
+            if node.get("Relation Name"):
+                label += f" on {node['Relation Name']}"
+                if node["Node Type"] == "Seq Scan":
+                    full_scans.add(node["Relation Name"])
+            lines.append("  " * depth + label)
+            for child in node.get("Plans", []):
+                walk(child, depth + 1)
+
+        walk(plan[0]["Plan"])
+        return indexes, full_scans, lines
+
+    lines = [row[-1] for row in rows]
+    for line in lines:
+        match = SQLITE_PLAN_LINE.match(line)
+        if not match:
+            continue
+        if match.group("index"):
+            indexes.add(match.group("index"))
+        elif match.group("op") == "SCAN" and "PRIMARY KEY" not in line:
+            full_scans.add(match.group("table"))
+    return indexes, full_scans, lines
+
+
+def check(conn: Connection, name: str, statement, expected: Dict[str, Sequence[str]], verbose: bool) -> bool:
+    indexes, full_scans, lines = plan_usage(conn, statement)
+    problems = []
+    for table, acceptable in expected.items():
+        if table in full_scans:
+            problems.append(f"full scan of {table}")
+        elif not indexes.intersection(acceptable):
+            problems.append(f"{table} not read through {' / '.join(acceptable)}")
+
+    print(f"{'✅' if not problems else '❌'} {name}" + (f": {'; '.join(problems)}" if problems else ""))
+    if problems or verbose:
+        for line in lines:
+            print(f"      {line}")
+    return not problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=20000, help="calls (and bulk call results) to seed")
+    parser.add_argument("--tenants", type=int, default=8)
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not only failing ones")
+    args = parser.parse_args(argv)
+
+    db_url = os.getenv("EXPLAIN_DB_URL")
+    tmp_dir = None
+    if not db_url:
+        tmp_dir = tempfile.TemporaryDirectory()
+        db_url = f"sqlite:///{os.path.join(tmp_dir.name, 'explain.db')}"
+
+    engine = create_engine(db_url, future=True)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    try:
+        with engine.begin() as conn:
+            ctx = seed(conn, args.rows, args.tenants)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+        print(f"🔎 {engine.dialect.name}: {args.rows} calls across {args.tenants} tenants\n")
+        with engine.connect() as conn:
+            outcomes = [check(conn, name, stmt, expected, args.verbose) for name, stmt, expected in hot_queries(ctx)]
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+        if tmp_dir is not None:
+            tmp_dir.cleanup()
+
+    failed = outcomes.count(False)
+    print(f"\n{len(outcomes) - failed}/{len(outcomes)} hot queries use their indexes")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,41 @@
+"""
+Rebuild the call_feed projection from the source tables
+
+GET /calls reads call_feed, which the write paths keep up to date. Run this
+after writing calls, conversations, customers or voice sessions outside the
+API (manual SQL, restores, seed data), or to reconcile the projection.
+Existing rows are overwritten in place; the API can keep serving meanwhile.
+
+Usage:
+    python -m scripts.rebuild_call_feed
+    python -m scripts.rebuild_call_feed --tenant demo-tenant
+"""
+import argparse
+import os
+import sys
+from typing import List, Optional
+
+# Add the backend directory to path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.db import SessionLocal
+from app.services.call_feed_service import rebuild_call_feed
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tenant", help="only rebuild this tenant's calls")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        written = rebuild_call_feed(db, tenant_id=args.tenant, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"✅ {written} calls projected into call_feed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from app.db import SessionLocal
 from app.models import Customer
+from app.services.call_feed_service import rebuild_call_feed
 from .base_seeder import SeededData
 
 # Import all seeders
@@ -148,6 +149,9 @@ class SeedOrchestrator:
             self.db, self.tenant_id, count=30, conversation_ids=conversation_ids
         )
         self.seed_data.call_ids = call_ids
+
+        # Seeders insert calls directly, so project them into the calls feed
+        rebuild_call_feed(self.db, self.tenant_id)
         
         print("\n✅ Phase 3 Complete: Voice interactions seeded")
     